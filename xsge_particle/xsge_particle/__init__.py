@@ -30,56 +30,217 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
-__version__ = "0.1a0"
+__version__ = "0.2a0"
 
+import math
 import random
 
 import six
 
 import sge
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 __all__ = ["Particle", "AnimationParticle", "TimedParticle", "BubbleParticle",
-           "AnimationBubbleParticle", "TimedBubbleParticle", "Emitter"]
+           "AnimationBubbleParticle", "TimedBubbleParticle", "ParticleSystem",
+           "Distribution", "Uniform", "Normal", "ConeAngle", "Ring",
+           "Rectangle", "Emitter", "ParticleBudget"]
+
+_INF = float("inf")
+
+# The state of each particle stored by ParticleSystem, in the order of
+# its arrays.
+_SYSTEM_FIELDS = ("x", "y", "xvelocity", "yvelocity", "life", "image_index",
+                  "image_rotation")
+
+
+# Default values of the attributes of sge.dsp.Object reset by
+# Particle.reset, in the order they are set.
+_RESET_DEFAULTS = [
+    ("sprite", None), ("visible", True), ("active", True),
+    ("xvelocity", 0), ("yvelocity", 0), ("xacceleration", 0),
+    ("yacceleration", 0), ("xdeceleration", 0), ("ydeceleration", 0),
+    ("image_index", 0), ("image_origin_x", None), ("image_origin_y", None),
+    ("image_fps", None), ("image_xscale", 1), ("image_yscale", 1),
+    ("image_rotation", 0), ("image_alpha", 255), ("image_blend", None)]
 
 
 class Particle(sge.dsp.Object):
 
     """
     Base class for particles.  It is identical to
-    :class:`sge.dsp.Object`, except that it is intangible by default.
+    :class:`sge.dsp.Object`, except that it is intangible by default
+    and can be reused by an :class:`Emitter` with a pool (see
+    :attr:`Emitter.pool_size`).
+
+    .. attribute:: emitter
+
+       The emitter which created the particle, or :const:`None` if it
+       wasn't created by an emitter.  When the particle expires, it is
+       returned to the pool of this emitter if it has room for it, and
+       destroyed otherwise.  This is set by :class:`Emitter` when it
+       creates the particle.
+
+    .. attribute:: cull_margin
+
+       If set to a number, the particle is only drawn while its
+       bounding box is within this many pixels of any of the views of
+       the current room.  This is checked in :meth:`event_step`, which
+       sets :attr:`visible` accordingly.  Culled particles still move,
+       animate, and expire as usual.  Set to :const:`None` to never
+       cull the particle.
     """
 
-    def __init__(self, x, y, z=0, tangible=False, **kwargs):
+    emitter = None
+    _pooled = False
+    _expired = False
+
+    def __init__(self, x, y, z=0, cull_margin=None, tangible=False,
+                 **kwargs):
         """
+        Arguments set the respective initial attributes of the object.
+        See the documentation for :class:`Particle` for more
+        information.
+
         ``x``, ``y``, ``z``, ``tangible``, and all arguments passed to
         ``kwargs`` are passed as the corresponding arguments to the
         constructor method of the parent class.
         """
         super(Particle, self).__init__(x, y, z=z, tangible=tangible, **kwargs)
+        self.cull_margin = cull_margin
+
+    def reset(self, x, y, z=0, cull_margin=None, tangible=False, **kwargs):
+        """
+        Reset the particle so that it can be used again as if it had
+        just been created with the same arguments.  This is used by
+        :class:`Emitter` to reuse particles from its pool.
+
+        The arguments are the same as the arguments of
+        :meth:`__init__`, so classes derived from this class which add
+        arguments to :meth:`__init__` must extend this method to accept
+        and handle the same arguments.  Attributes which aren't set by
+        the arguments are reset to their default values, except for
+        attributes related to collision detection, such as the bounding
+        box, which keep their current values.  All alarms are
+        cancelled.
+        """
+        self.alarms.clear()
+        self.x = x
+        self.y = y
+        self.z = z
+        self.tangible = tangible
+        for name, value in _RESET_DEFAULTS:
+            setattr(self, name, kwargs.pop(name, value))
+        for name in kwargs:
+            setattr(self, name, kwargs[name])
+        self.xstart = x
+        self.ystart = y
+        self.xprevious = x
+        self.yprevious = y
+        self.cull_margin = cull_margin
+        self._expired = False
+
+    def advance(self, frames):
+        """
+        Advance the particle by a number of frames at once, without
+        calling its step events.  This is much faster than simulating
+        each frame, and is used by :meth:`Emitter.advance`.
+
+        As in each frame of the SGE's game loop, the particle's
+        animation and alarms are advanced, calling
+        :meth:`event_animation_end` and :meth:`event_alarm` as needed,
+        and then it moves as
+        :meth:`sge.dsp.Object.event_update_position` moves it.  This
+        way, :class:`AnimationParticle` and :class:`TimedParticle`
+        objects expire as they normally would, and particles which
+        expire aren't moved.  Since step events aren't called,
+        :class:`BubbleParticle` objects don't change their move
+        directions.
+
+        Arguments:
+
+        - ``frames`` -- The number of frames (adjusted for delta
+          timing) to advance the particle by.
+        """
+        sprite = self.sprite
+        if self.image_fps and sprite is not None:
+            index = self.image_index + self.image_speed * frames
+            if 0 <= index < sprite.frames:
+                self.image_index = int(index)
+            else:
+                self.image_index = int(index % sprite.frames)
+                self.event_animation_end()
+                if self._expired:
+                    return
+
+        alarms = self.alarms
+        activated = [a for a in alarms if alarms[a] <= frames]
+        activated.sort(key=alarms.get)
+        for a in alarms:
+            alarms[a] -= frames
+        for a in activated:
+            if a in alarms:
+                del alarms[a]
+                self.event_alarm(a)
+                if self._expired:
+                    return
+
+        self.event_update_position(frames)
+
+    def expire(self):
+        """
+        Destroy the particle, or return it to the pool of
+        :attr:`emitter` if it has room for it.  Pooled particles stay in
+        the room, but are inactive and invisible until they are reused.
+        """
+        self._expired = True
+        emitter = self.emitter
+        if emitter is None or not emitter._recycle(self):
+            self.destroy()
+
+    def event_step(self, time_passed, delta_mult):
+        super(Particle, self).event_step(time_passed, delta_mult)
+        if self.cull_margin is not None:
+            self.visible = _in_views((self.bbox_left, self.bbox_top,
+                                      self.bbox_right, self.bbox_bottom),
+                                     self.cull_margin)
+
+    def event_destroy(self):
+        super(Particle, self).event_destroy()
+        if self._pooled:
+            self.emitter._pool.remove(self)
+            self._pooled = False
+        elif self.emitter is not None:
+            self.emitter._particles.discard(self)
 
 
 class AnimationParticle(Particle):
 
     """
-    Class for particle objects which animate once and are then
-    destroyed.  It is otherwise identical to :class:`Particle`.
+    Class for particle objects which animate once and then expire (see
+    :meth:`Particle.expire`).  It is otherwise identical to
+    :class:`Particle`.
 
     .. note::
 
-       :meth:`event_animation_end` is used to control the destruction.
+       :meth:`event_animation_end` is used to control the expiration.
     """
 
     def event_animation_end(self):
         super(AnimationParticle, self).event_animation_end()
-        self.destroy()
+        self.expire()
 
 
 class TimedParticle(Particle):
 
     """
-    Class for particle objects which are destroyed after a designated
-    amount of time.  It is otherwise identical to :class:`Particle`.
+    Class for particle objects which expire (see
+    :meth:`Particle.expire`) after a designated amount of time.  It is
+    otherwise identical to :class:`Particle`.
 
     .. note::
 
@@ -90,9 +251,9 @@ class TimedParticle(Particle):
     .. attribute:: life
 
        The number of frames (adjusted for delta timing) after which the
-       particle is destroyed.  Setting this attribute resets the
+       particle expires.  Setting this attribute resets the
        ``"__life"`` alarm to the given value.  Set to :const:`None` to
-       disable timed destruction.
+       disable timed expiration.
     """
 
     @property
@@ -118,6 +279,11 @@ class TimedParticle(Particle):
                                             **kwargs)
         self.__life = life
 
+    def reset(self, x, y, z=0, life=None, tangible=False, **kwargs):
+        super(TimedParticle, self).reset(x, y, z=z, tangible=tangible,
+                                         **kwargs)
+        self.life = life
+
     def event_create(self):
         super(TimedParticle, self).event_create()
         self.alarms["__life"] = self.life
@@ -126,7 +292,7 @@ class TimedParticle(Particle):
     def event_alarm(self, alarm_id):
         super(TimedParticle, self).event_alarm(alarm_id)
         if alarm_id == "__life":
-            self.destroy()
+            self.expire()
 
 
 class BubbleParticle(Particle):
@@ -170,6 +336,14 @@ class BubbleParticle(Particle):
         self.min_angle = min_angle
         self.max_angle = max_angle
 
+    def reset(self, x, y, z=0, turn_factor=1, min_angle=180, max_angle=0,
+              tangible=False, **kwargs):
+        super(BubbleParticle, self).reset(x, y, z=z, tangible=tangible,
+                                          **kwargs)
+        self.turn_factor = turn_factor
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+
     def event_step(self, time_passed, delta_mult):
         super(BubbleParticle, self).event_step(time_passed, delta_mult)
 
@@ -208,6 +382,675 @@ class TimedBubbleParticle(TimedParticle, BubbleParticle):
     """
 
 
+class ParticleSystem(sge.dsp.Object):
+
+    """
+    Class for objects which simulate and draw a large number of simple
+    particles by themselves.  Rather than each particle being a
+    separate :class:`sge.dsp.Object` with its own events, the state of
+    all of the particles is stored in arrays (NumPy arrays if NumPy is
+    available), updated all at once in :meth:`event_step`, and
+    projected onto the room with :meth:`sge.dsp.Room.project_sprite`.
+    This makes it possible to have thousands of particles at once, at
+    the cost of flexibility: particles can't have events of their own,
+    and they are all drawn with the same sprite at the Z-axis position
+    of the system.
+
+    Particles are added with :meth:`emit`, either directly or by an
+    :class:`Emitter` whose :attr:`Emitter.particle_system` is the
+    system.  The behaviors of :class:`TimedParticle`,
+    :class:`AnimationParticle`, and :class:`BubbleParticle` are
+    available through the ``life`` argument of :meth:`emit`,
+    :attr:`animate_once`, and :attr:`turn_factor`.
+
+    .. attribute:: particle_sprite
+
+       The sprite to draw the particles with, or :const:`None` to not
+       draw them.
+
+    .. attribute:: particle_image_fps
+
+       The animation rate of the particles in frames per second, or
+       :const:`None` to use the frame rate of :attr:`particle_sprite`.
+
+    .. attribute:: animate_once
+
+       Whether or not particles are removed when their animation ends,
+       like :class:`AnimationParticle`.  If set to :const:`False`,
+       particle animations loop.
+
+    .. attribute:: particle_xacceleration
+
+       The horizontal acceleration of all particles.
+
+    .. attribute:: particle_yacceleration
+
+       The vertical acceleration of all particles.
+
+    .. attribute:: turn_factor
+
+       The largest amount the move direction of each particle changes
+       at random each frame, like :attr:`BubbleParticle.turn_factor`.
+       Set to ``0`` to disable random turning.
+
+    .. attribute:: min_angle
+
+       The lowest move direction permitted for particles if
+       :attr:`turn_factor` is not ``0``.  See
+       :attr:`BubbleParticle.min_angle`.
+
+    .. attribute:: max_angle
+
+       The highest move direction permitted for particles if
+       :attr:`turn_factor` is not ``0``.  See
+       :attr:`BubbleParticle.max_angle`.
+
+    .. attribute:: rotation_step
+
+       Rotated particles are drawn with copies of
+       :attr:`particle_sprite` rotated to the nearest multiple of this
+       many degrees, which are created as needed and kept.
+
+    .. attribute:: cull_margin
+
+       If set to a number, the particles are neither updated nor drawn
+       while none of them are within this many pixels of any of the
+       views of the current room; the system is then suspended.  Set
+       to :const:`None` to always update and draw the particles.
+
+    .. attribute:: catch_up
+
+       The largest number of frames (adjusted for delta timing) the
+       particles are advanced by when the system stops being
+       suspended, to make up for the time they were suspended.  The
+       particles are advanced in a single update, so random turning
+       (see :attr:`turn_factor`) is less accurate.  Set to ``0`` to
+       continue where the particles left off instead.
+
+    .. attribute:: count
+
+       The number of particles in the system.  This attribute is
+       read-only.
+
+    .. attribute:: suspended
+
+       Whether or not the system is suspended (see
+       :attr:`cull_margin`).  This attribute is read-only.
+    """
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def suspended(self):
+        return self._suspended_frames is not None
+
+    def __init__(self, x=0, y=0, z=0, particle_sprite=None,
+                 particle_image_fps=None, animate_once=False,
+                 particle_xacceleration=0, particle_yacceleration=0,
+                 turn_factor=0, min_angle=180, max_angle=0,
+                 rotation_step=15, cull_margin=None, catch_up=0,
+                 tangible=False, **kwargs):
+        """
+        Arguments set the respective initial attributes of the object.
+        See the documentation for :class:`ParticleSystem` for more
+        information.
+
+        ``x``, ``y``, ``z``, ``tangible``, and all arguments passed to
+        ``kwargs`` are passed as the corresponding arguments to the
+        constructor method of :class:`sge.dsp.Object`.
+        """
+        kwargs.setdefault("checks_collisions", False)
+        super(ParticleSystem, self).__init__(x, y, z=z, tangible=tangible,
+                                             **kwargs)
+        self.particle_sprite = particle_sprite
+        self.particle_image_fps = particle_image_fps
+        self.animate_once = animate_once
+        self.particle_xacceleration = particle_xacceleration
+        self.particle_yacceleration = particle_yacceleration
+        self.turn_factor = turn_factor
+        self.min_angle = min_angle
+        self.max_angle = max_angle
+        self.rotation_step = rotation_step
+        self.cull_margin = cull_margin
+        self.catch_up = catch_up
+        self._rotated = {}
+        self._suspended_frames = None
+        self._suspended_count = 0
+        self.clear()
+
+    def emit(self, x, y, life=None, xvelocity=0, yvelocity=0, speed=0,
+             move_direction=0, image_index=0, image_rotation=0):
+        """
+        Add a particle to the system.
+
+        Arguments:
+
+        - ``x`` -- The horizontal position of the particle.
+        - ``y`` -- The vertical position of the particle.
+        - ``life`` -- The number of frames (adjusted for delta timing)
+          after which the particle is removed, like
+          :attr:`TimedParticle.life`.  Set to :const:`None` to not
+          remove the particle after a set time.
+        - ``xvelocity`` -- The horizontal velocity of the particle.
+        - ``yvelocity`` -- The vertical velocity of the particle.
+        - ``speed`` -- A speed to add to the velocity of the particle in
+          the direction of ``move_direction``.
+        - ``move_direction`` -- The direction of ``speed`` in degrees.
+        - ``image_index`` -- The animation frame the particle starts
+          at.
+        - ``image_rotation`` -- The rotation of the particle's image in
+          degrees.
+        """
+        if speed:
+            a = math.radians(move_direction)
+            xvelocity += math.cos(a) * speed
+            yvelocity += math.sin(a) * speed
+
+        values = (x, y, xvelocity, yvelocity,
+                  _INF if life is None else life, image_index,
+                  image_rotation)
+        i = self._count
+        if numpy is not None:
+            arrays = self._arrays
+            if i >= len(arrays[0]):
+                self._arrays = arrays = [
+                    numpy.concatenate((a, numpy.empty(max(16, len(a)))))
+                    for a in arrays]
+            for a, value in zip(arrays, values):
+                a[i] = value
+        else:
+            for a, value in zip(self._arrays, values):
+                a.append(value)
+
+        self._count = i + 1
+
+    def emit_many(self, number, x, y, life=None, xvelocity=0, yvelocity=0,
+                  speed=0, move_direction=0, image_index=0,
+                  image_rotation=0):
+        """
+        Add a number of particles to the system at once.  This is
+        faster than calling :meth:`emit` for each particle if NumPy is
+        available.
+
+        Arguments:
+
+        - ``number`` -- The number of particles to add.
+
+        All other arguments are the same as the arguments of
+        :meth:`emit`, except that each of them can also be a sequence
+        of ``number`` values, one for each particle.
+        """
+        if not number:
+            return
+
+        if numpy is None:
+            columns = []
+            for value in (x, y, life, xvelocity, yvelocity, speed,
+                          move_direction, image_index, image_rotation):
+                if isinstance(value, (list, tuple)):
+                    columns.append(value)
+                else:
+                    columns.append([value] * number)
+            for values in zip(*columns):
+                self.emit(*values)
+            return
+
+        def column(value):
+            # None means an infinite life, also inside sequences.
+            if value is None:
+                value = _INF
+            elif isinstance(value, (list, tuple)):
+                value = [_INF if v is None else v for v in value]
+            return numpy.broadcast_to(numpy.asarray(value, dtype=float),
+                                      (number,))
+
+        xv = column(xvelocity)
+        yv = column(yvelocity)
+        if not isinstance(speed, (int, float)) or speed:
+            a = numpy.radians(column(move_direction))
+            xv = xv + numpy.cos(a) * column(speed)
+            yv = yv + numpy.sin(a) * column(speed)
+
+        values = (column(x), column(y), xv, yv, column(life),
+                  column(image_index), column(image_rotation))
+        i = self._count
+        arrays = self._arrays
+        if i + number > len(arrays[0]):
+            size = max(2 * len(arrays[0]), i + number)
+            self._arrays = arrays = [
+                numpy.concatenate((a, numpy.empty(size - len(a))))
+                for a in arrays]
+        for a, value in zip(arrays, values):
+            a[i:(i + number)] = value
+
+        self._count = i + number
+
+    def clear(self):
+        """Remove all particles from the system."""
+        if numpy is not None:
+            self._arrays = [numpy.empty(16) for field in _SYSTEM_FIELDS]
+        else:
+            self._arrays = [[] for field in _SYSTEM_FIELDS]
+        self._count = 0
+
+    def get_particles(self):
+        """
+        Return a list of tuples in the form
+        ``(x, y, xvelocity, yvelocity, life, image_index,
+        image_rotation)`` indicating the state of each particle in the
+        system.  ``life`` is :const:`None` for particles without a set
+        life.
+        """
+        n = self._count
+        columns = [a[:n] for a in self._arrays]
+        if numpy is not None:
+            columns = [a.tolist() for a in columns]
+        return [p[:4] + (None if p[4] == _INF else p[4],) + p[5:]
+                for p in zip(*columns)]
+
+    def event_step(self, time_passed, delta_mult):
+        super(ParticleSystem, self).event_step(time_passed, delta_mult)
+        if self._count and self.cull_margin is not None:
+            if not _in_views(self._get_bounds(), self.cull_margin):
+                if self._suspended_frames is None:
+                    self._suspended_frames = 0
+                    self._suspended_count = self._count
+                self._suspended_frames += delta_mult
+                return
+            elif self._suspended_frames is not None:
+                # Particles added while the system was suspended, for
+                # example by Emitter.advance, don't need to catch up.
+                frames = min(self._suspended_frames, self.catch_up)
+                n = self._suspended_count
+                if frames and n:
+                    self._age(0, [frames] * n + [0] * (self._count - n))
+
+        self._suspended_frames = None
+        if self._count:
+            self._update(delta_mult)
+
+        if self._count and self.particle_sprite is not None:
+            self._project()
+
+    def _update(self, delta_mult):
+        # Update all particles.  ``delta_mult`` can also be a sequence
+        # with a value for each particle.
+        if numpy is not None:
+            self._update_numpy(delta_mult)
+        else:
+            self._update_python(delta_mult)
+
+    def _age(self, start, ages):
+        # Update the particles from index ``start`` on by the numbers
+        # of frames in the list ``ages`` without changing the others.
+        n = self._count
+        if numpy is not None:
+            delta_mult = numpy.zeros(n)
+            delta_mult[start:] = ages
+        else:
+            delta_mult = [0] * start + ages
+        self._update(delta_mult)
+
+    def _get_bounds(self):
+        # Return the bounding rectangle of the particles' positions as
+        # a tuple in the form ``(left, top, right, bottom)``.
+        n = self._count
+        x = self._arrays[0][:n]
+        y = self._arrays[1][:n]
+        if numpy is not None:
+            return (x.min(), y.min(), x.max(), y.max())
+        else:
+            return (min(x), min(y), max(x), max(y))
+
+    def _get_limits(self):
+        # Return the animation rate per frame and the move direction
+        # limits of particles, as in BubbleParticle.event_step.
+        sprite = self.particle_sprite
+        fps = self.particle_image_fps
+        if fps is None:
+            fps = sprite.fps if sprite is not None else 0
+        rate = fps / sge.game.fps if sprite is not None else 0
+        min_angle = self.min_angle % 360
+        max_angle = self.max_angle % 360
+        while max_angle < min_angle:
+            max_angle += 360
+        return rate, min_angle, max_angle
+
+    def _update_numpy(self, delta_mult):
+        n = self._count
+        x, y, xv, yv, life, index, rotation = [a[:n] for a in self._arrays]
+        rate, min_angle, max_angle = self._get_limits()
+
+        if self.turn_factor:
+            speed = numpy.hypot(xv, yv)
+            md = numpy.degrees(numpy.arctan2(yv, xv))
+            md += (self.turn_factor * delta_mult *
+                   numpy.random.uniform(-1, 1, n))
+            wrapped = md % 360
+            wrapped[wrapped < min_angle] += 360
+            over = wrapped > max_angle
+            under = (over & (wrapped - max_angle >
+                             (360 - (max_angle - min_angle)) / 2))
+            md[over] = max_angle
+            md[under] = min_angle
+            md = numpy.radians(md)
+            xv[:] = numpy.cos(md) * speed
+            yv[:] = numpy.sin(md) * speed
+
+        xa = self.particle_xacceleration * delta_mult
+        ya = self.particle_yacceleration * delta_mult
+        x += (xv + xa / 2) * delta_mult
+        y += (yv + ya / 2) * delta_mult
+        xv += xa
+        yv += ya
+        life -= delta_mult
+
+        alive = life > 0
+        if rate:
+            index += rate * delta_mult
+            frames = self.particle_sprite.frames
+            if self.animate_once:
+                alive &= index < frames
+            else:
+                index %= frames
+
+        if not alive.all():
+            k = int(alive.sum())
+            for a in self._arrays:
+                a[:k] = a[:n][alive]
+            self._count = k
+
+    def _update_python(self, delta_mult):
+        n = self._count
+        x, y, xv, yv, life, index, rotation = self._arrays
+        rate, min_angle, max_angle = self._get_limits()
+        if isinstance(delta_mult, list):
+            deltas = delta_mult
+        else:
+            deltas = None
+            f = self.turn_factor * delta_mult
+            xa = self.particle_xacceleration * delta_mult
+            ya = self.particle_yacceleration * delta_mult
+
+        frames = (self.particle_sprite.frames
+                  if self.particle_sprite is not None else 1)
+        animate_once = self.animate_once
+        alive = []
+        for i in six.moves.range(n):
+            if deltas is not None:
+                delta_mult = deltas[i]
+                f = self.turn_factor * delta_mult
+                xa = self.particle_xacceleration * delta_mult
+                ya = self.particle_yacceleration * delta_mult
+
+            if f:
+                speed = math.hypot(xv[i], yv[i])
+                md = math.degrees(math.atan2(yv[i], xv[i]))
+                md += f * random.uniform(-1, 1)
+                wrapped = md % 360
+                if wrapped < min_angle:
+                    wrapped += 360
+                if wrapped > max_angle:
+                    if (wrapped - max_angle >
+                            (360 - (max_angle - min_angle)) / 2):
+                        md = min_angle
+                    else:
+                        md = max_angle
+                md = math.radians(md)
+                xv[i] = math.cos(md) * speed
+                yv[i] = math.sin(md) * speed
+
+            x[i] += (xv[i] + xa / 2) * delta_mult
+            y[i] += (yv[i] + ya / 2) * delta_mult
+            xv[i] += xa
+            yv[i] += ya
+            life[i] -= delta_mult
+            keep = life[i] > 0
+            if rate:
+                index[i] += rate * delta_mult
+                if animate_once:
+                    keep = keep and index[i] < frames
+                else:
+                    index[i] %= frames
+
+            if keep:
+                alive.append(i)
+
+        if len(alive) < n:
+            self._arrays = [[a[i] for i in alive] for a in self._arrays]
+            self._count = len(alive)
+
+    def _project(self):
+        # Project all particles onto the room.
+        n = self._count
+        x, y, xv, yv, life, index, rotation = [a[:n] for a in self._arrays]
+        if numpy is not None:
+            x = x.tolist()
+            y = y.tolist()
+            index = index.tolist()
+            rotation = rotation.tolist()
+
+        sprite = self.particle_sprite
+        frames = sprite.frames
+        step = self.rotation_step
+        z = self.z
+        project_sprite = sge.game.current_room.project_sprite
+        for i in six.moves.range(n):
+            spr = sprite
+            if rotation[i]:
+                angle = int(round(rotation[i] / step)) * step % 360
+                if angle:
+                    spr = self._rotated.get((sprite, angle))
+                    if spr is None:
+                        spr = sprite.copy()
+                        spr.rotate(angle)
+                        self._rotated[(sprite, angle)] = spr
+
+            project_sprite(spr, int(index[i]) % frames, x[i], y[i], z)
+
+
+class Distribution(object):
+
+    """
+    Base class for distributions of random values used by
+    :attr:`Emitter.particle_distributions`.  Values are generated for
+    all of the particles created at once by :meth:`sample`, using NumPy
+    if it is available.
+
+    To create a new distribution, derive a class from this class and
+    override :meth:`sample`.
+    """
+
+    def sample(self, emitter, number):
+        """
+        Return a list of ``number`` random values.  For distributions
+        of points, return a tuple of two lists, the horizontal and
+        vertical positions of the points.
+
+        Arguments:
+
+        - ``emitter`` -- The :class:`Emitter` the values are being
+          generated for.
+        - ``number`` -- The number of values to generate.
+        """
+        raise NotImplementedError
+
+
+class Uniform(Distribution):
+
+    """
+    A distribution of numbers which are equally likely to be anywhere
+    from :attr:`low` to :attr:`high`.
+
+    .. attribute:: low
+
+       The lowest possible value.
+
+    .. attribute:: high
+
+       The highest possible value.
+    """
+
+    def __init__(self, low, high):
+        """
+        Arguments set the respective initial attributes of the
+        distribution.  See the documentation for :class:`Uniform` for
+        more information.
+        """
+        self.low = low
+        self.high = high
+
+    def sample(self, emitter, number):
+        return _uniform(self.low, self.high, number)
+
+
+class Normal(Distribution):
+
+    """
+    A normal (Gaussian) distribution of numbers.
+
+    .. attribute:: mean
+
+       The mean of the distribution.
+
+    .. attribute:: deviation
+
+       The standard deviation of the distribution.
+    """
+
+    def __init__(self, mean, deviation):
+        """
+        Arguments set the respective initial attributes of the
+        distribution.  See the documentation for :class:`Normal` for
+        more information.
+        """
+        self.mean = mean
+        self.deviation = deviation
+
+    def sample(self, emitter, number):
+        if numpy is not None:
+            return numpy.random.normal(self.mean, self.deviation,
+                                       number).tolist()
+        else:
+            return [random.gauss(self.mean, self.deviation)
+                    for i in six.moves.range(number)]
+
+
+class ConeAngle(Distribution):
+
+    """
+    A distribution of angles in degrees within a cone, for example to
+    use as the ``move_direction`` of particles.
+
+    .. attribute:: direction
+
+       The direction the cone points in.
+
+    .. attribute:: spread
+
+       The width of the cone in degrees.  Angles are equally likely to
+       be anywhere from ``direction - spread / 2`` to
+       ``direction + spread / 2``.
+    """
+
+    def __init__(self, direction, spread):
+        """
+        Arguments set the respective initial attributes of the
+        distribution.  See the documentation for :class:`ConeAngle` for
+        more information.
+        """
+        self.direction = direction
+        self.spread = spread
+
+    def sample(self, emitter, number):
+        return _uniform(self.direction - self.spread / 2,
+                        self.direction + self.spread / 2, number)
+
+
+class Ring(Distribution):
+
+    """
+    A distribution of points which are equally likely to be anywhere
+    in a ring centered on the emitter.  Its values are pairs of
+    positions, so it must be assigned to a pair of arguments in
+    :attr:`Emitter.particle_distributions`.
+
+    .. attribute:: outer_radius
+
+       The radius of the outside of the ring.
+
+    .. attribute:: inner_radius
+
+       The radius of the inside of the ring.  Set to ``0`` for a
+       filled circle.
+    """
+
+    def __init__(self, outer_radius, inner_radius=0):
+        """
+        Arguments set the respective initial attributes of the
+        distribution.  See the documentation for :class:`Ring` for more
+        information.
+        """
+        self.outer_radius = outer_radius
+        self.inner_radius = inner_radius
+
+    def sample(self, emitter, number):
+        # The square root of the distance makes points equally likely
+        # to be anywhere in the area of the ring, rather than bunched
+        # up toward the center.
+        r1 = self.inner_radius ** 2
+        r2 = self.outer_radius ** 2
+        if numpy is not None:
+            d = numpy.sqrt(numpy.random.uniform(r1, r2, number))
+            a = numpy.random.uniform(0, 2 * math.pi, number)
+            return ((emitter.x + numpy.cos(a) * d).tolist(),
+                    (emitter.y + numpy.sin(a) * d).tolist())
+        else:
+            xs = []
+            ys = []
+            for i in six.moves.range(number):
+                d = math.sqrt(random.uniform(r1, r2))
+                a = random.uniform(0, 2 * math.pi)
+                xs.append(emitter.x + math.cos(a) * d)
+                ys.append(emitter.y + math.sin(a) * d)
+            return xs, ys
+
+
+class Rectangle(Distribution):
+
+    """
+    A distribution of points which are equally likely to be anywhere
+    in a rectangle centered on the emitter.  Its values are pairs of
+    positions, so it must be assigned to a pair of arguments in
+    :attr:`Emitter.particle_distributions`.
+
+    .. attribute:: width
+
+       The width of the rectangle.
+
+    .. attribute:: height
+
+       The height of the rectangle.
+    """
+
+    def __init__(self, width, height):
+        """
+        Arguments set the respective initial attributes of the
+        distribution.  See the documentation for :class:`Rectangle` for
+        more information.
+        """
+        self.width = width
+        self.height = height
+
+    def sample(self, emitter, number):
+        return (_uniform(emitter.x - self.width / 2,
+                         emitter.x + self.width / 2, number),
+                _uniform(emitter.y - self.height / 2,
+                         emitter.y + self.height / 2, number))
+
+
 class Emitter(sge.dsp.Object):
 
     """
@@ -221,19 +1064,36 @@ class Emitter(sge.dsp.Object):
     .. note::
 
        An alarm with the name ``"__emitter"`` in :meth:`event_alarm` is
-       used to control the timing.  It is initially set by
-       :meth:`event_create`.
+       used to control the timing while :attr:`rate` is :const:`None`.
+       It is initially set by :meth:`event_create`.
+
+    Emitters can also create particles at a rate given in particles per
+    second (see :attr:`rate`), which can be more than one particle per
+    frame, and in bursts of many particles at once (see :meth:`emit`
+    and :meth:`add_burst`).
 
     .. attribute:: interval
 
        The number of frames to wait in between the creation of each
-       particle (adjusted for delta timing).
+       particle (adjusted for delta timing).  This is not used if
+       :attr:`rate` is not :const:`None`.
+
+    .. attribute:: rate
+
+       The number of particles to create per second, or :const:`None`
+       to create one particle every :attr:`interval` frames instead.
+       Fractions of particles are accumulated from frame to frame, so
+       any rate can be used, and as many particles as needed are
+       created each frame.  Setting this attribute to :const:`None`
+       starts the ``"__emitter"`` alarm, and setting it to a number
+       stops it.
 
     .. attribute:: chance
 
        The chance (out of 1) of a particle actually being created at
        each iteration.  This can be used to make particle generation
-       uneven.
+       uneven.  This also applies to each particle created by
+       :attr:`rate` and by bursts.
 
     .. attribute:: particle_cls
 
@@ -273,8 +1133,153 @@ class Emitter(sge.dsp.Object):
        functions as the first argument.
 
        If set to :const:`None`, an empty dictionary is used.
+
+    .. attribute:: particle_distributions
+
+       A dictionary of :class:`Distribution` objects which are used to
+       generate arguments for particles' constructor methods.  When
+       particles are created, each distribution generates values for
+       all of them at once, which is much faster than calling functions
+       in :attr:`particle_lambda_args` and
+       :attr:`particle_lambda_kwargs` for each particle.  Values
+       generated by distributions take precedence over values from
+       other attributes.
+
+       Each key is the argument to set: an integer sets the
+       corresponding index of :attr:`particle_args` and a string sets
+       the corresponding key of :attr:`particle_kwargs`.  For
+       distributions of points, such as :class:`Ring`, the key must be
+       a tuple of two such keys for the horizontal and vertical
+       positions, for example ``(0, 1)`` to set the first two ordered
+       arguments.
+
+       If set to :const:`None`, an empty dictionary is used.
+
+    .. attribute:: particle_system
+
+       The :class:`ParticleSystem` to add particles to, or
+       :const:`None` to create particles of the class
+       :attr:`particle_cls` instead.  If this is set, the arguments
+       created from :attr:`particle_args`, :attr:`particle_kwargs`,
+       :attr:`particle_lambda_args`, and :attr:`particle_lambda_kwargs`
+       are passed to :meth:`ParticleSystem.emit` instead of a
+       particle's constructor method, and
+       :meth:`event_create_particle` is not called.
+
+    .. attribute:: pool_size
+
+       The largest number of expired particles the emitter keeps to
+       reuse for new particles instead of creating new objects.  When a
+       :class:`Particle` created by the emitter expires (see
+       :meth:`Particle.expire`), it is made inactive and invisible and
+       added to the pool if the pool is not full; otherwise, it is
+       destroyed.  Reused particles are reset with
+       :meth:`Particle.reset`, so :meth:`event_create` isn't called
+       for them.  Set to ``0`` to disable pooling.
+
+       Pooling is useful for emitters which constantly create
+       short-lived particles, since it avoids repeatedly creating and
+       destroying objects.
+
+    .. attribute:: budget
+
+       The :class:`ParticleBudget` which limits the particles created
+       by the emitter, or :const:`None` to not limit them.
+
+    .. attribute:: priority
+
+       How important the emitter's particles are to the
+       :class:`ParticleBudget` in :attr:`budget`, from ``0`` to ``1``.
+       The lower the priority, the more the emitter is throttled when
+       the budget is exceeded.  Emitters with a priority of ``1`` are
+       never throttled.
+
+    .. attribute:: cull_margin
+
+       If set to a number, the emitter is suspended while it is not
+       within this many pixels of any of the views of the current room.
+       A suspended emitter doesn't create particles until it comes back
+       into range.  Particles which have already been created are not
+       affected; to stop drawing them while they are out of view, set
+       :attr:`Particle.cull_margin` for them, for example with
+       :attr:`particle_kwargs`.  Set to :const:`None` to never suspend
+       the emitter.
+
+    .. attribute:: catch_up
+
+       The largest number of frames (adjusted for delta timing) of
+       particle creation the emitter makes up for when it stops being
+       suspended.  The particles it would have created during this
+       time are created and advanced as by :meth:`advance`.  Set to
+       ``0`` to continue where the emitter left off instead.
+
+    .. attribute:: prewarm
+
+       The number of seconds the emitter is advanced by with
+       :meth:`advance` when it is created, so that effects which are
+       meant to have been running already, such as smoke or snow,
+       don't start out empty.  Only the particles created during the
+       last part of this time which are still alive at the end matter,
+       so this should be about as long as the particles live.
+       Prewarming is fastest if the emitter adds particles to
+       :attr:`particle_system` with :attr:`particle_distributions`.
+
+    .. attribute:: particles_created
+
+       The number of particles the emitter has created as new objects.
+
+    .. attribute:: particles_reused
+
+       The number of particles the emitter has reused from its pool.
+
+    .. attribute:: particles_live
+
+       The number of :class:`Particle` objects created by the emitter
+       which currently exist, not counting particles in the emitter's
+       pool.  Particles added to :attr:`particle_system` and objects
+       which aren't :class:`Particle` objects aren't counted.  This
+       attribute is read-only.
+
+    .. attribute:: particles_dropped
+
+       The number of particles the emitter would have created if
+       :attr:`budget` hadn't throttled it.
+
+    .. attribute:: suspended
+
+       Whether or not the emitter is suspended (see
+       :attr:`cull_margin`).  This attribute is read-only.
+
+    .. attribute:: pooled
+
+       The number of particles currently in the emitter's pool.  This
+       attribute is read-only.
     """
 
+    @property
+    def pooled(self):
+        return len(self._pool)
+
+    @property
+    def particles_live(self):
+        return len(self._particles)
+
+    @property
+    def suspended(self):
+        return self._suspended_frames is not None
+
+    @property
+    def budget(self):
+        return self.__budget
+
+    @budget.setter
+    def budget(self, value):
+        if self.__budget is not None:
+            self.__budget._emitters.remove(self)
+        self.__budget = value
+        if value is not None:
+            value._emitters.append(self)
+
     @property
     def interval(self):
         return self.__interval
@@ -282,12 +1287,28 @@ class Emitter(sge.dsp.Object):
     @interval.setter
     def interval(self, value):
         self.__interval = value
-        self.alarms["__emitter"] = min(value, self.alarms["__emitter"])
+        if "__emitter" in self.alarms:
+            self.alarms["__emitter"] = min(value, self.alarms["__emitter"])
+
+    @property
+    def rate(self):
+        return self.__rate
+
+    @rate.setter
+    def rate(self, value):
+        self.__rate = value
+        if value is not None:
+            self.alarms.pop("__emitter", None)
+        elif self._open and "__emitter" not in self.alarms:
+            self.alarms["__emitter"] = self.interval
 
     def __init__(self, x, y, z=0, interval=1, chance=1, particle_cls=Particle,
                  particle_args=None, particle_kwargs=None,
                  particle_lambda_args=None, particle_lambda_kwargs=None,
-                 tangible=False, **kwargs):
+                 particle_distributions=None, particle_system=None,
+                 pool_size=0, rate=None, budget=None, priority=0,
+                 cull_margin=None, catch_up=0, prewarm=0, tangible=False,
+                 **kwargs):
         """
         Arguments set the respective initial attributes of the object.
         See the documentation for :class:`Emitter` for more information.
@@ -298,39 +1319,334 @@ class Emitter(sge.dsp.Object):
         """
         super(Emitter, self).__init__(x, y, z=z, tangible=tangible, **kwargs)
         self.__interval = interval
+        self.__rate = rate
         self.chance = chance
         self.particle_cls = particle_cls
         self.particle_args = particle_args
         self.particle_kwargs = particle_kwargs
         self.particle_lambda_args = particle_lambda_args
         self.particle_lambda_kwargs = particle_lambda_kwargs
+        self.particle_distributions = particle_distributions
+        self.particle_system = particle_system
+        self.pool_size = pool_size
+        self.priority = priority
+        self.cull_margin = cull_margin
+        self.catch_up = catch_up
+        self.prewarm = prewarm
+        self.particles_created = 0
+        self.particles_reused = 0
+        self.particles_dropped = 0
+        self._particles = set()
+        self._pool = []
+        self._open = False
+        self._accumulator = 0
+        self._allowance = 0
+        self._bursts = []
+        self._suspended_frames = None
+        self._advancing = False
+        self.__budget = None
+        self.budget = budget
+
+    def emit(self, number=1):
+        """
+        Create particles immediately.  Each particle is created with
+        a probability of :attr:`chance`.
 
-    def event_create(self):
-        super(Emitter, self).event_create()
-        self.alarms["__emitter"] = self.interval
+        Arguments:
 
-    def event_alarm(self, alarm_id):
-        if alarm_id == "__emitter":
-            if random.random() < self.chance:
+        - ``number`` -- The number of particles to create.
+        """
+        self._emit(number)
+
+    def _emit(self, number):
+        # Create particles as described in emit and return a list of
+        # the Particle objects created.
+        particles = []
+        # Chance is applied first so that the budget is only charged for
+        # particles which are actually created, and so that
+        # distributions can generate values for all of them at once.
+        if self.chance < 1:
+            number = sum(1 for j in six.moves.range(number)
+                         if random.random() < self.chance)
+
+        budget = self.__budget
+        if budget is not None:
+            number = budget._allow(self, number)
+            life_scale = budget._get_life_scale(self)
+        else:
+            life_scale = 1
+
+        distributions = self.particle_distributions
+        if distributions:
+            samples = [(key, distributions[key].sample(self, number))
+                       for key in distributions]
+
+            if (self.particle_system is not None and
+                    not self.particle_lambda_args and
+                    not self.particle_lambda_kwargs):
+                # All of the particles can be added to the particle
+                # system at once.
                 args = (self.particle_args or [])[:]
                 kwargs = (self.particle_kwargs or {}).copy()
+                for key, values in samples:
+                    if isinstance(key, tuple):
+                        _set_argument(args, kwargs, key[0], values[0])
+                        _set_argument(args, kwargs, key[1], values[1])
+                    else:
+                        _set_argument(args, kwargs, key, values)
+                self.particle_system.emit_many(number, *args, **kwargs)
+                return particles
+
+        for j in six.moves.range(number):
+            args = (self.particle_args or [])[:]
+            kwargs = (self.particle_kwargs or {}).copy()
+
+            if self.particle_lambda_args:
+                while len(self.particle_lambda_args) > len(args):
+                    args.append(None)
+
+                for i in six.moves.range(len(self.particle_lambda_args)):
+                    f = self.particle_lambda_args[i]
+                    if f is not None:
+                        args[i] = f(self)
+
+            if self.particle_lambda_kwargs:
+                for i in self.particle_lambda_kwargs:
+                    f = self.particle_lambda_kwargs[i]
+                    kwargs[i] = f(self)
+
+            if distributions:
+                for key, values in samples:
+                    if isinstance(key, tuple):
+                        _set_argument(args, kwargs, key[0], values[0][j])
+                        _set_argument(args, kwargs, key[1], values[1][j])
+                    else:
+                        _set_argument(args, kwargs, key, values[j])
+
+            if self.particle_system is not None:
+                self.particle_system.emit(*args, **kwargs)
+            else:
+                if self._pool:
+                    particle = self._pool.pop()
+                    particle._pooled = False
+                    particle.reset(*args, **kwargs)
+                    self.particles_reused += 1
+                    self._particles.add(particle)
+                    particles.append(particle)
+                else:
+                    particle = self.particle_cls.create(*args, **kwargs)
+                    self.particles_created += 1
+                    if isinstance(particle, Particle):
+                        particle.emitter = self
+                        self._particles.add(particle)
+                        particles.append(particle)
+
+                if (life_scale != 1 and isinstance(particle, TimedParticle)
+                        and particle.life is not None):
+                    particle.life *= life_scale
 
-                if self.particle_lambda_args:
-                    while len(self.particle_lambda_args) > len(args):
-                        args.append(None)
+                self.event_create_particle(particle)
 
-                    for i in six.moves.range(len(self.particle_lambda_args)):
-                        f = self.particle_lambda_args[i]
-                        if f is not None:
-                            args[i] = f(self)
+        return particles
 
-                if self.particle_lambda_kwargs:
-                    for i in self.particle_lambda_kwargs:
-                        f = self.particle_lambda_kwargs[i]
-                        kwargs[i] = f(self)
+    def add_burst(self, number, delay=0, interval=None, repeat=None):
+        """
+        Schedule a burst of particles to be created later, once or
+        repeatedly.  Bursts are created in :meth:`event_step`.
 
-                particle = self.particle_cls.create(*args, **kwargs)
-                self.event_create_particle(particle)
+        Arguments:
+
+        - ``number`` -- The number of particles to create in the burst.
+        - ``delay`` -- The number of frames (adjusted for delta timing)
+          to wait before the first burst.
+        - ``interval`` -- The number of frames (adjusted for delta
+          timing) to wait in between bursts, or :const:`None` to only
+          create the burst once.
+        - ``repeat`` -- The number of times to repeat the burst after
+          the first burst, or :const:`None` to repeat it until
+          :meth:`clear_bursts` is called.  Ignored if ``interval`` is
+          :const:`None`.
+        """
+        if interval is None:
+            self._bursts.append([delay, number, 0, 1])
+        elif interval > 0:
+            count = repeat + 1 if repeat is not None else None
+            self._bursts.append([delay, number, interval, count])
+        else:
+            raise ValueError("interval must be greater than 0")
+
+    def clear_bursts(self):
+        """Cancel all bursts scheduled by :meth:`add_burst`."""
+        del self._bursts[:]
+
+    def advance(self, frames):
+        """
+        Advance the emitter and the particles it created by a number of
+        frames at once, without running the SGE's game loop.  The
+        :class:`Particle` objects the emitter created are advanced with
+        :meth:`Particle.advance`, and particles the emitter would have
+        created during this time (at :attr:`interval`, at
+        :attr:`rate`, and in bursts) are created and then advanced by
+        the time that would have passed since they were created.
+
+        Particles added to :attr:`particle_system` are all added at
+        once and advanced in a single update of the system, which is
+        much faster, but particles which were already in the system
+        aren't advanced.
+
+        Arguments:
+
+        - ``frames`` -- The number of frames (adjusted for delta
+          timing) to advance the emitter by.
+        """
+        # Particles which expire in the meantime are always added to
+        # the pool, so that they are reused for the particles created
+        # later instead of being destroyed and created again.
+        self._advancing = True
+        for particle in list(self._particles):
+            particle.advance(frames)
+
+        self._advance_emission(frames)
+
+    def _advance_emission(self, frames):
+        # Create the particles the emitter would have created in the
+        # last ``frames`` frames, advanced by the time since then.
+        self._advancing = True
+        system = self.particle_system
+        ages = []
+        timed = self.rate is None
+        alarm = self.alarms.get("__emitter", self.interval)
+        remaining = frames
+        while remaining > 0:
+            delta_mult = min(1, remaining)
+            remaining -= delta_mult
+            number = self._get_number(delta_mult)
+            if timed:
+                alarm -= delta_mult
+                if alarm <= 0:
+                    alarm = self.interval
+                    number += 1
+
+            if number:
+                if system is not None:
+                    ages.extend([remaining] * number)
+                else:
+                    for particle in self._emit(number):
+                        particle.advance(remaining)
+
+        if timed:
+            self.alarms["__emitter"] = alarm
+
+        if ages:
+            start = system.count
+            self._emit(len(ages))
+            created = system.count - start
+            if created < len(ages):
+                # Some particles weren't created because of chance or
+                # the budget, which affect all of them alike.
+                ages = random.sample(ages, created)
+            system._age(start, ages)
+
+        self._advancing = False
+        while len(self._pool) > self.pool_size:
+            particle = self._pool.pop()
+            particle._pooled = False
+            particle.destroy()
+
+    def _recycle(self, particle):
+        # Add an expired particle to the pool and return True, or return
+        # False if the pool is full.
+        if (not self._open or
+                (len(self._pool) >= self.pool_size and not self._advancing)):
+            return False
+
+        particle.active = False
+        particle.visible = False
+        particle.alarms.clear()
+        particle._pooled = True
+        self._pool.append(particle)
+        self._particles.discard(particle)
+        return True
+
+    def _get_number(self, delta_mult):
+        # Return the number of particles to create at rate and in
+        # bursts in a frame.
+        number = 0
+        if self.rate is not None:
+            self._accumulator += self.rate * delta_mult / sge.game.fps
+            n = int(self._accumulator)
+            self._accumulator -= n
+            number += n
+
+        if self._bursts:
+            # Each burst is a list of the time until the next burst, the
+            # number of particles, the interval, and the number of
+            # bursts left (None for unlimited).
+            bursts = []
+            for burst in self._bursts:
+                burst[0] -= delta_mult
+                while burst[0] <= 0 and burst[3] != 0:
+                    number += burst[1]
+                    if burst[3] is not None:
+                        burst[3] -= 1
+                    burst[0] += burst[2]
+
+                if burst[3] != 0:
+                    bursts.append(burst)
+            self._bursts[:] = bursts
+
+        return number
+
+    def _resume(self):
+        # Resume creating particles and catch up with the time passed.
+        frames = min(self._suspended_frames, self.catch_up)
+        self._suspended_frames = None
+        if frames > 0:
+            self._advance_emission(frames)
+
+    def event_create(self):
+        super(Emitter, self).event_create()
+        if self.rate is None:
+            self.alarms["__emitter"] = self.interval
+        self._open = True
+        if self.prewarm:
+            self.advance(self.prewarm * sge.game.fps)
+
+    def event_destroy(self):
+        super(Emitter, self).event_destroy()
+        self._open = False
+        pool = self._pool
+        self._pool = []
+        for particle in pool:
+            particle._pooled = False
+            particle.emitter = None
+            particle.destroy()
+
+        self.budget = None
+
+    def event_step(self, time_passed, delta_mult):
+        super(Emitter, self).event_step(time_passed, delta_mult)
+        if self.cull_margin is not None:
+            if _in_views((self.x, self.y, self.x, self.y),
+                         self.cull_margin):
+                if self._suspended_frames is not None:
+                    self._resume()
+            else:
+                if self._suspended_frames is None:
+                    self._suspended_frames = 0
+                self._suspended_frames += delta_mult
+                return
+        elif self._suspended_frames is not None:
+            self._resume()
+
+        number = self._get_number(delta_mult)
+        if number:
+            self.emit(number)
+
+    def event_alarm(self, alarm_id):
+        if alarm_id == "__emitter" and self.rate is None:
+            if self._suspended_frames is None:
+                self.emit()
 
             self.alarms["__emitter"] = self.interval
 
@@ -344,3 +1660,210 @@ class Emitter(sge.dsp.Object):
         """
         pass
 
+
+class ParticleBudget(sge.dsp.Object):
+
+    """
+    Class for objects which limit the number of particles created by
+    emitters in a room.  Emitters are limited by a budget if their
+    :attr:`Emitter.budget` attribute is set to the budget, and the
+    budget must be in the room to take effect.
+
+    Each frame, the budget checks whether the number of particles
+    created by its emitters (see :attr:`count`) has reached 90% of
+    :attr:`max_particles`, or whether the average time each frame takes
+    is longer than :attr:`target_frame_time`.  If so, :attr:`pressure`
+    is raised; otherwise, it is lowered.  The higher the pressure and
+    the lower the :attr:`Emitter.priority` of an emitter, the fewer of
+    the particles the emitter would create are actually created, and
+    the shorter the lives of :class:`TimedParticle` objects it creates
+    are.  In addition, emitters with a priority lower than ``1`` can't
+    create particles at all while the count is at
+    :attr:`max_particles`.  Particles which aren't created because of
+    the budget are counted by :attr:`Emitter.particles_dropped` and
+    :attr:`particles_dropped`; see also :meth:`get_report`.
+
+    .. attribute:: max_particles
+
+       The largest number of particles the budget's emitters are meant
+       to have at once, or :const:`None` for no limit.
+
+    .. attribute:: target_frame_time
+
+       The longest average time in milliseconds each frame is meant to
+       take, or :const:`None` for no limit.  Since the frame rate is
+       limited to :attr:`sge.game.fps`, this should be somewhat longer
+       than ``1000 / sge.game.fps``.
+
+    .. attribute:: adjust_rate
+
+       How much :attr:`pressure` is raised or lowered each frame
+       (adjusted for delta timing).
+
+    .. attribute:: min_life_scale
+
+       The fraction of their lives that :class:`TimedParticle` objects
+       created by emitters with a priority of ``0`` live for when
+       :attr:`pressure` is ``1``.
+
+    .. attribute:: pressure
+
+       How much emitters are throttled, from ``0`` (not at all) to
+       ``1`` (as much as possible).  At a pressure of ``1``, emitters
+       with a priority of ``0`` don't create any particles.
+
+    .. attribute:: frame_time
+
+       The average time in milliseconds each frame has taken recently.
+       This attribute is read-only.
+
+    .. attribute:: count
+
+       The number of particles created by the budget's emitters which
+       currently exist, as of the start of the current frame.  This
+       is the total of :attr:`Emitter.particles_live` of the emitters
+       and :attr:`ParticleSystem.count` of their particle systems.
+       This attribute is read-only.
+
+    .. attribute:: particles_dropped
+
+       The total number of particles the budget has prevented its
+       emitters from creating.
+    """
+
+    @property
+    def frame_time(self):
+        return self._frame_time
+
+    @property
+    def count(self):
+        return self._count
+
+    def __init__(self, x=0, y=0, z=0, max_particles=None,
+                 target_frame_time=None, adjust_rate=0.02,
+                 min_life_scale=0.25, tangible=False, **kwargs):
+        """
+        Arguments set the respective initial attributes of the object.
+        See the documentation for :class:`ParticleBudget` for more
+        information.
+
+        ``x``, ``y``, ``z``, ``tangible``, and all arguments passed to
+        ``kwargs`` are passed as the corresponding arguments to the
+        constructor method of :class:`sge.dsp.Object`.
+        """
+        kwargs.setdefault("visible", False)
+        kwargs.setdefault("checks_collisions", False)
+        super(ParticleBudget, self).__init__(x, y, z=z, tangible=tangible,
+                                             **kwargs)
+        self.max_particles = max_particles
+        self.target_frame_time = target_frame_time
+        self.adjust_rate = adjust_rate
+        self.min_life_scale = min_life_scale
+        self.pressure = 0
+        self.particles_dropped = 0
+        self._frame_time = None
+        self._count = 0
+        self._emitters = []
+
+    def get_report(self):
+        """
+        Return a list of the emitters limited by the budget as tuples
+        in the form ``(emitter, live, dropped)``, where ``live`` is
+        :attr:`Emitter.particles_live` and ``dropped`` is
+        :attr:`Emitter.particles_dropped`.
+        """
+        return [(emitter, emitter.particles_live, emitter.particles_dropped)
+                for emitter in self._emitters]
+
+    def event_step(self, time_passed, delta_mult):
+        super(ParticleBudget, self).event_step(time_passed, delta_mult)
+        if self._frame_time is None:
+            self._frame_time = time_passed
+        else:
+            self._frame_time += (time_passed - self._frame_time) * 0.1
+
+        count = 0
+        systems = set()
+        for emitter in self._emitters:
+            count += emitter.particles_live
+            if emitter.particle_system is not None:
+                systems.add(emitter.particle_system)
+        for system in systems:
+            count += system.count
+        self._count = count
+
+        # Pressure is raised a little before the limit is reached so
+        # that emitters are throttled by priority rather than cut off.
+        if ((self.max_particles is not None and
+                count >= self.max_particles * 0.9) or
+                (self.target_frame_time is not None and
+                 self._frame_time > self.target_frame_time)):
+            self.pressure = min(
+                self.pressure + self.adjust_rate * delta_mult, 1)
+        else:
+            self.pressure = max(
+                self.pressure - self.adjust_rate * delta_mult, 0)
+
+    def _allow(self, emitter, number):
+        # Return how many of ``number`` particles ``emitter`` may
+        # create, and count the rest as dropped.
+        if emitter.priority >= 1:
+            self._count += number
+            return number
+
+        # Fractions of particles are accumulated so that throttled
+        # emitters still create particles at the throttled rate.
+        emitter._allowance += number * (1 - self.pressure *
+                                        (1 - emitter.priority))
+        allowed = int(emitter._allowance)
+        emitter._allowance -= allowed
+        if self.max_particles is not None:
+            allowed = max(0, min(allowed, self.max_particles - self._count))
+
+        self._count += allowed
+        dropped = number - allowed
+        emitter.particles_dropped += dropped
+        self.particles_dropped += dropped
+        return allowed
+
+    def _get_life_scale(self, emitter):
+        # Return the fraction of their lives that timed particles
+        # created by ``emitter`` live for.
+        if emitter.priority >= 1:
+            return 1
+        return 1 - ((1 - self.min_life_scale) * self.pressure *
+                    (1 - emitter.priority))
+
+
+def _in_views(bounds, margin):
+    # Return whether the rectangle ``bounds``, a tuple in the form
+    # ``(left, top, right, bottom)``, is within ``margin`` pixels of
+    # any of the views of the current room.
+    left, top, right, bottom = bounds
+    for view in sge.game.current_room.views:
+        if (right >= view.x - margin and
+                bottom >= view.y - margin and
+                left <= view.x + view.width + margin and
+                top <= view.y + view.height + margin):
+            return True
+    return False
+
+
+def _uniform(low, high, number):
+    # Return a list of ``number`` random numbers from ``low`` to
+    # ``high``.
+    if numpy is not None:
+        return numpy.random.uniform(low, high, number).tolist()
+    else:
+        return [random.uniform(low, high) for i in six.moves.range(number)]
+
+
+def _set_argument(args, kwargs, key, value):
+    # Set the ordered argument of index ``key`` in ``args`` or the
+    # keyword argument ``key`` in ``kwargs`` to ``value``.
+    if isinstance(key, six.integer_types):
+        while len(args) <= key:
+            args.append(None)
+        args[key] = value
+    else:
+        kwargs[key] = value
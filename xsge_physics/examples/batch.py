@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+
+# Batch simulation example
+# Written in 2026 by the xSGE developers
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to the
+# public domain worldwide. This software is distributed without any
+# warranty.
+#
+# You should have received a copy of the CC0 Public Domain Dedication
+# along with this software. If not, see
+# <http://creativecommons.org/publicdomain/zero/1.0/>.
+
+"""
+Headless batch simulation of levels for automated testing.
+
+Each run loads a TMX level with xsge_tmx, gives the player a scripted
+sequence of inputs generated from the run's seed, and steps the level
+without a display for a fixed number of frames.  Runs are independent
+of each other, so they are distributed across a pool of processes.  A
+run reaches the goal if the player touches an object called "goal" in
+the level, or, if there is no such object, if the right side of the
+player reaches the x position given with --goal-x.  A summary is
+printed at the end, and the trace of each run can be written to a file
+with one JSON object per line.  Example:
+
+    python batch.py --runs 1000 --jobs 8 --output traces.jsonl
+
+All frames of a run are simulated within a single frame of the SGE's
+game loop: the step events of the objects in the level are called
+directly, followed by xsge_physics.World.step, so nothing is drawn and
+no input is read.  Alarms and SGE collision events are not used.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sge
+import xsge_physics
+import xsge_tmx
+
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+WALK_ACCEL = 0.5
+WALK_SPEED = 5
+FRICTION = 0.25
+FALL_ACCEL = 0.25
+FALL_SPEED = 10
+JUMP_SPEED = 6
+SLIDE_ACCEL = 1
+SLIDE_SPEED = 2
+
+clock = getattr(time, "perf_counter", time.time)
+
+
+class Player(xsge_physics.Collider):
+
+    """
+    The player of platformer.py, controlled by :attr:`direction` and
+    :attr:`jump` instead of the keyboard.
+    """
+
+    direction = 0
+    jump = False
+    on_floor = False
+    on_slope = False
+
+    def event_step(self, time_passed, delta_mult):
+        self.on_floor = self.get_bottom_touching_wall()
+        self.on_slope = (not self.on_floor and self.get_bottom_touching_slope())
+
+        if self.jump and (self.on_floor or self.on_slope):
+            self.yvelocity = -JUMP_SPEED
+
+        self.xvelocity += self.direction * WALK_ACCEL
+
+        if self.xvelocity > FRICTION:
+            self.xvelocity -= FRICTION
+        elif self.xvelocity < -FRICTION:
+            self.xvelocity += FRICTION
+        else:
+            self.xvelocity = 0
+
+        if self.xvelocity > WALK_SPEED:
+            self.xvelocity = WALK_SPEED
+        elif self.xvelocity < -WALK_SPEED:
+            self.xvelocity = -WALK_SPEED
+
+        if self.on_slope:
+            if self.yvelocity > SLIDE_SPEED + SLIDE_ACCEL:
+                self.yvelocity -= SLIDE_ACCEL
+            elif self.yvelocity < SLIDE_SPEED - SLIDE_ACCEL:
+                self.yvelocity += SLIDE_ACCEL
+            else:
+                self.yvelocity = SLIDE_SPEED
+        elif not self.on_floor:
+            self.yvelocity += FALL_ACCEL
+
+            if self.yvelocity > FALL_SPEED:
+                self.yvelocity = FALL_SPEED
+
+    def event_physics_collision_left(self, other, move_loss):
+        if isinstance(other, xsge_physics.SolidRight):
+            self.xvelocity = 0
+
+    def event_physics_collision_right(self, other, move_loss):
+        if isinstance(other, xsge_physics.SolidLeft):
+            self.xvelocity = 0
+
+    def event_physics_collision_top(self, other, move_loss):
+        if isinstance(other, (xsge_physics.SolidBottom,
+                              xsge_physics.SlopeBottomLeft,
+                              xsge_physics.SlopeBottomRight)):
+            self.yvelocity = 0
+
+    def event_physics_collision_bottom(self, other, move_loss):
+        if isinstance(other, xsge_physics.SolidTop):
+            self.yvelocity = 0
+
+
+class Goal(sge.dsp.Object):
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("visible", False)
+        kwargs.setdefault("checks_collisions", False)
+        super(Goal, self).__init__(*args, **kwargs)
+
+
+class SlopeTopLeft(xsge_physics.SlopeTopLeft):
+
+    xsticky_top = True
+
+
+class SlopeTopRight(xsge_physics.SlopeTopRight):
+
+    xsticky_top = True
+
+
+TYPES = {"player": Player, "goal": Goal, "solid": xsge_physics.Solid,
+         "unisolid": xsge_physics.SolidTop, "slope_topleft": SlopeTopLeft,
+         "slope_topright": SlopeTopRight,
+         "slope_bottomleft": xsge_physics.SlopeBottomLeft,
+         "slope_bottomright": xsge_physics.SlopeBottomRight}
+
+
+class BatchRoom(sge.dsp.Room):
+
+    """
+    A room which simulates one run when it starts stepping, then starts
+    the room of the next run, or ends the game after the last run.
+    """
+
+    job = None
+    jobs = ()
+    results = None
+
+    def event_step(self, time_passed, delta_mult):
+        self.results.append(simulate(self, *self.job))
+        if self.jobs:
+            room = load_room(self.jobs[0], self.jobs[1:], self.results)
+            room.start()
+        else:
+            sge.game.end()
+
+
+def load_room(job, jobs, results):
+    room = xsge_tmx.load(job[0], cls=BatchRoom, types=TYPES)
+    room.job = job
+    room.jobs = jobs
+    room.results = results
+    return room
+
+
+def make_script(rng, frames):
+    """
+    Return a list of ``(direction, jump)`` inputs for each frame of a
+    run.  The player mostly walks right, sometimes stopping or turning
+    around, and presses the jump button at random.
+    """
+    script = []
+    while len(script) < frames:
+        direction = rng.choice((1, 1, 1, 0, -1))
+        for i in range(rng.randint(15, 60)):
+            script.append((direction, rng.random() < 0.05))
+
+    return script[:frames]
+
+
+def simulate(room, fname, seed, frames, goal_x, trace_interval):
+    players = [obj for obj in room.objects if isinstance(obj, Player)]
+    if not players:
+        raise ValueError("{0} has no player".format(fname))
+    player = players[0]
+    goals = [obj for obj in room.objects if isinstance(obj, Goal)]
+    if goal_x is None:
+        goal_x = room.width - 32
+
+    # Only objects with their own step events need to be stepped.
+    actors = [obj for obj in room.objects
+              if type(obj).event_step != sge.dsp.Object.event_step]
+    world = xsge_physics.World(room)
+    script = make_script(random.Random(seed), frames)
+    time_passed = 1000 / sge.game.fps
+
+    trace = []
+    goal_frame = None
+    fell = False
+    max_x = player.x
+    start_time = clock()
+    for frame in range(frames):
+        player.direction, player.jump = script[frame]
+        for obj in actors:
+            if obj.active:
+                obj.event_step(time_passed, 1)
+        world.step(1)
+
+        max_x = max(max_x, player.x)
+        if frame % trace_interval == 0:
+            trace.append((frame, round(player.x, 2), round(player.y, 2)))
+
+        if goal_frame is None:
+            if goals:
+                if any(player.collision(goal) for goal in goals):
+                    goal_frame = frame
+            elif player.bbox_right >= goal_x:
+                goal_frame = frame
+
+        if player.bbox_top > room.height:
+            fell = True
+            break
+
+    return {"level": fname, "seed": seed, "frames": frame + 1,
+            "goal_frame": goal_frame, "fell": fell, "max_x": max_x,
+            "time": clock() - start_time, "trace": trace}
+
+
+def run_jobs(jobs):
+    """
+    Run a list of jobs in one game and return a list of their results.
+    Each job is a tuple of the arguments of :func:`simulate` after
+    ``room``.
+    """
+    sge.dsp.Game(320, 240, fps=60, delta=False,
+                 collision_events_enabled=False,
+                 window_text="xsge_physics batch simulation")
+    results = []
+    sge.game.start_room = load_room(jobs[0], jobs[1:], results)
+    sge.game.start()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run headless batch simulations of levels.")
+    parser.add_argument("levels", nargs="*", metavar="level",
+                        help="TMX files to simulate (default: data/level.tmx)")
+    parser.add_argument("-n", "--runs", type=int, default=100,
+                        help="number of runs of each level")
+    parser.add_argument("-f", "--frames", type=int, default=1800,
+                        help="maximum number of frames to run each run for")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="seed of the first run; later runs count up")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="number of processes (default: number of CPUs)")
+    parser.add_argument("-c", "--chunk", type=int, default=25,
+                        help="number of runs simulated by each process")
+    parser.add_argument("-g", "--goal-x", type=float,
+                        help=("x position to reach in levels without a goal "
+                              "object (default: 32 pixels from the right "
+                              "edge of the level)"))
+    parser.add_argument("-t", "--trace-interval", type=int, default=10,
+                        help="number of frames between trace points")
+    parser.add_argument("-o", "--output",
+                        help="file to write the results of all runs to")
+    options = parser.parse_args()
+
+    levels = options.levels or [os.path.join(DATA, "level.tmx")]
+    for fname in levels:
+        if not os.path.isfile(fname):
+            parser.error("no such file: {0}".format(fname))
+    jobs = [(fname, options.seed + i, options.frames, options.goal_x,
+             max(1, options.trace_interval))
+            for fname in levels for i in range(options.runs)]
+    chunk = max(1, options.chunk)
+    chunks = [jobs[i:(i + chunk)] for i in range(0, len(jobs), chunk)]
+
+    # Each process runs one chunk in its own game, since a game can
+    # only be started once.
+    start_time = clock()
+    pool = multiprocessing.Pool(options.jobs, maxtasksperchild=1)
+    try:
+        results = []
+        for chunk_results in pool.imap(run_jobs, chunks):
+            results.extend(chunk_results)
+    finally:
+        pool.close()
+        pool.join()
+    total_time = clock() - start_time
+
+    if options.output:
+        with open(options.output, "w") as f:
+            for result in results:
+                f.write(json.dumps(result, sort_keys=True))
+                f.write("\n")
+
+    for fname in levels:
+        level_results = [r for r in results if r["level"] == fname]
+        reached = sorted(r["goal_frame"] for r in level_results
+                         if r["goal_frame"] is not None)
+        fell = sum(1 for r in level_results if r["fell"])
+        print(fname)
+        print("  runs: {0}".format(len(level_results)))
+        print("  reached goal: {0} ({1:.1f}%)".format(
+            len(reached), 100 * len(reached) / len(level_results)))
+        if reached:
+            print("  frames to goal: min {0}, median {1}, max {2}".format(
+                reached[0], reached[len(reached) // 2], reached[-1]))
+        print("  fell out: {0}".format(fell))
+        print("  mean furthest x: {0:.1f}".format(
+            sum(r["max_x"] for r in level_results) / len(level_results)))
+
+    sim_time = sum(r["time"] for r in results)
+    print("simulated {0} frames in {1:.2f} s ({2:.2f} s of simulation "
+          "time)".format(sum(r["frames"] for r in results), total_time,
+                         sim_time))
+
+
+if __name__ == "__main__":
+    main()
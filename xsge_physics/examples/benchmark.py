@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+
+# Physics benchmark
+# Written in 2026 by the xSGE developers
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to the
+# public domain worldwide. This software is distributed without any
+# warranty.
+#
+# You should have received a copy of the CC0 Public Domain Dedication
+# along with this software. If not, see
+# <http://creativecommons.org/publicdomain/zero/1.0/>.
+
+"""
+Headless benchmark for xsge_physics.
+
+Each scenario builds a synthetic room, steps it for a fixed number of
+frames without a display, and prints a report of the time spent in the
+physics system each frame along with the counters recorded by
+xsge_physics.Profiler.  The simulation is deterministic for a given
+seed: the checksum printed at the end of each scenario only changes if
+the behavior of the physics system changes, which makes it possible to
+catch regressions between releases.  Example:
+
+    python benchmark.py --frames 1000 floor crowd
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import os
+import random
+import time
+import zlib
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sge
+import xsge_physics
+
+
+TILE = 32
+clock = getattr(time, "perf_counter", time.time)
+
+
+class Walker(xsge_physics.Collider):
+
+    """
+    A collider which walks back and forth, turning around at walls.  If
+    it has gravity, it jumps at random while standing on the ground;
+    otherwise, it bounces off of walls in all directions.
+    """
+
+    def __init__(self, x, y, rng, gravity=0.5, jump_chance=0.02, **kwargs):
+        kwargs.setdefault("bbox_width", 16)
+        kwargs.setdefault("bbox_height", 16)
+        kwargs.setdefault("checks_collisions", False)
+        super(Walker, self).__init__(x, y, **kwargs)
+        self.rng = rng
+        self.yacceleration = gravity
+        self.jump_chance = jump_chance
+
+    def think(self):
+        if (self.yacceleration and self.rng.random() < self.jump_chance and
+                (self.get_bottom_touching_wall() or
+                 self.get_bottom_touching_slope())):
+            self.yvelocity = -8
+
+    def event_physics_collision_left(self, other, move_loss):
+        self.xvelocity = abs(self.xvelocity)
+
+    def event_physics_collision_right(self, other, move_loss):
+        self.xvelocity = -abs(self.xvelocity)
+
+    def event_physics_collision_top(self, other, move_loss):
+        self.yvelocity = abs(self.yvelocity) if not self.yacceleration else 0
+
+    def event_physics_collision_bottom(self, other, move_loss):
+        if self.yacceleration:
+            self.yvelocity = 0
+        else:
+            self.yvelocity = -abs(self.yvelocity)
+
+
+class Platform(xsge_physics.SolidTop, xsge_physics.MobileWall):
+
+    """
+    A platform which carries colliders standing on it, reversing
+    direction every ``period`` frames.
+    """
+
+    sticky_top = True
+
+    def __init__(self, x, y, xvelocity, yvelocity, period, **kwargs):
+        kwargs.setdefault("bbox_width", TILE * 3)
+        kwargs.setdefault("bbox_height", TILE // 2)
+        kwargs.setdefault("checks_collisions", False)
+        super(Platform, self).__init__(x, y, **kwargs)
+        self.xvelocity = xvelocity
+        self.yvelocity = yvelocity
+        self.period = period
+        self.timer = period
+
+    def think(self):
+        self.timer -= 1
+        if self.timer <= 0:
+            self.timer = self.period
+            self.xvelocity = -self.xvelocity
+            self.yvelocity = -self.yvelocity
+
+
+class Crate(xsge_physics.SolidTop, xsge_physics.MobileColliderWall):
+
+    """
+    A falling crate which can be stacked and carries whatever rests on
+    top of it.
+    """
+
+    sticky_top = True
+
+    def __init__(self, x, y, **kwargs):
+        kwargs.setdefault("bbox_width", 24)
+        kwargs.setdefault("bbox_height", 16)
+        kwargs.setdefault("checks_collisions", False)
+        super(Crate, self).__init__(x, y, **kwargs)
+        self.yacceleration = 0.5
+
+    def think(self):
+        pass
+
+    def event_physics_collision_top(self, other, move_loss):
+        self.yvelocity = max(self.yvelocity, 0)
+
+    def event_physics_collision_bottom(self, other, move_loss):
+        self.yvelocity = min(self.yvelocity, 0)
+
+
+class BenchmarkRoom(sge.dsp.Room):
+
+    """
+    A room which updates its physics objects itself, in a fixed order,
+    so that the simulation is deterministic and only the time spent in
+    the physics system is measured.
+    """
+
+    def __init__(self, name, objects, options, next_scenarios, **kwargs):
+        self.name = name
+        self.options = options
+        self.next_scenarios = next_scenarios
+        self.frame = 0
+        self.colliders = [obj for obj in objects
+                          if isinstance(obj, xsge_physics.Collider)]
+        self.mobile_walls = [obj for obj in objects
+                             if isinstance(obj, xsge_physics.MobileWall)]
+        self.walls = [obj for obj in objects
+                      if isinstance(obj, xsge_physics.Wall)]
+
+        for obj in self.colliders:
+            obj.active = False
+            obj.swept_collision = options.swept
+            if options.coarse:
+                obj.activation_mode = "coarse"
+        for obj in self.mobile_walls:
+            obj.active = False
+
+        super(BenchmarkRoom, self).__init__(objects, **kwargs)
+
+        self.world = None
+        if options.world:
+            # World only updates active objects.  The objects don't do
+            # anything else in the game loop, since the room calls their
+            # think methods itself.
+            for obj in self.colliders + self.mobile_walls:
+                obj.active = True
+            self.world = xsge_physics.World(self)
+
+        if options.region is not None:
+            xsge_physics.ActivationRegion(self, options.region)
+
+        self.profiler = xsge_physics.Profiler(max_frames=None)
+
+    def event_room_start(self):
+        self.profiler.start()
+
+    def event_step(self, time_passed, delta_mult):
+        if self.frame >= self.options.frames:
+            self.finish()
+            return
+
+        self.frame += 1
+        for obj in self.mobile_walls:
+            obj.think()
+        for obj in self.colliders:
+            obj.think()
+
+        start_time = clock()
+        if self.world is not None:
+            self.world.step(delta_mult)
+        else:
+            for obj in self.mobile_walls + self.colliders:
+                obj.event_update_position(delta_mult)
+
+        self.profiler.count("frame_time", clock() - start_time)
+        self.profiler.next_frame()
+
+    def finish(self):
+        self.profiler.stop()
+        total = sum(self.profiler.get_values("frame_time"))
+        if self.options.exact:
+            fmt = "{0!r},{1!r}"
+        else:
+            fmt = "{0:.3f},{1:.3f}"
+        positions = ";".join(fmt.format(obj.x, obj.y)
+                             for obj in self.colliders + self.mobile_walls)
+        checksum = zlib.crc32(positions.encode("ascii")) & 0xffffffff
+
+        print("{0}: {1} colliders, {2} walls".format(
+            self.name, len(self.colliders), len(self.walls)))
+        print(self.profiler.report())
+        print("physics frames per second: {0:.1f}".format(
+            self.frame / total if total else float("inf")))
+        print("checksum: {0:08x}".format(checksum))
+        print()
+
+        if self.next_scenarios:
+            create_room(self.next_scenarios, self.options).start()
+        else:
+            sge.game.end()
+
+
+def make_box(width, height):
+    # Return solid tiles lining the edges of a room of the given size.
+    walls = []
+    for x in range(0, width, TILE):
+        walls.append(xsge_physics.Solid(x, 0, bbox_width=TILE,
+                                        bbox_height=TILE))
+        walls.append(xsge_physics.Solid(x, height - TILE, bbox_width=TILE,
+                                        bbox_height=TILE))
+    for y in range(TILE, height - TILE, TILE):
+        walls.append(xsge_physics.Solid(0, y, bbox_width=TILE,
+                                        bbox_height=TILE))
+        walls.append(xsge_physics.Solid(width - TILE, y, bbox_width=TILE,
+                                        bbox_height=TILE))
+    return walls
+
+
+def make_walkers(rng, n, left, top, right, bottom, **kwargs):
+    # Return ``n`` walkers placed at random within the given area.
+    walkers = []
+    for i in range(n):
+        walker = Walker(rng.uniform(left, right - 16),
+                        rng.uniform(top, bottom - 16),
+                        random.Random(rng.random()), **kwargs)
+        walker.xvelocity = rng.choice([-1, 1]) * rng.uniform(1, 4)
+        walkers.append(walker)
+    return walkers
+
+
+def scenario_floor(rng, scale):
+    width = 2048
+    height = 480
+    objects = make_box(width, height)
+    objects.extend(make_walkers(rng, int(200 * scale), TILE, TILE,
+                                width - TILE, height - TILE))
+    return objects, width, height
+
+
+def scenario_slopes(rng, scale):
+    width = 2048
+    height = 320
+    objects = make_box(width, height)
+
+    # Hills along the floor and upside-down hills along the ceiling,
+    # using all four slope orientations.
+    for x in range(TILE, width - TILE * 3, TILE * 4):
+        objects.append(xsge_physics.SlopeTopLeft(
+            x, height - TILE * 2, bbox_width=TILE, bbox_height=TILE))
+        objects.append(xsge_physics.SlopeTopRight(
+            x + TILE, height - TILE * 2, bbox_width=TILE, bbox_height=TILE))
+        objects.append(xsge_physics.SlopeBottomLeft(
+            x + TILE * 2, TILE, bbox_width=TILE, bbox_height=TILE))
+        objects.append(xsge_physics.SlopeBottomRight(
+            x + TILE * 3, TILE, bbox_width=TILE, bbox_height=TILE))
+
+    walkers = make_walkers(rng, int(200 * scale), TILE, TILE * 2,
+                           width - TILE, height - TILE * 2)
+    for walker in walkers:
+        walker.slope_acceleration = rng.choice([0, 1])
+    objects.extend(walkers)
+    return objects, width, height
+
+
+def scenario_platforms(rng, scale):
+    width = 2048
+    height = 640
+    objects = make_box(width, height)
+    for i in range(int(40 * scale)):
+        x = rng.uniform(TILE * 4, width - TILE * 8)
+        y = rng.uniform(TILE * 4, height - TILE * 4)
+        if i % 2:
+            platform = Platform(x, y, rng.uniform(1, 3), 0,
+                                rng.randint(30, 90))
+        else:
+            platform = Platform(x, y, 0, rng.uniform(1, 3),
+                                rng.randint(30, 90))
+        objects.append(platform)
+        objects.extend(make_walkers(rng, 3, x, y - 20, x + TILE * 3,
+                                    y - 4, jump_chance=0.005))
+    return objects, width, height
+
+
+def scenario_cargo(rng, scale):
+    width = 2048
+    height = 640
+    objects = make_box(width, height)
+    for i in range(int(20 * scale)):
+        x = TILE * 2 + i * TILE * 4
+        y = rng.uniform(height / 2, height - TILE * 2)
+        objects.append(Platform(x, y, 0, rng.uniform(1, 2),
+                                rng.randint(40, 80)))
+        for j in range(8):
+            objects.append(Crate(x + (j % 2) * 16, y - 16 * (j + 1)))
+        objects.extend(make_walkers(rng, 2, x, y - 16 * 9 - 20,
+                                    x + TILE * 3, y - 16 * 9 - 4,
+                                    jump_chance=0))
+    return objects, width, height
+
+
+def scenario_crowd(rng, scale):
+    width = 1024
+    height = 1024
+    objects = make_box(width, height)
+    walkers = make_walkers(rng, int(600 * scale), TILE, TILE, width - TILE,
+                           height - TILE, gravity=0)
+    for walker in walkers:
+        walker.yvelocity = rng.choice([-1, 1]) * rng.uniform(1, 4)
+    objects.extend(walkers)
+    return objects, width, height
+
+
+SCENARIOS = {"floor": scenario_floor, "slopes": scenario_slopes,
+             "platforms": scenario_platforms, "cargo": scenario_cargo,
+             "crowd": scenario_crowd}
+SCENARIO_ORDER = ["floor", "slopes", "platforms", "cargo", "crowd"]
+
+
+def create_room(scenarios, options):
+    # Return the room for the first of ``scenarios``.
+    name = scenarios[0]
+    rng = random.Random("{0}-{1}".format(options.seed, name))
+    objects, width, height = SCENARIOS[name](rng, options.scale)
+    if options.merge:
+        objects = xsge_physics.merge_walls(objects)
+
+    return BenchmarkRoom(name, objects, options, scenarios[1:], width=width,
+                         height=height, object_area_width=64,
+                         object_area_height=64)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run headless xsge_physics benchmarks.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help="scenarios to run: {0} (default: all)".format(
+                            ", ".join(SCENARIO_ORDER)))
+    parser.add_argument("-f", "--frames", type=int, default=300,
+                        help="number of frames to run each scenario for")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="seed for the random layout and behavior")
+    parser.add_argument("--scale", type=float, default=1,
+                        help="multiplier for the number of objects")
+    parser.add_argument("-w", "--world", action="store_true",
+                        help="update colliders with xsge_physics.World")
+    parser.add_argument("--swept", action="store_true",
+                        help="enable swept collision for all colliders")
+    parser.add_argument("-m", "--merge", action="store_true",
+                        help="merge walls with xsge_physics.merge_walls")
+    parser.add_argument("-r", "--region", type=int, metavar="MARGIN",
+                        help=("only update colliders within MARGIN pixels "
+                              "of the view, with "
+                              "xsge_physics.ActivationRegion"))
+    parser.add_argument("--coarse", action="store_true",
+                        help=("update colliders outside of the region "
+                              "coarsely instead of suspending them"))
+    parser.add_argument("-p", "--subpixels", type=int,
+                        help=("use fixed-point coordinates with SUBPIXELS "
+                              "steps per pixel"))
+    parser.add_argument("--no-kernel", action="store_true",
+                        help=("use pure Python code instead of the "
+                              "compiled collision kernel"))
+    parser.add_argument("--exact", action="store_true",
+                        help=("compute checksums from exact positions "
+                              "rather than positions rounded to three "
+                              "decimal places"))
+    options = parser.parse_args()
+    for name in options.scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario: {0}".format(name))
+    if options.subpixels is not None:
+        try:
+            xsge_physics.set_subpixels(options.subpixels)
+        except ValueError as e:
+            parser.error(e)
+    if options.no_kernel:
+        xsge_physics.set_kernel(False)
+
+    sge.dsp.Game(320, 240, fps=10000, delta=False,
+                 collision_events_enabled=False,
+                 window_text="xsge_physics benchmark")
+    sge.game.start_room = create_room(options.scenarios or SCENARIO_ORDER,
+                                      options)
+    sge.game.start()
+
+
+if __name__ == "__main__":
+    main()
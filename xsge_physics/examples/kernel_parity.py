@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+# Collision kernel parity check
+# Written in 2026 by the xSGE developers
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to the
+# public domain worldwide. This software is distributed without any
+# warranty.
+#
+# You should have received a copy of the CC0 Public Domain Dedication
+# along with this software. If not, see
+# <http://creativecommons.org/publicdomain/zero/1.0/>.
+
+"""
+Check that the compiled collision kernel of xsge_physics gives exactly
+the same results as the pure Python code it replaces.
+
+This runs every scenario of benchmark.py in several configurations,
+once with the compiled kernel and once without it (see
+xsge_physics.set_kernel), and compares the checksums of the exact
+positions of all objects at the end of each scenario.  Any arguments
+are passed on to benchmark.py.  The exit status is 1 if any checksums
+differ and 2 if the compiled kernel isn't available.  Example:
+
+    python kernel_parity.py --frames 100 --scale 0.5
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import xsge_physics
+
+
+BENCHMARK = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "benchmark.py")
+CONFIGURATIONS = [[], ["--merge"], ["--world"], ["--swept"],
+                  ["--subpixels", "256"], ["--region", "64", "--coarse"]]
+
+
+def get_checksums(args):
+    output = subprocess.check_output(
+        [sys.executable, BENCHMARK, "--exact"] + args,
+        universal_newlines=True)
+    return [line.split()[1] for line in output.splitlines()
+            if line.startswith("checksum:")]
+
+
+def main():
+    if not xsge_physics.get_kernel():
+        print("The compiled collision kernel is not available.")
+        sys.exit(2)
+
+    failed = False
+    for configuration in CONFIGURATIONS:
+        args = configuration + sys.argv[1:]
+        compiled = get_checksums(args)
+        python = get_checksums(args + ["--no-kernel"])
+        same = compiled == python
+        failed = failed or not same
+        print("{0}: {1}".format(" ".join(configuration) or "(default)",
+                                "ok" if same else "MISMATCH"))
+        if not same:
+            print("  compiled: {0}".format(" ".join(compiled)))
+            print("  python:   {0}".format(" ".join(python)))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
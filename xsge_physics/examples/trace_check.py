@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+# Physics trace check
+# Written in 2026 by the xSGE developers
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to the
+# public domain worldwide. This software is distributed without any
+# warranty.
+#
+# You should have received a copy of the CC0 Public Domain Dedication
+# along with this software. If not, see
+# <http://creativecommons.org/publicdomain/zero/1.0/>.
+
+"""
+Check that xsge_physics still moves colliders exactly as it used to.
+
+This steps a room with every kind of wall, slope, and mobile wall and
+a few dozen bouncing colliders, and compares a trace of the run with
+the reference trace in traces.txt, which was recorded with the
+original xsge_physics before any of the optimizations of version 0.14.
+For each frame, the trace records a checksum of the exact positions
+of all colliders and of the physics collision events called during
+the frame.  Only the parts of xsge_physics which existed originally
+are used, so the same script can record the trace with any version.
+
+Walls found at the same time are handled in the order they are found,
+which depends on the order of sets of objects and so changes from run
+to run.  To make traces comparable, objects are hashed by the order
+they were created in, walls found by a query are sorted in that order,
+and events are compared regardless of their order within a frame.
+
+The exit status is 1 if the traces differ.  Examples:
+
+    python trace_check.py
+    python trace_check.py --no-kernel
+    python trace_check.py --write traces.txt
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import zlib
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sge
+import xsge_physics
+
+
+TRACES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "traces.txt")
+FRAMES = 300
+COLLIDERS = 40
+
+events = []
+counter = itertools.count()
+object_init = sge.dsp.Object.__init__
+object_collision = sge.dsp.Object.collision
+
+
+def init(self, *args, **kwargs):
+    self.creation_order = next(counter)
+    object_init(self, *args, **kwargs)
+
+
+def collision(self, *args, **kwargs):
+    return sorted(object_collision(self, *args, **kwargs),
+                  key=lambda obj: obj.creation_order)
+
+
+sge.dsp.Object.__init__ = init
+sge.dsp.Object.__hash__ = lambda self: self.creation_order
+sge.dsp.Object.collision = collision
+
+if hasattr(xsge_physics, "WallIndex"):
+    index_query = xsge_physics.WallIndex._query
+
+    def query(self, *args, **kwargs):
+        return sorted(index_query(self, *args, **kwargs),
+                      key=lambda obj: obj.creation_order)
+
+    xsge_physics.WallIndex._query = query
+
+
+class Ball(xsge_physics.Collider):
+
+    def __init__(self, x, y, number, **kwargs):
+        super(Ball, self).__init__(x, y, **kwargs)
+        self.number = number
+
+    def event_physics_collision_left(self, other, move_loss):
+        events.append((self.number, "left", type(other).__name__,
+                       repr(move_loss)))
+        self.xvelocity = -self.xvelocity
+
+    def event_physics_collision_right(self, other, move_loss):
+        events.append((self.number, "right", type(other).__name__,
+                       repr(move_loss)))
+        self.xvelocity = -self.xvelocity
+
+    def event_physics_collision_top(self, other, move_loss):
+        events.append((self.number, "top", type(other).__name__,
+                       repr(move_loss)))
+        self.yvelocity = 0
+
+    def event_physics_collision_bottom(self, other, move_loss):
+        events.append((self.number, "bottom", type(other).__name__,
+                       repr(move_loss)))
+        self.yvelocity = 0
+
+
+class StickyTopLeft(xsge_physics.SlopeTopLeft):
+    xsticky_top = True
+
+
+class StickyTopRight(xsge_physics.SlopeTopRight):
+    xsticky_top = True
+
+
+class StickyBottomLeft(xsge_physics.SlopeBottomLeft):
+    xsticky_bottom = True
+    ysticky_left = True
+
+
+class StickyBottomRight(xsge_physics.SlopeBottomRight):
+    ysticky_right = True
+
+
+class Platform(xsge_physics.Solid, xsge_physics.MobileWall):
+
+    sticky_top = True
+
+    def __init__(self, x, y, **kwargs):
+        super(Platform, self).__init__(x, y, **kwargs)
+        self.timer = 0
+
+    def think(self):
+        self.timer += 1
+        self.xvelocity = 2 if (self.timer // 60) % 2 == 0 else -2
+        self.yvelocity = 1 if (self.timer // 45) % 2 == 0 else -1
+
+
+class MovingSlope(xsge_physics.SlopeTopRight, xsge_physics.MobileWall):
+
+    def think(self):
+        self.xvelocity = 1
+
+
+class Room(sge.dsp.Room):
+
+    def __init__(self, objects, movers, balls, **kwargs):
+        super(Room, self).__init__(objects, **kwargs)
+        self.movers = movers
+        self.balls = balls
+        self.trace = []
+
+    def event_step(self, time_passed, delta_mult):
+        if len(self.trace) >= FRAMES:
+            sge.game.end()
+            return
+
+        del events[:]
+        for obj in self.movers:
+            if hasattr(obj, "think"):
+                obj.think()
+        for obj in self.movers:
+            obj.event_update_position(1)
+
+        positions = ";".join("{0!r},{1!r}".format(ball.x, ball.y)
+                             for ball in self.balls)
+        happened = ";".join(",".join(str(v) for v in event)
+                            for event in sorted(events))
+        crc = zlib.crc32(positions.encode("ascii"))
+        crc = zlib.crc32(happened.encode("ascii"), crc)
+        self.trace.append("{0:08x}".format(crc & 0xffffffff))
+
+
+def make_box(width, height):
+    return sge.gfx.Sprite(width=width, height=height)
+
+
+def create_room():
+    rng = random.Random(1)
+    objects = []
+    tile = make_box(16, 16)
+    for i in range(50):
+        objects.append(xsge_physics.Solid(i * 16, 584, sprite=tile))
+        objects.append(xsge_physics.Solid(i * 16, 0, sprite=tile))
+    for j in range(1, 36):
+        objects.append(xsge_physics.Solid(0, j * 16, sprite=tile))
+        objects.append(xsge_physics.Solid(784, j * 16, sprite=tile))
+    for i in range(10):
+        objects.append(xsge_physics.SolidTop(200 + i * 16, 400, sprite=tile))
+        objects.append(xsge_physics.SolidBottom(500 + i * 16, 150,
+                                                sprite=tile))
+        objects.append(xsge_physics.SolidLeft(600, 200 + i * 16, sprite=tile))
+        objects.append(xsge_physics.SolidRight(100, 200 + i * 16,
+                                               sprite=tile))
+    for i in range(5):
+        objects.append(StickyTopLeft(300 + i * 32, 568 - i * 16,
+                                     sprite=make_box(32, 16)))
+        objects.append(StickyTopRight(100 + i * 32, 488 + i * 16,
+                                      sprite=make_box(32, 16)))
+        objects.append(StickyBottomLeft(620 + i * 16, 16 + i * 16,
+                                        sprite=make_box(16, 16)))
+        objects.append(StickyBottomRight(16 + i * 16, 96 - i * 16,
+                                         sprite=make_box(16, 16)))
+    objects.append(Platform(400, 300, sprite=make_box(48, 16)))
+    objects.append(MovingSlope(450, 250, sprite=make_box(32, 32)))
+
+    balls = []
+    for i in range(COLLIDERS):
+        sprite = make_box(rng.choice([8, 12, 16]), rng.choice([8, 16, 24]))
+        ball = Ball(rng.randint(40, 740), rng.randint(40, 540), i,
+                    sprite=sprite)
+        ball.xvelocity = rng.uniform(-6, 6)
+        ball.yvelocity = rng.uniform(-6, 6)
+        ball.yacceleration = rng.choice([0, 0.25])
+        ball.slope_acceleration = rng.choice([0, 0, 1])
+        balls.append(ball)
+        objects.append(ball)
+
+    # The room moves the colliders and mobile walls itself, in a fixed
+    # order, so the SGE doesn't update them.
+    movers = [obj for obj in objects
+              if isinstance(obj, (xsge_physics.Collider,
+                                  xsge_physics.MobileWall))]
+    for obj in movers:
+        obj.active = False
+
+    return Room(objects, movers, balls, object_area_width=64,
+                object_area_height=64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--no-kernel", action="store_true",
+                        help="don't use the compiled collision kernel")
+    parser.add_argument("--write", metavar="FILE",
+                        help="write the trace to FILE instead of checking it")
+    options = parser.parse_args()
+
+    if options.no_kernel:
+        xsge_physics.set_kernel(False)
+
+    sge.game = sge.dsp.Game(800, 600, fps=60, delta=False)
+    room = create_room()
+    sge.game.start_room = room
+    sge.game.start()
+
+    if options.write:
+        with open(options.write, "w") as f:
+            f.write("\n".join(room.trace) + "\n")
+        return
+
+    with open(TRACES) as f:
+        reference = f.read().split()
+
+    for i in range(max(len(reference), len(room.trace))):
+        expected = reference[i] if i < len(reference) else None
+        actual = room.trace[i] if i < len(room.trace) else None
+        if expected != actual:
+            print("Traces differ from frame {0}.".format(i + 1))
+            sys.exit(1)
+
+    print("Traces match ({0} frames).".format(len(room.trace)))
+
+
+if __name__ == "__main__":
+    main()
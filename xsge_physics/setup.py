@@ -4,7 +4,7 @@
 # information. This file is offered as-is, without any warranty.
 
 import sys
-from distutils.core import setup
+from distutils.core import setup, Extension
 
 long_description = """
 xSGE is a collection of extensions for the SGE licensed under the GNU
@@ -21,7 +21,7 @@ for other types of games.
 """.strip()
 
 setup(name="xsge_physics",
-      version="0.13.1",
+      version="0.14a0",
       description="xSGE Physics Framework",
       long_description=long_description,
       author="onpon4",
@@ -40,6 +40,8 @@ setup(name="xsge_physics",
       packages=["xsge_physics"],
       package_dir={"xsge_physics": "xsge_physics"},
       package_data={"xsge_physics": ["COPYING"]},
+      ext_modules=[Extension("xsge_physics._kernel",
+                             ["xsge_physics/_kernel.c"], optional=True)],
       requires=["sge (>=1.0, <2.0)"],
       provides=["xsge_physics"],
      )
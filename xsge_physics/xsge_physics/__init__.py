@@ -46,20 +46,57 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
-__version__ = "0.13.1"
+__version__ = "0.14a0"
 
+import array
+import collections
 import math
+import time
+import weakref
 
 import sge
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from xsge_physics import _kernel
+except ImportError:
+    _kernel = None
+
 
 __all__ = ["Collider", "Wall", "SolidLeft", "SolidRight", "SolidTop",
            "SolidBottom", "Solid", "SlopeTopLeft", "SlopeTopRight",
-           "SlopeBottomLeft", "SlopeBottomRight", "MobileWall"]
+           "SlopeBottomLeft", "SlopeBottomRight", "MobileWall", "WallIndex",
+           "World", "ActivationRegion", "Snapshot", "Hit", "Profiler",
+           "get_wall_index", "get_world", "get_activation_region",
+           "get_profiler", "set_subpixels", "get_subpixels", "set_kernel",
+           "get_kernel", "raycast", "boxcast", "merge_walls",
+           "merge_room_walls"]
 
 
 NDIG = 6
 
+_INF = float("inf")
+_NAN = float("nan")
+_wall_indexes = weakref.WeakKeyDictionary()
+_worlds = weakref.WeakKeyDictionary()
+_activation_regions = weakref.WeakKeyDictionary()
+_profiler = None
+_subpixels = None
+_clock = getattr(time, "perf_counter", time.time)
+
+# Maps slope classes to the values returned by _get_slope_kind for use
+# by the compiled kernel.  Classes are added by WallIndex.add.
+_slope_kinds = {}
+
+# Attributes of walls which merge_walls ignores by default, since they
+# are changed by merging or only affect how the walls are drawn.
+_MERGE_IGNORED = frozenset(("rd", "alarms", "xstart", "ystart", "xprevious",
+                            "yprevious", "z", "visible", "regulate_origin"))
+
 
 class Collider(sge.dsp.Object):
 
@@ -74,6 +111,15 @@ class Collider(sge.dsp.Object):
        attributes will work properly, but changing :attr:`x` and
        :attr:`y` manually will not cause any physics to occur.
 
+    .. note::
+
+       If the room has a :class:`World`, the world updates the position
+       of the collider instead of :meth:`event_update_position`.
+       :meth:`event_create` and :meth:`event_destroy` are used to add
+       the collider to and remove it from the world and to keep track
+       of whether it is in the room, so if you override these methods,
+       be sure to call the parent methods.
+
     .. attribute:: nonstick_left
     .. attribute:: nonstick_right
     .. attribute:: nonstick_top
@@ -94,6 +140,69 @@ class Collider(sge.dsp.Object):
        :attr:`yacceleration` by :meth:`event_update_position`.
 
        Default value: ``0``
+
+    .. attribute:: physics_mask
+
+       A bitfield of the physics layers the collider interacts with.
+       Walls whose :attr:`Wall.physics_layer` attributes have none of
+       these bits set are ignored entirely: they don't stop the
+       collider, don't execute physics collision events with it, and
+       don't push or carry it if they are mobile walls.  If you change
+       this attribute, mobile walls may push or carry the collider on
+       the next frame if it's inside or touching one of them.
+
+       Default value: ``-1`` (all layers)
+
+    .. attribute:: activation_mode
+
+       What to do when the room has an :class:`ActivationRegion` and
+       the collider is outside of it.  Can be one of the following:
+
+       - ``"suspend"`` -- Don't update the collider's position at all.
+       - ``"coarse"`` -- Update the collider's position only once every
+         :attr:`ActivationRegion.coarse_interval` frames, moving it as
+         far as it would have moved in all of those frames at once.
+         This keeps the collider moving at a fraction of the cost, but
+         it collides less accurately, so it can e.g. pass through thin
+         walls unless :attr:`swept_collision` is :const:`True`.
+       - ``"always"`` -- Update the collider's position normally.
+
+       Default value: ``"suspend"``
+
+    .. attribute:: swept_collision
+
+       Whether or not the collider's movement should be swept.  If set
+       to :const:`True`, :meth:`move_x` and :meth:`move_y` find the
+       first wall or slope the collider would pass completely through
+       with one query along the whole path of the movement, and limit
+       the movement so that the collider stops inside that wall rather
+       than passing through it.  The normal collision handling then
+       pushes the collider out of the wall as usual.  This prevents
+       fast-moving colliders (e.g. bullets) from passing through thin
+       walls without having to split their movement into smaller steps.
+
+       Default value: :const:`False`
+
+    .. attribute:: can_sleep
+
+       Whether or not the collider is allowed to sleep.  A collider is
+       asleep while its velocity and acceleration are zero and no slope
+       it is touching accelerates it; while it is asleep, updating its
+       position is skipped entirely, since it would have no effect.
+       It wakes up automatically as soon as any of these change, it is
+       moved (e.g. pushed by a :class:`MobileWall`), or a wall near it
+       changes.  Call :meth:`invalidate_contacts` to wake it up after
+       changing anything else that could affect it, such as the
+       :attr:`Slope.slope_xacceleration` value of a slope it is
+       touching.
+
+       Default value: :const:`True`
+
+    .. attribute:: sleeping
+
+       Whether or not the collider is currently asleep.  See the
+       documentation for :attr:`can_sleep` for more information.  This
+       attribute is read-only.
     """
 
     nonstick_left = False
@@ -101,6 +210,19 @@ class Collider(sge.dsp.Object):
     nonstick_top = False
     nonstick_bottom = False
     slope_acceleration = 0
+    physics_mask = -1
+    activation_mode = "suspend"
+    swept_collision = False
+    can_sleep = True
+    _contacts = None
+    _world = None
+    _broad_phase = None
+    _coarse = None
+    _room = None
+
+    @property
+    def sleeping(self):
+        return self._is_asleep()
 
     def move_x(self, move, absolute=False, do_events=True, exclude_events=()):
         """
@@ -120,18 +242,32 @@ class Collider(sge.dsp.Object):
           which should not cause collision events to be executed if
           collided with.
         """
+        if not move:
+            return
+
+        subpixels = _subpixels
+        if subpixels is not None:
+            move = _snap(move, subpixels)
+            if not move:
+                return
+
+        profiler = _profiler
+        if profiler is not None:
+            profiler._enter()
+
         exclude_events = set(exclude_events)
         exclude_events.add(None)
         sticky = False
         move_mult = 1
+        full_move = move
         old_x = self.x
         old_y = self.y
         old_bbox_left = self.bbox_left
         old_bbox_right = self.bbox_right
         old_bbox_top = self.bbox_top
         old_bbox_bottom = self.bbox_bottom
-        rold_bbox_top = round(old_bbox_top, NDIG)
-        rold_bbox_bottom = round(old_bbox_bottom, NDIG)
+        rold_bbox_top = _quantize(old_bbox_top)
+        rold_bbox_bottom = _quantize(old_bbox_bottom)
         on_floor = None
         on_ceil = None
 
@@ -165,227 +301,239 @@ class Collider(sge.dsp.Object):
 
         if move > 0:
             if not self.nonstick_bottom:
-                bbb = round(self.bbox_bottom, NDIG)
-                for slope in self.collision(SlopeTopRight, y=(self.y + 1)):
+                bbb = _quantize(self.bbox_bottom)
+                for slope in self._wall_collision(SlopeTopRight,
+                                                  y=(self.y + 1)):
                     if slope.xsticky_top:
-                        y = round(slope.get_slope_y(self.bbox_left), NDIG)
+                        y = _quantize(slope.get_slope_y(self.bbox_left))
                         if bbb == y:
                             sticky = 1
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_width / h
+                                move_mult = slope._get_geometry()[5]
                             break
                         elif (self.bbox_left <= slope.bbox_left and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 1
                             break
             if not sticky and not self.nonstick_top:
-                bbt = round(self.bbox_top, NDIG)
-                for slope in self.collision(SlopeBottomRight, y=(self.y - 1)):
+                bbt = _quantize(self.bbox_top)
+                for slope in self._wall_collision(SlopeBottomRight,
+                                                  y=(self.y - 1)):
                     if slope.xsticky_bottom:
-                        y = round(slope.get_slope_y(self.bbox_left), NDIG)
+                        y = _quantize(slope.get_slope_y(self.bbox_left))
                         if bbt == y:
                             sticky = 2
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_width / h
+                                move_mult = slope._get_geometry()[5]
                             break
                         elif (self.bbox_left <= slope.bbox_left and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 2
                             break
 
+            if self.swept_collision:
+                swept_move = self._sweep_x(move * move_mult)
+                if swept_move is not None:
+                    move = swept_move / move_mult
             self.x += move * move_mult
 
             stopper = None
 
-            slopes = self.collision(SlopeTopLeft)
+            slopes = self._wall_collision(SlopeTopLeft)
             def key(s, self=self): return s.get_slope_x(self.bbox_bottom)
             slopes.sort(key=key)
-            for other in slopes:
-                y = other.get_slope_y(self.bbox_right)
-                if self.bbox_bottom > y:
-                    oy = round(other.get_slope_y(old_bbox_right), NDIG)
-                    if rold_bbox_bottom <= oy:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_width / h
-                            if m < move_mult:
-                                self.x -= move * (move_mult - m)
-                                move_mult = m
-                                y = other.get_slope_y(self.bbox_right)
-                        self.move_y(y - self.bbox_bottom, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        x = other.get_slope_x(self.bbox_bottom)
-                        diff = self.bbox_right - x
-                        if diff > 0:
-                            self.bbox_right = x
-                            if self.bbox_bottom == y:
-                                self.move_x(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_floor = get_on_floor(on_floor)
-                        if on_floor:
-                            stopper = other
-                    elif not self.collision(other, x=old_x):
-                        self.bbox_right = min(self.bbox_right, other.bbox_left)
+            for other, y in self._get_slope_hits(
+                    slopes, "get_slope_y", "bbox_right", "bbox_bottom", True):
+                oy = _quantize(other.get_slope_y(old_bbox_right))
+                if rold_bbox_bottom <= oy:
+                    if not absolute:
+                        m = other._get_geometry()[5]
+                        if m < move_mult:
+                            self.x -= move * (move_mult - m)
+                            move_mult = m
+                            y = other.get_slope_y(self.bbox_right)
+                    self.move_y(y - self.bbox_bottom, do_events=do_events,
+                                exclude_events=exclude_events)
+                    x = other.get_slope_x(self.bbox_bottom)
+                    diff = self.bbox_right - x
+                    if diff > 0:
+                        self.bbox_right = x
+                        if self.bbox_bottom == y:
+                            self.move_x(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_floor = get_on_floor(on_floor)
+                    if on_floor:
                         stopper = other
+                elif not _collides(self, other, x=old_x):
+                    self.bbox_right = min(self.bbox_right, other.bbox_left)
+                    stopper = other
 
-            slopes = self.collision(SlopeBottomLeft)
+            slopes = self._wall_collision(SlopeBottomLeft)
             def key(s, self=self): return s.get_slope_x(self.bbox_top)
             slopes.sort(key=key)
-            for other in slopes:
-                y = other.get_slope_y(self.bbox_right)
-                if self.bbox_top < y:
-                    oy = round(other.get_slope_y(old_bbox_right), NDIG)
-                    if rold_bbox_top >= oy:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_width / h
-                            if m < move_mult:
-                                self.x -= move * (move_mult - m)
-                                move_mult = m
-                                y = other.get_slope_y(self.bbox_right)
-                        self.move_y(y - self.bbox_top, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        x = other.get_slope_x(self.bbox_top)
-                        diff = self.bbox_right - x
-                        if diff > 0:
-                            self.bbox_right = x
-                            if self.bbox_top == y:
-                                self.move_x(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_ceil = get_on_ceil(on_ceil)
-                        if on_ceil:
-                            stopper = other
-                    elif not self.collision(other, x=old_x):
-                        self.bbox_right = min(self.bbox_right, other.bbox_left)
+            for other, y in self._get_slope_hits(
+                    slopes, "get_slope_y", "bbox_right", "bbox_top", False):
+                oy = _quantize(other.get_slope_y(old_bbox_right))
+                if rold_bbox_top >= oy:
+                    if not absolute:
+                        m = other._get_geometry()[5]
+                        if m < move_mult:
+                            self.x -= move * (move_mult - m)
+                            move_mult = m
+                            y = other.get_slope_y(self.bbox_right)
+                    self.move_y(y - self.bbox_top, do_events=do_events,
+                                exclude_events=exclude_events)
+                    x = other.get_slope_x(self.bbox_top)
+                    diff = self.bbox_right - x
+                    if diff > 0:
+                        self.bbox_right = x
+                        if self.bbox_top == y:
+                            self.move_x(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_ceil = get_on_ceil(on_ceil)
+                    if on_ceil:
                         stopper = other
-
-            for other in self.collision(SolidLeft):
-                if not self.collision(other, x=old_x):
+                elif not _collides(self, other, x=old_x):
                     self.bbox_right = min(self.bbox_right, other.bbox_left)
                     stopper = other
 
+            walls = self._wall_collision(SolidLeft)
+            if walls:
+                left = self.bbox_left + (old_x - self.x)
+                i, edge = _resolve_solids(
+                    _get_boxes(walls), left, self.bbox_top,
+                    left + self.bbox_width, self.bbox_bottom, 0)
+                if i >= 0:
+                    self.bbox_right = min(self.bbox_right, edge)
+                    stopper = walls[i]
+
             if do_events and stopper not in exclude_events:
-                move_loss = max(0, abs(move) - abs(self.x - old_x))
+                move_loss = max(0, abs(full_move) -
+                                   abs(self.x - old_x))
                 self.event_physics_collision_right(stopper, move_loss)
                 stopper.event_physics_collision_left(self, 0)
+                if profiler is not None:
+                    profiler.count("events")
                 
         elif move < 0:
             if not self.nonstick_bottom:
-                bbb = round(self.bbox_bottom, NDIG)
-                for slope in self.collision(SlopeTopLeft, y=(self.y + 1)):
+                bbb = _quantize(self.bbox_bottom)
+                for slope in self._wall_collision(SlopeTopLeft,
+                                                  y=(self.y + 1)):
                     if slope.xsticky_top:
-                        y = round(slope.get_slope_y(self.bbox_right), NDIG)
+                        y = _quantize(slope.get_slope_y(self.bbox_right))
                         if bbb == y:
                             sticky = 1
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_width / h
+                                move_mult = slope._get_geometry()[5]
                             break
                         elif (self.bbox_right >= slope.bbox_right and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 1
                             break
             if not sticky and not self.nonstick_top:
-                bbt = round(self.bbox_top, NDIG)
-                for slope in self.collision(SlopeBottomLeft, y=(self.y - 1)):
+                bbt = _quantize(self.bbox_top)
+                for slope in self._wall_collision(SlopeBottomLeft,
+                                                  y=(self.y - 1)):
                     if slope.xsticky_bottom:
-                        y = round(slope.get_slope_y(self.bbox_right), NDIG)
+                        y = _quantize(slope.get_slope_y(self.bbox_right))
                         if bbt == y:
                             sticky = 2
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_width / h
+                                move_mult = slope._get_geometry()[5]
                             break
                         elif (self.bbox_right >= slope.bbox_right and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 2
                             break
 
+            if self.swept_collision:
+                swept_move = self._sweep_x(move * move_mult)
+                if swept_move is not None:
+                    move = swept_move / move_mult
             self.x += move * move_mult
 
             stopper = None
 
-            slopes = self.collision(SlopeTopRight)
+            slopes = self._wall_collision(SlopeTopRight)
             def key(s, self=self): return -s.get_slope_x(self.bbox_bottom)
             slopes.sort(key=key)
-            for other in slopes:
-                y = other.get_slope_y(self.bbox_left)
-                if self.bbox_bottom > y:
-                    oy = round(other.get_slope_y(old_bbox_left), NDIG)
-                    if rold_bbox_bottom <= oy:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_width / h
-                            if m < move_mult:
-                                self.x -= move * (move_mult - m)
-                                move_mult = m
-                                y = other.get_slope_y(self.bbox_left)
-                        self.move_y(y - self.bbox_bottom, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        x = other.get_slope_x(self.bbox_bottom)
-                        diff = self.bbox_left - x
-                        if diff < 0:
-                            self.bbox_left = x
-                            if self.bbox_bottom == y:
-                                self.move_x(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_floor = get_on_floor(on_floor)
-                        if on_floor:
-                            stopper = other
-                    elif not self.collision(other, x=old_x):
-                        self.bbox_left = max(self.bbox_left, other.bbox_right)
+            for other, y in self._get_slope_hits(
+                    slopes, "get_slope_y", "bbox_left", "bbox_bottom", True):
+                oy = _quantize(other.get_slope_y(old_bbox_left))
+                if rold_bbox_bottom <= oy:
+                    if not absolute:
+                        m = other._get_geometry()[5]
+                        if m < move_mult:
+                            self.x -= move * (move_mult - m)
+                            move_mult = m
+                            y = other.get_slope_y(self.bbox_left)
+                    self.move_y(y - self.bbox_bottom, do_events=do_events,
+                                exclude_events=exclude_events)
+                    x = other.get_slope_x(self.bbox_bottom)
+                    diff = self.bbox_left - x
+                    if diff < 0:
+                        self.bbox_left = x
+                        if self.bbox_bottom == y:
+                            self.move_x(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_floor = get_on_floor(on_floor)
+                    if on_floor:
                         stopper = other
+                elif not _collides(self, other, x=old_x):
+                    self.bbox_left = max(self.bbox_left, other.bbox_right)
+                    stopper = other
 
-            slopes = self.collision(SlopeBottomRight)
+            slopes = self._wall_collision(SlopeBottomRight)
             def key(s, self=self): return -s.get_slope_x(self.bbox_top)
             slopes.sort(key=key)
-            for other in slopes:
-                y = other.get_slope_y(self.bbox_left)
-                if self.bbox_top < y:
-                    oy = round(other.get_slope_y(old_bbox_left), NDIG)
-                    if rold_bbox_top >= oy:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_width / h
-                            if m < move_mult:
-                                self.x -= move * (move_mult - m)
-                                move_mult = m
-                                y = other.get_slope_y(self.bbox_left)
-                        self.move_y(y - self.bbox_top, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        x = other.get_slope_x(self.bbox_top)
-                        diff = self.bbox_left - x
-                        if diff < 0:
-                            self.bbox_left = x
-                            if self.bbox_top == y:
-                                self.move_x(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_ceil = get_on_ceil(on_ceil)
-                        if on_ceil:
-                            stopper = other
-                    elif not self.collision(other, x=old_x):
-                        self.bbox_left = max(self.bbox_left, other.bbox_right)
+            for other, y in self._get_slope_hits(
+                    slopes, "get_slope_y", "bbox_left", "bbox_top", False):
+                oy = _quantize(other.get_slope_y(old_bbox_left))
+                if rold_bbox_top >= oy:
+                    if not absolute:
+                        m = other._get_geometry()[5]
+                        if m < move_mult:
+                            self.x -= move * (move_mult - m)
+                            move_mult = m
+                            y = other.get_slope_y(self.bbox_left)
+                    self.move_y(y - self.bbox_top, do_events=do_events,
+                                exclude_events=exclude_events)
+                    x = other.get_slope_x(self.bbox_top)
+                    diff = self.bbox_left - x
+                    if diff < 0:
+                        self.bbox_left = x
+                        if self.bbox_top == y:
+                            self.move_x(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_ceil = get_on_ceil(on_ceil)
+                    if on_ceil:
                         stopper = other
-
-            for other in self.collision(SolidRight):
-                if not self.collision(other, x=old_x):
+                elif not _collides(self, other, x=old_x):
                     self.bbox_left = max(self.bbox_left, other.bbox_right)
                     stopper = other
 
+            walls = self._wall_collision(SolidRight)
+            if walls:
+                left = self.bbox_left + (old_x - self.x)
+                i, edge = _resolve_solids(
+                    _get_boxes(walls), left, self.bbox_top,
+                    left + self.bbox_width, self.bbox_bottom, 2)
+                if i >= 0:
+                    self.bbox_left = max(self.bbox_left, edge)
+                    stopper = walls[i]
+
             if do_events and stopper not in exclude_events:
-                move_loss = max(0, abs(move) - abs(self.x - old_x))
+                move_loss = max(0, abs(full_move) -
+                                   abs(self.x - old_x))
                 self.event_physics_collision_left(stopper, move_loss)
                 stopper.event_physics_collision_right(self, 0)
+                if profiler is not None:
+                    profiler.count("events")
 
         # Engage stickiness (same whether moving left or right)
         # 1 = sticking to the floor
@@ -394,17 +542,11 @@ class Collider(sge.dsp.Object):
             if (not self.get_bottom_touching_slope() and
                     not self.get_bottom_touching_wall()):
                 new_bbox_bottom = None
-                others = (
-                    sge.game.current_room.get_objects_at(
-                        self.bbox_left, self.bbox_top, self.bbox_width,
-                        (sge.game.current_room.height - self.bbox_top +
-                         sge.game.current_room.object_area_height)) |
-                    sge.game.current_room.object_area_void)
+                others = get_wall_index()._query(
+                    (SolidTop, SlopeTopLeft, SlopeTopRight), self.bbox_left,
+                    self.bbox_top, self.bbox_right, _INF, None,
+                    self.physics_mask)
                 for other in others:
-                    if (other.bbox_left >= self.bbox_right or
-                            other.bbox_right <= self.bbox_left):
-                        continue
-
                     if isinstance(other, SolidTop):
                         y = other.bbox_top
                     elif isinstance(other, SlopeTopLeft):
@@ -425,15 +567,11 @@ class Collider(sge.dsp.Object):
             if (not self.get_top_touching_slope() and
                     not self.get_top_touching_wall()):
                 new_bbox_top = None
-                others = (
-                    sge.game.current_room.get_objects_at(
-                        self.bbox_left, 0, self.bbox_width, self.bbox_bottom) |
-                    sge.game.current_room.object_area_void)
+                others = get_wall_index()._query(
+                    (SolidBottom, SlopeBottomLeft, SlopeBottomRight),
+                    self.bbox_left, -_INF, self.bbox_right, self.bbox_bottom,
+                    None, self.physics_mask)
                 for other in others:
-                    if (other.bbox_left >= self.bbox_right or
-                            other.bbox_right <= self.bbox_left):
-                        continue
-
                     if isinstance(other, SolidBottom):
                         y = other.bbox_bottom
                     elif isinstance(other, SlopeBottomLeft):
@@ -450,6 +588,13 @@ class Collider(sge.dsp.Object):
                 if new_bbox_top is not None:
                     self.bbox_top = new_bbox_top
 
+        if subpixels is not None:
+            self.x = _snap(self.x, subpixels)
+            self.y = _snap(self.y, subpixels)
+
+        if profiler is not None:
+            profiler._exit("move_x")
+
     def move_y(self, move, absolute=False, do_events=True, exclude_events=()):
         """
         Move the object vertically, handling physics.
@@ -468,16 +613,30 @@ class Collider(sge.dsp.Object):
           which should not cause collision events to be executed if
           collided with.
         """
+        if not move:
+            return
+
+        subpixels = _subpixels
+        if subpixels is not None:
+            move = _snap(move, subpixels)
+            if not move:
+                return
+
+        profiler = _profiler
+        if profiler is not None:
+            profiler._enter()
+
         exclude_events = set(exclude_events)
         exclude_events.add(None)
         sticky = False
         move_mult = 1
+        full_move = move
         old_x = self.x
         old_y = self.y
         old_bbox_left = self.bbox_left
         old_bbox_right = self.bbox_right
-        rold_bbox_left = round(old_bbox_left, NDIG)
-        rold_bbox_right = round(old_bbox_right, NDIG)
+        rold_bbox_left = _quantize(old_bbox_left)
+        rold_bbox_right = _quantize(old_bbox_right)
         old_bbox_top = self.bbox_top
         old_bbox_bottom = self.bbox_bottom
         on_right = None
@@ -513,229 +672,242 @@ class Collider(sge.dsp.Object):
 
         if move > 0:
             if not self.nonstick_right:
-                bbr = round(self.bbox_right, NDIG)
-                for slope in self.collision(SlopeBottomLeft, x=(self.x + 1)):
+                bbr = _quantize(self.bbox_right)
+                for slope in self._wall_collision(SlopeBottomLeft,
+                                                  x=(self.x + 1)):
                     if slope.ysticky_left:
-                        x = round(slope.get_slope_x(self.bbox_top), NDIG)
+                        x = _quantize(slope.get_slope_x(self.bbox_top))
                         if bbr == x:
                             sticky = 1
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_height / h
+                                move_mult = slope._get_geometry()[6]
                             break
                         elif (self.bbox_top <= slope.bbox_top and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 1
                             break
             if not sticky and not self.nonstick_left:
-                bbl = round(self.bbox_left, NDIG)
-                for slope in self.collision(SlopeBottomRight, x=(self.x - 1)):
+                bbl = _quantize(self.bbox_left)
+                for slope in self._wall_collision(SlopeBottomRight,
+                                                  x=(self.x - 1)):
                     if slope.ysticky_right:
-                        x = round(slope.get_slope_x(self.bbox_top), NDIG)
+                        x = _quantize(slope.get_slope_x(self.bbox_top))
                         if bbl == x:
                             sticky = 2
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_height / h
+                                move_mult = slope._get_geometry()[6]
                             break
                         elif (self.bbox_top <= slope.bbox_top and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 2
                             break
 
+            if self.swept_collision:
+                swept_move = self._sweep_y(move * move_mult)
+                if swept_move is not None:
+                    move = swept_move / move_mult
             self.y += move * move_mult
 
             stopper = None
 
-            slopes = self.collision(SlopeTopLeft)
+            slopes = self._wall_collision(SlopeTopLeft)
             def key(s, self=self): return s.get_slope_y(self.bbox_right)
             slopes.sort(key=key)
-            for other in slopes:
-                x = other.get_slope_x(self.bbox_bottom)
-                if self.bbox_right > x:
-                    ox = round(other.get_slope_x(old_bbox_bottom), NDIG)
-                    if rold_bbox_right <= ox:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_height / h
-                            if m < move_mult:
-                                self.y -= move * (move_mult - m)
-                                move_mult = m
-                                x = other.get_slope_x(self.bbox_bottom)
-                        self.move_x(x - self.bbox_right, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        y = other.get_slope_y(self.bbox_right)
-                        diff = self.bbox_bottom - y
-                        if diff > 0:
-                            self.bbox_bottom = y
-                            if self.bbox_right == x:
-                                self.move_y(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_right = get_on_right(on_right)
-                        if on_right:
-                            stopper = other
-                    elif not self.collision(other, y=old_y):
-                        self.bbox_bottom = min(self.bbox_bottom,
-                                               other.bbox_top)
+            for other, x in self._get_slope_hits(
+                    slopes, "get_slope_x", "bbox_bottom", "bbox_right", True):
+                ox = _quantize(other.get_slope_x(old_bbox_bottom))
+                if rold_bbox_right <= ox:
+                    if not absolute:
+                        m = other._get_geometry()[6]
+                        if m < move_mult:
+                            self.y -= move * (move_mult - m)
+                            move_mult = m
+                            x = other.get_slope_x(self.bbox_bottom)
+                    self.move_x(x - self.bbox_right, do_events=do_events,
+                                exclude_events=exclude_events)
+                    y = other.get_slope_y(self.bbox_right)
+                    diff = self.bbox_bottom - y
+                    if diff > 0:
+                        self.bbox_bottom = y
+                        if self.bbox_right == x:
+                            self.move_y(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_right = get_on_right(on_right)
+                    if on_right:
                         stopper = other
+                elif not _collides(self, other, y=old_y):
+                    self.bbox_bottom = min(self.bbox_bottom,
+                                           other.bbox_top)
+                    stopper = other
 
-            slopes = self.collision(SlopeTopRight)
+            slopes = self._wall_collision(SlopeTopRight)
             def key(s, self=self): return s.get_slope_y(self.bbox_left)
             slopes.sort(key=key)
-            for other in slopes:
-                x = other.get_slope_x(self.bbox_bottom)
-                if self.bbox_left < x:
-                    ox = round(other.get_slope_x(old_bbox_bottom), NDIG)
-                    if rold_bbox_left >= ox:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_height / h
-                            if m < move_mult:
-                                self.y -= move * (move_mult - m)
-                                move_mult = m
-                                x = other.get_slope_x(self.bbox_bottom)
-                        self.move_x(x - self.bbox_left, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        y = other.get_slope_y(self.bbox_left)
-                        diff = self.bbox_bottom - y
-                        if diff > 0:
-                            self.bbox_bottom = y
-                            if self.bbox_left == x:
-                                self.move_y(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_left = get_on_left(on_left)
-                        if on_left:
-                            stopper = other
-                    elif not self.collision(other, y=old_y):
-                        self.bbox_bottom = min(self.bbox_bottom,
-                                               other.bbox_top)
+            for other, x in self._get_slope_hits(
+                    slopes, "get_slope_x", "bbox_bottom", "bbox_left", False):
+                ox = _quantize(other.get_slope_x(old_bbox_bottom))
+                if rold_bbox_left >= ox:
+                    if not absolute:
+                        m = other._get_geometry()[6]
+                        if m < move_mult:
+                            self.y -= move * (move_mult - m)
+                            move_mult = m
+                            x = other.get_slope_x(self.bbox_bottom)
+                    self.move_x(x - self.bbox_left, do_events=do_events,
+                                exclude_events=exclude_events)
+                    y = other.get_slope_y(self.bbox_left)
+                    diff = self.bbox_bottom - y
+                    if diff > 0:
+                        self.bbox_bottom = y
+                        if self.bbox_left == x:
+                            self.move_y(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_left = get_on_left(on_left)
+                    if on_left:
                         stopper = other
-
-            for other in self.collision(SolidTop):
-                if not self.collision(other, y=old_y):
-                    self.bbox_bottom = min(self.bbox_bottom, other.bbox_top)
+                elif not _collides(self, other, y=old_y):
+                    self.bbox_bottom = min(self.bbox_bottom,
+                                           other.bbox_top)
                     stopper = other
 
+            walls = self._wall_collision(SolidTop)
+            if walls:
+                top = self.bbox_top + (old_y - self.y)
+                i, edge = _resolve_solids(
+                    _get_boxes(walls), self.bbox_left, top, self.bbox_right,
+                    top + self.bbox_height, 1)
+                if i >= 0:
+                    self.bbox_bottom = min(self.bbox_bottom, edge)
+                    stopper = walls[i]
+
             if do_events and stopper not in exclude_events:
-                move_loss = max(0, abs(move) - abs(self.y - old_y))
+                move_loss = max(0, abs(full_move) -
+                                   abs(self.y - old_y))
                 self.event_physics_collision_bottom(stopper, move_loss)
                 stopper.event_physics_collision_top(self, 0)
+                if profiler is not None:
+                    profiler.count("events")
                 
         elif move < 0:
             if not self.nonstick_right:
-                bbr = round(self.bbox_right, NDIG)
-                for slope in self.collision(SlopeTopLeft, x=(self.x + 1)):
+                bbr = _quantize(self.bbox_right)
+                for slope in self._wall_collision(SlopeTopLeft,
+                                                  x=(self.x + 1)):
                     if slope.ysticky_left:
-                        x = round(slope.get_slope_x(self.bbox_bottom), NDIG)
+                        x = _quantize(slope.get_slope_x(self.bbox_bottom))
                         if bbr == x:
                             sticky = 1
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_height / h
+                                move_mult = slope._get_geometry()[6]
                             break
                         elif (self.bbox_bottom >= slope.bbox_bottom and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 1
                             break
             if not sticky and not self.nonstick_left:
-                bbl = round(self.bbox_left, NDIG)
-                for slope in self.collision(SlopeTopRight, x=(self.x - 1)):
+                bbl = _quantize(self.bbox_left)
+                for slope in self._wall_collision(SlopeTopRight,
+                                                  x=(self.x - 1)):
                     if slope.ysticky_right:
-                        x = round(slope.get_slope_x(self.bbox_bottom), NDIG)
+                        x = _quantize(slope.get_slope_x(self.bbox_bottom))
                         if bbl == x:
                             sticky = 2
                             if not absolute:
-                                h = math.hypot(slope.bbox_width,
-                                               slope.bbox_height)
-                                move_mult = slope.bbox_height / h
+                                move_mult = slope._get_geometry()[6]
                             break
                         elif (self.bbox_bottom >= slope.bbox_bottom and
-                              not self.collision(slope)):
+                              not _collides(self, slope)):
                             sticky = 2
                             break
 
+            if self.swept_collision:
+                swept_move = self._sweep_y(move * move_mult)
+                if swept_move is not None:
+                    move = swept_move / move_mult
             self.y += move * move_mult
 
             stopper = None
 
-            slopes = self.collision(SlopeBottomLeft)
+            slopes = self._wall_collision(SlopeBottomLeft)
             def key(s, self=self): return -s.get_slope_y(self.bbox_right)
             slopes.sort(key=key)
-            for other in slopes:
-                x = other.get_slope_x(self.bbox_top)
-                if self.bbox_right > x:
-                    ox = round(other.get_slope_x(old_bbox_top), NDIG)
-                    if rold_bbox_right <= ox:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_height / h
-                            if m < move_mult:
-                                self.y -= move * (move_mult - m)
-                                move_mult = m
-                                x = other.get_slope_x(self.bbox_top)
-                        self.move_x(x - self.bbox_right, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        y = other.get_slope_y(self.bbox_right)
-                        diff = self.bbox_top - y
-                        if diff < 0:
-                            self.bbox_top = y
-                            if self.bbox_right == x:
-                                self.move_y(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_right = get_on_right(on_right)
-                        if on_right:
-                            stopper = other
-                    elif not self.collision(other, y=old_y):
-                        self.bbox_top = max(self.bbox_top, other.bbox_bottom)
+            for other, x in self._get_slope_hits(
+                    slopes, "get_slope_x", "bbox_top", "bbox_right", True):
+                ox = _quantize(other.get_slope_x(old_bbox_top))
+                if rold_bbox_right <= ox:
+                    if not absolute:
+                        m = other._get_geometry()[6]
+                        if m < move_mult:
+                            self.y -= move * (move_mult - m)
+                            move_mult = m
+                            x = other.get_slope_x(self.bbox_top)
+                    self.move_x(x - self.bbox_right, do_events=do_events,
+                                exclude_events=exclude_events)
+                    y = other.get_slope_y(self.bbox_right)
+                    diff = self.bbox_top - y
+                    if diff < 0:
+                        self.bbox_top = y
+                        if self.bbox_right == x:
+                            self.move_y(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_right = get_on_right(on_right)
+                    if on_right:
                         stopper = other
+                elif not _collides(self, other, y=old_y):
+                    self.bbox_top = max(self.bbox_top, other.bbox_bottom)
+                    stopper = other
 
-            slopes = self.collision(SlopeBottomRight)
+            slopes = self._wall_collision(SlopeBottomRight)
             def key(s, self=self): return -s.get_slope_y(self.bbox_left)
             slopes.sort(key=key)
-            for other in self.collision(SlopeBottomRight):
-                x = other.get_slope_x(self.bbox_top)
-                if self.bbox_left < x:
-                    ox = round(other.get_slope_x(old_bbox_top), NDIG)
-                    if rold_bbox_left >= ox:
-                        if not absolute:
-                            h = math.hypot(other.bbox_width, other.bbox_height)
-                            m = other.bbox_height / h
-                            if m < move_mult:
-                                self.y -= move * (move_mult - m)
-                                move_mult = m
-                                x = other.get_slope_x(self.bbox_top)
-                        self.move_x(x - self.bbox_left, do_events=do_events,
-                                    exclude_events=exclude_events)
-                        y = other.get_slope_y(self.bbox_left)
-                        diff = self.bbox_top - y
-                        if diff < 0:
-                            self.bbox_top = y
-                            if self.bbox_left == x:
-                                self.move_y(diff, do_events=do_events,
-                                            exclude_events=exclude_events)
-
-                        on_left = get_on_left(on_left)
-                        if on_left:
-                            stopper = other
-                    elif not self.collision(other, y=old_y):
-                        self.bbox_top = max(self.bbox_top, other.bbox_bottom)
+            for other, x in self._get_slope_hits(
+                    self._wall_collision(SlopeBottomRight), "get_slope_x",
+                    "bbox_top", "bbox_left", False):
+                ox = _quantize(other.get_slope_x(old_bbox_top))
+                if rold_bbox_left >= ox:
+                    if not absolute:
+                        m = other._get_geometry()[6]
+                        if m < move_mult:
+                            self.y -= move * (move_mult - m)
+                            move_mult = m
+                            x = other.get_slope_x(self.bbox_top)
+                    self.move_x(x - self.bbox_left, do_events=do_events,
+                                exclude_events=exclude_events)
+                    y = other.get_slope_y(self.bbox_left)
+                    diff = self.bbox_top - y
+                    if diff < 0:
+                        self.bbox_top = y
+                        if self.bbox_left == x:
+                            self.move_y(diff, do_events=do_events,
+                                        exclude_events=exclude_events)
+
+                    on_left = get_on_left(on_left)
+                    if on_left:
                         stopper = other
-
-            for other in self.collision(SolidBottom):
-                if not self.collision(other, y=old_y):
+                elif not _collides(self, other, y=old_y):
                     self.bbox_top = max(self.bbox_top, other.bbox_bottom)
                     stopper = other
 
+            walls = self._wall_collision(SolidBottom)
+            if walls:
+                top = self.bbox_top + (old_y - self.y)
+                i, edge = _resolve_solids(
+                    _get_boxes(walls), self.bbox_left, top, self.bbox_right,
+                    top + self.bbox_height, 3)
+                if i >= 0:
+                    self.bbox_top = max(self.bbox_top, edge)
+                    stopper = walls[i]
+
             if do_events and stopper not in exclude_events:
-                move_loss = max(0, abs(move) - abs(self.y - old_y))
+                move_loss = max(0, abs(full_move) -
+                                   abs(self.y - old_y))
                 self.event_physics_collision_top(stopper, move_loss)
                 stopper.event_physics_collision_bottom(self, 0)
+                if profiler is not None:
+                    profiler.count("events")
 
         # Engage stickiness (same whether moving left or right)
         # 1 = sticking to a wall on the right
@@ -744,18 +916,11 @@ class Collider(sge.dsp.Object):
             if (not self.get_right_touching_slope() and
                     not self.get_right_touching_wall()):
                 new_bbox_right = None
-                others = (
-                    sge.game.current_room.get_objects_at(
-                        self.bbox_left, self.bbox_top,
-                        (sge.game.current_room.width - self.bbox_left +
-                         sge.game.current_room.object_area_width),
-                        self.bbox_height) |
-                    sge.game.current_room.object_area_void)
+                others = get_wall_index()._query(
+                    (SolidLeft, SlopeTopLeft, SlopeBottomLeft), self.bbox_left,
+                    self.bbox_top, _INF, self.bbox_bottom, None,
+                    self.physics_mask)
                 for other in others:
-                    if (other.bbox_top >= self.bbox_bottom or
-                            other.bbox_bottom <= self.bbox_top):
-                        continue
-
                     if isinstance(other, SolidLeft):
                         x = other.bbox_left
                     elif isinstance(other, SlopeTopLeft):
@@ -775,15 +940,11 @@ class Collider(sge.dsp.Object):
             if (not self.get_left_touching_slope() and
                     not self.get_left_touching_wall()):
                 new_bbox_left = None
-                others = (
-                    sge.game.current_room.get_objects_at(
-                        0, self.bbox_top, self.bbox_right, self.bbox_height) |
-                    sge.game.current_room.object_area_void)
+                others = get_wall_index()._query(
+                    (SolidRight, SlopeTopRight, SlopeBottomRight), -_INF,
+                    self.bbox_top, self.bbox_right, self.bbox_bottom, None,
+                    self.physics_mask)
                 for other in others:
-                    if (other.bbox_top >= self.bbox_bottom or
-                            other.bbox_bottom <= self.bbox_top):
-                        continue
-
                     if isinstance(other, SolidRight):
                         x = other.bbox_right
                     elif isinstance(other, SlopeTopRight):
@@ -800,49 +961,72 @@ class Collider(sge.dsp.Object):
                 if new_bbox_left is not None:
                     self.bbox_left = new_bbox_left
 
+        if subpixels is not None:
+            self.x = _snap(self.x, subpixels)
+            self.y = _snap(self.y, subpixels)
+
+        if profiler is not None:
+            profiler._exit("move_y")
+
     def get_left_touching_wall(self):
         """
         Return a list of :class:`SolidRight` objects whose right sides
         are touching the left side of this object.
         """
-        r = []
-        for tile in self.collision(SolidRight, x=(self.x - 1)):
-            if not self.collision(tile):
-                r.append(tile)
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("left_wall")
+        if r is None:
+            r = contacts["left_wall"] = []
+            for tile in self._wall_collision(SolidRight, x=(self.x - 1)):
+                if not _collides(self, tile):
+                    r.append(tile)
+
+        return r[:]
 
     def get_right_touching_wall(self):
         """
         Return a list of :class:`SolidLeft` objects whose left sides are
         touching the right side of this object.
         """
-        r = []
-        for tile in self.collision(SolidLeft, x=(self.x + 1)):
-            if not self.collision(tile):
-                r.append(tile)
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("right_wall")
+        if r is None:
+            r = contacts["right_wall"] = []
+            for tile in self._wall_collision(SolidLeft, x=(self.x + 1)):
+                if not _collides(self, tile):
+                    r.append(tile)
+
+        return r[:]
 
     def get_top_touching_wall(self):
         """
         Return a list of :class:`SolidTop` objects whose top sides are
         touching the bottom side of this object.
         """
-        r = []
-        for tile in self.collision(SolidBottom, y=(self.y - 1)):
-            if not self.collision(tile):
-                r.append(tile)
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("top_wall")
+        if r is None:
+            r = contacts["top_wall"] = []
+            for tile in self._wall_collision(SolidBottom, y=(self.y - 1)):
+                if not _collides(self, tile):
+                    r.append(tile)
+
+        return r[:]
 
     def get_bottom_touching_wall(self):
         """
         Return a list of :class:`SolidBottom` objects whose bottom sides
         are touching the top side of this object.
         """
-        r = []
-        for tile in self.collision(SolidTop, y=(self.y + 1)):
-            if not self.collision(tile):
-                r.append(tile)
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("bottom_wall")
+        if r is None:
+            r = contacts["bottom_wall"] = []
+            for tile in self._wall_collision(SolidTop, y=(self.y + 1)):
+                if not _collides(self, tile):
+                    r.append(tile)
+
+        return r[:]
 
     def get_left_touching_slope(self):
         """
@@ -850,23 +1034,27 @@ class Collider(sge.dsp.Object):
         :class:`SlopeBottomRight` objects whose right sides are touching
         the left side of this object.
         """
-        r = []
-
-        bbb = round(self.bbox_bottom, NDIG)
-        for slope in self.collision(SlopeTopRight, x=(self.x - 1)):
-            y = round(slope.get_slope_y(self.bbox_left), NDIG)
-            if bbb == y or (self.bbox_bottom >= slope.bbox_bottom and
-                            not self.collision(slope)):
-                r.append(slope)
-
-        bbt = round(self.bbox_top, NDIG)
-        for slope in self.collision(SlopeBottomRight, x=(self.x - 1)):
-            y = round(slope.get_slope_y(self.bbox_left), NDIG)
-            if bbt == y or (self.bbox_top <= slope.bbox_top and
-                            not self.collision(slope)):
-                r.append(slope)
-
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("left_slope")
+        if r is None:
+            r = contacts["left_slope"] = []
+
+            bbb = _quantize(self.bbox_bottom)
+            for slope in self._wall_collision(SlopeTopRight, x=(self.x - 1)):
+                y = _quantize(slope.get_slope_y(self.bbox_left))
+                if bbb == y or (self.bbox_bottom >= slope.bbox_bottom and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+            bbt = _quantize(self.bbox_top)
+            for slope in self._wall_collision(SlopeBottomRight,
+                                              x=(self.x - 1)):
+                y = _quantize(slope.get_slope_y(self.bbox_left))
+                if bbt == y or (self.bbox_top <= slope.bbox_top and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+        return r[:]
 
     def get_right_touching_slope(self):
         """
@@ -874,23 +1062,26 @@ class Collider(sge.dsp.Object):
         :class:`SlopeBottomLeft` objects whose left sides are touching
         the right side of this object.
         """
-        r = []
-
-        bbb = round(self.bbox_bottom, NDIG)
-        for slope in self.collision(SlopeTopLeft, x=(self.x + 1)):
-            y = round(slope.get_slope_y(self.bbox_right), NDIG)
-            if bbb == y or (self.bbox_bottom >= slope.bbox_bottom and
-                            not self.collision(slope)):
-                r.append(slope)
-
-        bbt = round(self.bbox_top, NDIG)
-        for slope in self.collision(SlopeBottomLeft, x=(self.x + 1)):
-            y = round(slope.get_slope_y(self.bbox_right), NDIG)
-            if bbt == y or (self.bbox_top <= slope.bbox_top and
-                            not self.collision(slope)):
-                r.append(slope)
-
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("right_slope")
+        if r is None:
+            r = contacts["right_slope"] = []
+
+            bbb = _quantize(self.bbox_bottom)
+            for slope in self._wall_collision(SlopeTopLeft, x=(self.x + 1)):
+                y = _quantize(slope.get_slope_y(self.bbox_right))
+                if bbb == y or (self.bbox_bottom >= slope.bbox_bottom and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+            bbt = _quantize(self.bbox_top)
+            for slope in self._wall_collision(SlopeBottomLeft, x=(self.x + 1)):
+                y = _quantize(slope.get_slope_y(self.bbox_right))
+                if bbt == y or (self.bbox_top <= slope.bbox_top and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+        return r[:]
 
     def get_top_touching_slope(self):
         """
@@ -898,23 +1089,27 @@ class Collider(sge.dsp.Object):
         :class:`SlopeBottomRight` objects whose bottom sides are
         touching the top side of this object.
         """
-        r = []
-
-        bbr = round(self.bbox_right, NDIG)
-        for slope in self.collision(SlopeBottomLeft, y=(self.y - 1)):
-            x = round(slope.get_slope_x(self.bbox_top), NDIG)
-            if bbr == x or (self.bbox_right >= slope.bbox_right and
-                            not self.collision(slope)):
-                r.append(slope)
-
-        bbl = round(self.bbox_left, NDIG)
-        for slope in self.collision(SlopeBottomRight, y=(self.y - 1)):
-            x = round(slope.get_slope_x(self.bbox_top), NDIG)
-            if bbl == x or (self.bbox_left <= slope.bbox_left and
-                            not self.collision(slope)):
-                r.append(slope)
-
-        return r
+        contacts = self._get_contacts()
+        r = contacts.get("top_slope")
+        if r is None:
+            r = contacts["top_slope"] = []
+
+            bbr = _quantize(self.bbox_right)
+            for slope in self._wall_collision(SlopeBottomLeft, y=(self.y - 1)):
+                x = _quantize(slope.get_slope_x(self.bbox_top))
+                if bbr == x or (self.bbox_right >= slope.bbox_right and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+            bbl = _quantize(self.bbox_left)
+            for slope in self._wall_collision(SlopeBottomRight,
+                                              y=(self.y - 1)):
+                x = _quantize(slope.get_slope_x(self.bbox_top))
+                if bbl == x or (self.bbox_left <= slope.bbox_left and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+        return r[:]
 
     def get_bottom_touching_slope(self):
         """
@@ -922,23 +1117,233 @@ class Collider(sge.dsp.Object):
         :class:`SlopeTopRight` objects whose top sides are touching the
         bottom side of this object.
         """
-        r = []
+        contacts = self._get_contacts()
+        r = contacts.get("bottom_slope")
+        if r is None:
+            r = contacts["bottom_slope"] = []
+
+            bbr = _quantize(self.bbox_right)
+            for slope in self._wall_collision(SlopeTopLeft, y=(self.y + 1)):
+                x = _quantize(slope.get_slope_x(self.bbox_bottom))
+                if bbr == x or (self.bbox_right >= slope.bbox_right and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+            bbl = _quantize(self.bbox_left)
+            for slope in self._wall_collision(SlopeTopRight, y=(self.y + 1)):
+                x = _quantize(slope.get_slope_x(self.bbox_bottom))
+                if bbl == x or (self.bbox_left <= slope.bbox_left and
+                                not _collides(self, slope)):
+                    r.append(slope)
+
+        return r[:]
+
+    def invalidate_contacts(self):
+        """
+        Discard the cached results of the methods which return touching
+        walls and slopes (e.g.
+        :meth:`xsge_physics.Collider.get_bottom_touching_wall`).
+
+        These results are cached until the position or bounding box of
+        the collider changes or a wall near the collider is added,
+        removed, or updated in the room's :class:`WallIndex`.  You only
+        need to call this method if something else affecting the
+        results has changed, for example if the collider's
+        :attr:`tangible` attribute has changed.  This also wakes the
+        collider up if it is asleep (see :attr:`can_sleep`).  See also
+        :meth:`xsge_physics.WallIndex.invalidate_contacts`.
+        """
+        self._contacts = None
+
+    def _get_contacts(self):
+        # Return the dictionary of cached touching walls and slopes of
+        # this collider, replacing it with an empty one if it is no
+        # longer valid.
+        index = get_wall_index()
+        key = (self.x, self.y, self.bbox_left, self.bbox_top,
+               self.bbox_width, self.bbox_height, self.tangible,
+               self.physics_mask)
+        cache = self._contacts
+        if (cache is None or cache[0] is not index or cache[1] != key or
+                index._is_changed(cache[2], cache[3])):
+            cells = index._get_cells(self.bbox_left - 1, self.bbox_top - 1,
+                                     self.bbox_right + 1,
+                                     self.bbox_bottom + 1)
+            cache = [index, key, cells, index._tick, {}]
+            self._contacts = cache
+        else:
+            cache[3] = index._tick
+
+        return cache[4]
+
+    def _sweep_x(self, move):
+        # Return the horizontal movement ``move`` limited so that this
+        # collider doesn't pass completely through any wall, or None if
+        # it doesn't need to be limited.
+        left = self.bbox_left
+        right = self.bbox_right
+        limit = None
+        if move > 0:
+            new_left = left + move
+            for wall in self._get_walls(
+                    (SolidLeft, SlopeTopLeft, SlopeBottomLeft), left,
+                    self.bbox_top, right + move, self.bbox_bottom):
+                if wall.bbox_right <= new_left:
+                    if isinstance(wall, SolidLeft):
+                        contact = wall.bbox_left
+                    elif isinstance(wall, SlopeTopLeft):
+                        contact = wall.get_slope_x(self.bbox_bottom)
+                    else:
+                        contact = wall.get_slope_x(self.bbox_top)
 
-        bbr = round(self.bbox_right, NDIG)
-        for slope in self.collision(SlopeTopLeft, y=(self.y + 1)):
-            x = round(slope.get_slope_x(self.bbox_bottom), NDIG)
-            if bbr == x or (self.bbox_right >= slope.bbox_right and
-                            not self.collision(slope)):
-                r.append(slope)
+                    if contact >= right and (limit is None or
+                                             wall.bbox_right < limit):
+                        limit = wall.bbox_right
 
-        bbl = round(self.bbox_left, NDIG)
-        for slope in self.collision(SlopeTopRight, y=(self.y + 1)):
-            x = round(slope.get_slope_x(self.bbox_bottom), NDIG)
-            if bbl == x or (self.bbox_left <= slope.bbox_left and
-                            not self.collision(slope)):
-                r.append(slope)
+            if limit is not None:
+                return limit - right
+        elif move < 0:
+            new_right = right + move
+            for wall in self._get_walls(
+                    (SolidRight, SlopeTopRight, SlopeBottomRight),
+                    left + move, self.bbox_top, right, self.bbox_bottom):
+                if wall.bbox_left >= new_right:
+                    if isinstance(wall, SolidRight):
+                        contact = wall.bbox_right
+                    elif isinstance(wall, SlopeTopRight):
+                        contact = wall.get_slope_x(self.bbox_bottom)
+                    else:
+                        contact = wall.get_slope_x(self.bbox_top)
 
-        return r
+                    if contact <= left and (limit is None or
+                                            wall.bbox_left > limit):
+                        limit = wall.bbox_left
+
+            if limit is not None:
+                return limit - left
+
+        return None
+
+    def _sweep_y(self, move):
+        # Return the vertical movement ``move`` limited so that this
+        # collider doesn't pass completely through any wall, or None if
+        # it doesn't need to be limited.
+        top = self.bbox_top
+        bottom = self.bbox_bottom
+        limit = None
+        if move > 0:
+            new_top = top + move
+            for wall in self._get_walls(
+                    (SolidTop, SlopeTopLeft, SlopeTopRight), self.bbox_left,
+                    top, self.bbox_right, bottom + move):
+                if wall.bbox_bottom <= new_top:
+                    if isinstance(wall, SolidTop):
+                        contact = wall.bbox_top
+                    elif isinstance(wall, SlopeTopLeft):
+                        contact = wall.get_slope_y(self.bbox_right)
+                    else:
+                        contact = wall.get_slope_y(self.bbox_left)
+
+                    if contact >= bottom and (limit is None or
+                                              wall.bbox_bottom < limit):
+                        limit = wall.bbox_bottom
+
+            if limit is not None:
+                return limit - bottom
+        elif move < 0:
+            new_bottom = bottom + move
+            for wall in self._get_walls(
+                    (SolidBottom, SlopeBottomLeft, SlopeBottomRight),
+                    self.bbox_left, top + move, self.bbox_right, bottom):
+                if wall.bbox_top >= new_bottom:
+                    if isinstance(wall, SolidBottom):
+                        contact = wall.bbox_bottom
+                    elif isinstance(wall, SlopeBottomLeft):
+                        contact = wall.get_slope_y(self.bbox_right)
+                    else:
+                        contact = wall.get_slope_y(self.bbox_left)
+
+                    if contact <= top and (limit is None or
+                                           wall.bbox_top > limit):
+                        limit = wall.bbox_top
+
+            if limit is not None:
+                return limit - top
+
+        return None
+
+    def _wall_collision(self, cls, x=None, y=None):
+        # Return a list of walls of class ``cls`` colliding with this
+        # object, like ``self.collision(cls, x, y)``, but using the wall
+        # index of the current room.
+        left = self.bbox_left
+        top = self.bbox_top
+        if x is not None:
+            left += x - self.x
+        if y is not None:
+            top += y - self.y
+
+        return self._get_walls((cls,), left, top, left + self.bbox_width,
+                               top + self.bbox_height)
+
+    def _get_walls(self, classes, left, top, right, bottom):
+        # Return a list of tangible walls of any of the classes in
+        # ``classes`` strictly overlapping the indicated edges, or an
+        # empty list if this collider is intangible or not in the
+        # current room.
+        if not self.tangible or not self._in_room():
+            return []
+
+        index = get_wall_index()
+        broad = self._broad_phase
+        if (broad is not None and broad[0] is index and
+                broad[3] <= left and broad[4] <= top and
+                right <= broad[5] and bottom <= broad[6]):
+            if index._is_changed(broad[1], broad[2]):
+                self._broad_phase = None
+            else:
+                broad[2] = index._tick
+                walls = broad[8].get(classes)
+                if walls is None:
+                    walls = [wall for wall in broad[7]
+                             if isinstance(wall, classes)]
+                    broad[8][classes] = walls
+
+                if _profiler is not None:
+                    _profiler.count("queries")
+                    _profiler.count("candidates", len(walls))
+
+                return _filter_walls(walls, index._entries, left, top,
+                                     right, bottom)
+
+        return index._query(classes, left, top, right, bottom, self,
+                            self.physics_mask)
+
+    def _in_room(self):
+        # Return whether this collider is in the current room, as
+        # ``self.collision`` checks.  The room the collider was last
+        # created in is remembered so that the room's objects only need
+        # to be searched for colliders which were destroyed or haven't
+        # been created yet.
+        room = sge.game.current_room
+        return self._room is room or self in room.objects
+
+    def _get_slope_hits(self, slopes, getter, probe, edge, greater):
+        # Yield each slope in ``slopes``, in order, for which this
+        # collider's ``edge`` edge is past the result of calling the
+        # slope's ``getter`` method with the collider's ``probe`` edge
+        # (greater than it if ``greater`` is true, less than it
+        # otherwise), as a tuple of the form ``(slope, result)``.  The
+        # edges are read again after each slope yielded, since handling
+        # it generally moves the collider.
+        i = 0
+        while i < len(slopes):
+            i, value = _find_slope(slopes, i, getter, getattr(self, probe),
+                                   getattr(self, edge), greater, _slope_kinds)
+            if i < 0:
+                break
+            yield slopes[i], value
+            i += 1
 
     def event_physics_collision_left(self, other, move_loss):
         """
@@ -989,17 +1394,70 @@ class Collider(sge.dsp.Object):
         """
         pass
 
+    def _is_asleep(self):
+        # Return whether or not this collider is asleep, i.e. whether
+        # updating its position would do nothing.
+        if (not self.can_sleep or self.xvelocity or self.yvelocity or
+                self.xacceleration or self.yacceleration):
+            return False
+
+        if not self.slope_acceleration:
+            return True
+
+        # Whether or not slopes accelerate the collider only changes
+        # when its contacts do, so it is cached along with them.
+        contacts = self._get_contacts()
+        asleep = contacts.get("asleep")
+        if asleep is None:
+            xaccel, yaccel = self._get_acceleration()
+            asleep = contacts["asleep"] = not (xaccel or yaccel)
+
+        return asleep
+
+    def _get_acceleration(self):
+        # Return the horizontal and vertical acceleration of this
+        # collider, including acceleration caused by slopes.
+        xaccel = self.xacceleration
+        yaccel = self.yacceleration
+        if self.slope_acceleration:
+            for slope in set(self.get_left_touching_slope() +
+                             self.get_right_touching_slope() +
+                             self.get_top_touching_slope() +
+                             self.get_bottom_touching_slope()):
+                xaccel += slope.slope_xacceleration * self.slope_acceleration
+                yaccel += slope.slope_yacceleration * self.slope_acceleration
+
+        return xaccel, yaccel
+
+    def event_create(self):
+        super(Collider, self).event_create()
+        self._room = sge.game.current_room
+        world = _worlds.get(sge.game.current_room)
+        if world is not None:
+            world.add(self)
+
+    def event_destroy(self):
+        super(Collider, self).event_destroy()
+        self._room = None
+        world = _worlds.get(sge.game.current_room)
+        if world is not None:
+            world.remove(self)
+
     def event_update_position(self, delta_mult):
-        if delta_mult:
-            xaccel = self.xacceleration
-            yaccel = self.yacceleration
-            if self.slope_acceleration:
-                for slope in set(self.get_left_touching_slope() +
-                                 self.get_right_touching_slope() +
-                                 self.get_top_touching_slope() +
-                                 self.get_bottom_touching_slope()):
-                    xaccel += slope.slope_xacceleration * self.slope_acceleration
-                    yaccel += slope.slope_yacceleration * self.slope_acceleration
+        if self._world is not None:
+            # The world updates the position of this collider instead.
+            return
+
+        region = _activation_regions.get(sge.game.current_room)
+        if region is not None:
+            delta_mult = region._get_delta_mult(self, delta_mult)
+
+        if delta_mult and not self._is_asleep():
+            profiler = _profiler
+            if profiler is not None:
+                start_time = _clock()
+
+            xaccel, yaccel = self._get_acceleration()
 
             vi = self.xvelocity
             vf = vi + xaccel * delta_mult
@@ -1021,15 +1479,81 @@ class Collider(sge.dsp.Object):
             self.yvelocity = vf
             self.move_y(((vi + vf) / 2) * delta_mult)
 
+            if profiler is not None:
+                profiler._add_time(self, _clock() - start_time)
+
+
+def _position_property(name):
+    # Return a property which wraps the sge.dsp.Object property
+    # ``name``, calling the wall's ``_moved`` method whenever it is set.
+    prop = getattr(sge.dsp.Object, name)
+
+    def fset(self, value):
+        prop.fset(self, value)
+        self._moved()
+
+    return property(prop.fget, fset, doc=prop.__doc__)
+
 
 class Wall(sge.dsp.Object):
 
     """
     Base class for all wall objects that :class:`Collider` objects
-    interact with in some way.  It is functionally identical to its
-    parent class, :class:`sge.dsp.Object`.
+    interact with in some way.
+
+    .. note::
+
+       :meth:`event_create` and :meth:`event_destroy` are used to keep
+       the room's :class:`WallIndex` up to date, so if you override
+       these methods, be sure to call the parent methods.  The index is
+       also updated whenever the position or bounding box of the wall
+       changes.
+
+    .. attribute:: physics_layer
+
+       A bitfield of the physics layers the wall is on.  Colliders only
+       interact with the wall if their :attr:`Collider.physics_mask`
+       attributes have at least one of these bits set.  Walls in each
+       layer are indexed separately, so colliders never even examine
+       walls they don't interact with.  If you change this attribute
+       after the wall has been added to the room, call
+       :meth:`WallIndex.update` afterwards.
+
+       Default value: ``1``
     """
 
+    physics_layer = 1
+    _unindexed_move = False
+
+    x = _position_property("x")
+    y = _position_property("y")
+    bbox_x = _position_property("bbox_x")
+    bbox_y = _position_property("bbox_y")
+    bbox_width = _position_property("bbox_width")
+    bbox_height = _position_property("bbox_height")
+
+    def _moved(self):
+        # Update the entries of this wall in the wall indexes which
+        # contain it after its position or bounding box has been set.
+        if self._unindexed_move:
+            return
+
+        for index in list(_wall_indexes.values()):
+            if self in index._entries:
+                index.update(self)
+
+    def event_create(self):
+        super(Wall, self).event_create()
+        index = _wall_indexes.get(sge.game.current_room)
+        if index is not None:
+            index.add(self)
+
+    def event_destroy(self):
+        super(Wall, self).event_destroy()
+        index = _wall_indexes.get(sge.game.current_room)
+        if index is not None:
+            index.remove(self)
+
 
 class SolidLeft(Wall):
 
@@ -1136,6 +1660,32 @@ class Slope(Wall):
 
     slope_xacceleration = 0
     slope_yacceleration = 0
+    _geometry = None
+
+    def _moved(self):
+        # Discard the cached geometry of the slope.
+        self._geometry = None
+        super(Slope, self)._moved()
+
+    def _get_geometry(self):
+        # Return the geometry of the slope as a tuple of the form
+        # (left, top, right, bottom, steepness, xmult, ymult), where
+        # ``steepness`` is the absolute value of the slope of the line
+        # and ``xmult`` and ``ymult`` are the fractions of movement along
+        # the slope which are horizontal and vertical, respectively.
+        # The geometry is cached until the position or bounding box of
+        # the slope changes.
+        geometry = self._geometry
+        if geometry is None:
+            width = self.bbox_width
+            height = self.bbox_height
+            h = math.hypot(width, height)
+            geometry = (self.bbox_left, self.bbox_top, self.bbox_right,
+                        self.bbox_bottom, height / width, width / h,
+                        height / h)
+            self._geometry = geometry
+
+        return geometry
 
 
 class SlopeTopLeft(Slope):
@@ -1183,10 +1733,9 @@ class SlopeTopLeft(Slope):
         the slope.
         """
         # x = (y - b) / m [b is 0]
-        m = -self.bbox_height / self.bbox_width
-        y -= self.bbox_top
-        x = y / m + self.bbox_right
-        return max(self.bbox_left, min(x, self.bbox_right))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        x = (y - top) / -m + right
+        return max(left, min(x, right))
 
     def get_slope_y(self, x):
         """
@@ -1194,10 +1743,9 @@ class SlopeTopLeft(Slope):
         the slope.
         """
         # y = mx + b [b is 0]
-        m = -self.bbox_height / self.bbox_width
-        x -= self.bbox_left
-        y = m * x + self.bbox_bottom
-        return max(self.bbox_top, min(y, self.bbox_bottom))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        y = -m * (x - left) + bottom
+        return max(top, min(y, bottom))
 
     def event_physics_collision_left(self, other, move_loss):
         """
@@ -1264,10 +1812,9 @@ class SlopeTopRight(Slope):
         the slope.
         """
         # x = (y - b) / m [b is 0]
-        m = self.bbox_height / self.bbox_width
-        y -= self.bbox_top
-        x = y / m + self.bbox_left
-        return max(self.bbox_left, min(x, self.bbox_right))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        x = (y - top) / m + left
+        return max(left, min(x, right))
 
     def get_slope_y(self, x):
         """
@@ -1275,10 +1822,9 @@ class SlopeTopRight(Slope):
         the slope.
         """
         # y = mx + b [b is 0]
-        m = self.bbox_height / self.bbox_width
-        x -= self.bbox_left
-        y = m * x + self.bbox_top
-        return max(self.bbox_top, min(y, self.bbox_bottom))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        y = m * (x - left) + top
+        return max(top, min(y, bottom))
 
     def event_physics_collision_right(self, other, move_loss):
         """
@@ -1344,10 +1890,9 @@ class SlopeBottomLeft(Slope):
         the slope.
         """
         # x = (y - b) / m [b is 0]
-        m = self.bbox_height / self.bbox_width
-        y -= self.bbox_top
-        x = y / m + self.bbox_left
-        return max(self.bbox_left, min(x, self.bbox_right))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        x = (y - top) / m + left
+        return max(left, min(x, right))
 
     def get_slope_y(self, x):
         """
@@ -1355,10 +1900,9 @@ class SlopeBottomLeft(Slope):
         the slope.
         """
         # y = mx + b [b is 0]
-        m = self.bbox_height / self.bbox_width
-        x -= self.bbox_left
-        y = m * x + self.bbox_top
-        return max(self.bbox_top, min(y, self.bbox_bottom))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        y = m * (x - left) + top
+        return max(top, min(y, bottom))
 
     def event_physics_collision_left(self, other, move_loss):
         """
@@ -1425,10 +1969,9 @@ class SlopeBottomRight(Slope):
         the slope.
         """
         # x = (y - b) / m [b is 0]
-        m = -self.bbox_height / self.bbox_width
-        y -= self.bbox_top
-        x = y / m + self.bbox_right
-        return max(self.bbox_left, min(x, self.bbox_right))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        x = (y - top) / -m + right
+        return max(left, min(x, right))
 
     def get_slope_y(self, x):
         """
@@ -1436,10 +1979,9 @@ class SlopeBottomRight(Slope):
         the slope.
         """
         # y = mx + b [b is 0]
-        m = -self.bbox_height / self.bbox_width
-        x -= self.bbox_left
-        y = m * x + self.bbox_bottom
-        return max(self.bbox_top, min(y, self.bbox_bottom))
+        left, top, right, bottom, m = self._get_geometry()[:5]
+        y = -m * (x - left) + bottom
+        return max(top, min(y, bottom))
 
     def event_physics_collision_right(self, other, move_loss):
         """
@@ -1482,6 +2024,13 @@ class MobileWall(Wall):
        attributes will work properly, but changing :attr:`x` and
        :attr:`y` manually will not cause any physics to occur.
 
+    .. note::
+
+       Mobile walls are added to and removed from the :class:`World` of
+       the current room in :meth:`event_create` and
+       :meth:`event_destroy`, in addition to the room's
+       :class:`WallIndex`.
+
     .. attribute:: push_left
 
        If set to :const:`True`, the wall will push any colliders
@@ -1559,6 +2108,7 @@ class MobileWall(Wall):
     sticky_right = False
     sticky_top = False
     sticky_bottom = False
+    _world = None
 
     def get_stuck_colliders(self):
         """
@@ -1566,90 +2116,152 @@ class MobileWall(Wall):
         this wall (i.e. will move along with the wall regardless of
         direction).
         """
+        if _profiler is not None:
+            _profiler.count("stuck_checks")
+
         stuck = []
 
         if self.sticky_left:
             if isinstance(self, SolidLeft):
-                for other in self.collision(Collider, x=(self.x - 1)):
-                    if not other.nonstick_right and not self.collision(other):
+                for other in self._get_colliders(x=(self.x - 1)):
+                    if not other.nonstick_right and not _collides(self, other):
                         stuck.append(other)
             if isinstance(self, SlopeTopLeft):
-                for other in self.collision(Collider, x=(self.x - 1)):
+                for other in self._get_colliders(x=(self.x - 1)):
                     x = self.get_slope_x(other.bbox_bottom)
                     if (not other.nonstick_right and other.bbox_right >= x and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_right - 1 < x)):
                         stuck.append(other)
             if isinstance(self, SlopeBottomLeft):
-                for other in self.collision(Collider, x=(self.x - 1)):
+                for other in self._get_colliders(x=(self.x - 1)):
                     x = self.get_slope_x(other.bbox_top)
                     if (not other.nonstick_right and other.bbox_right >= x and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_right - 1 < x)):
                         stuck.append(other)
 
         if self.sticky_right:
             if isinstance(self, SolidRight):
-                for other in self.collision(Collider, x=(self.x + 1)):
-                    if not other.nonstick_left and not self.collision(other):
+                for other in self._get_colliders(x=(self.x + 1)):
+                    if not other.nonstick_left and not _collides(self, other):
                         stuck.append(other)
             if isinstance(self, SlopeTopRight):
-                for other in self.collision(Collider, x=(self.x + 1)):
+                for other in self._get_colliders(x=(self.x + 1)):
                     x = self.get_slope_x(other.bbox_bottom)
                     if (not other.nonstick_left and other.bbox_left <= x and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_left + 1 > x)):
                         stuck.append(other)
             if isinstance(self, SlopeBottomRight):
-                for other in self.collision(Collider, x=(self.x + 1)):
+                for other in self._get_colliders(x=(self.x + 1)):
                     x = self.get_slope_x(other.bbox_top)
                     if (not other.nonstick_left and other.bbox_left <= x and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_left + 1 > x)):
                         stuck.append(other)
 
         if self.sticky_top:
             if isinstance(self, SolidTop):
-                for other in self.collision(Collider, y=(self.y - 1)):
-                    if not other.nonstick_bottom and not self.collision(other):
+                for other in self._get_colliders(y=(self.y - 1)):
+                    if (not other.nonstick_bottom and
+                            not _collides(self, other)):
                         stuck.append(other)
             if isinstance(self, SlopeTopLeft):
-                for other in self.collision(Collider, y=(self.y - 1)):
+                for other in self._get_colliders(y=(self.y - 1)):
                     y = self.get_slope_y(other.bbox_right)
                     if (not other.nonstick_bottom and other.bbox_bottom >= y and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_bottom - 1 < y)):
                         stuck.append(other)
             if isinstance(self, SlopeTopRight):
-                for other in self.collision(Collider, y=(self.y - 1)):
+                for other in self._get_colliders(y=(self.y - 1)):
                     y = self.get_slope_y(other.bbox_left)
                     if (not other.nonstick_bottom and other.bbox_bottom >= y and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_bottom - 1 < y)):
                         stuck.append(other)
 
         if self.sticky_bottom:
             if isinstance(self, SolidBottom):
-                for other in self.collision(Collider, y=(self.y + 1)):
-                    if not other.nonstick_top and not self.collision(other):
+                for other in self._get_colliders(y=(self.y + 1)):
+                    if not other.nonstick_top and not _collides(self, other):
                         stuck.append(other)
             if isinstance(self, SlopeBottomLeft):
-                for other in self.collision(Collider, y=(self.y + 1)):
+                for other in self._get_colliders(y=(self.y + 1)):
                     y = self.get_slope_y(other.bbox_right)
                     if (not other.nonstick_top and other.bbox_top <= y and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_top + 1 > y)):
                         stuck.append(other)
             if isinstance(self, SlopeBottomRight):
-                for other in self.collision(Collider, y=(self.y + 1)):
+                for other in self._get_colliders(y=(self.y + 1)):
                     y = self.get_slope_y(other.bbox_left)
                     if (not other.nonstick_top and other.bbox_top <= y and
-                            (not self.collision(other) or
+                            (not _collides(self, other) or
                              other.bbox_top + 1 > y)):
                         stuck.append(other)
 
         return stuck
 
+    def _get_colliders(self, x=None, y=None):
+        # Return a list of colliders colliding with this wall, like
+        # ``self.collision(Collider, x, y)``, excluding colliders which
+        # don't interact with this wall's physics layer.
+        layer = self.physics_layer
+        return [other for other in self.collision(Collider, x, y)
+                if other.physics_mask & layer]
+
+    def _get_push_hits(self, move, getter=None, probe=None, edge=None,
+                       greater=False, x=None, y=None):
+        # Yield each collider this wall pushes after moving by ``move``
+        # from ``x`` and ``y``, in order, as a tuple of the form
+        # ``(collider, value)``.  If ``getter`` is not None, this wall
+        # is a slope, and a collider is pushed if its ``edge`` edge is
+        # past the result of calling the slope's ``getter`` method with
+        # its ``probe`` edge (greater than it if ``greater`` is true,
+        # less than it otherwise), either by no more than ``move``, in
+        # which case ``value`` is that result, or while the wall wasn't
+        # colliding with it before moving, in which case ``value`` is
+        # None.  Otherwise, ``value`` is None and a collider is pushed
+        # if the wall wasn't colliding with it before moving.
+        colliders = self._get_colliders()
+        i = 0
+        while i < len(colliders):
+            box = None
+            if self.tangible:
+                left = self.bbox_left
+                top = self.bbox_top
+                if x is not None:
+                    left += x - self.x
+                if y is not None:
+                    top += y - self.y
+                box = (left, top, left + self.bbox_width,
+                       top + self.bbox_height)
+
+            i, value = _find_push(colliders, i, self, getter, probe, edge,
+                                  greater, move, box, _slope_kinds)
+            if i < 0:
+                break
+            yield colliders[i], value
+            i += 1
+
+    def event_create(self):
+        super(MobileWall, self).event_create()
+        world = _worlds.get(sge.game.current_room)
+        if world is not None:
+            world.add(self)
+
+    def event_destroy(self):
+        super(MobileWall, self).event_destroy()
+        world = _worlds.get(sge.game.current_room)
+        if world is not None:
+            world.remove(self)
+
+    def event_update_position(self, delta_mult):
+        if self._world is None:
+            super(MobileWall, self).event_update_position(delta_mult)
+
     def move_x(self, move):
         """
         Move the wall horizontally, handling physics.
@@ -1658,6 +2270,17 @@ class MobileWall(Wall):
 
         - ``move`` -- The amount to add to :attr:`x`.
         """
+        if not move:
+            # Otherwise, a wall in a stack of mobile collider walls
+            # would propagate even a move of zero up the whole stack.
+            return
+
+        subpixels = _subpixels
+        if subpixels is not None:
+            move = _snap(move, subpixels)
+            if not move:
+                return
+
         stuck = self.get_stuck_colliders()
         old_x = self.x
         self.x += move
@@ -1666,95 +2289,93 @@ class MobileWall(Wall):
 
         if move > 0:
             if isinstance(self, SolidRight):
-                for other in self.collision(Collider):
-                    if not self.collision(other, x=old_x):
+                for other, _ in self._get_push_hits(move, x=old_x):
+                    if self.push_right:
+                        other.move_x(self.bbox_right - other.bbox_left,
+                                     True)
+                    self.event_physics_collision_right(other, 0)
+                    other.event_physics_collision_left(self, 0)
+            if isinstance(self, SlopeTopRight):
+                for other, x in self._get_push_hits(
+                        move, "get_slope_x", "bbox_bottom", "bbox_left", False,
+                        x=old_x):
+                    if x is not None:
+                        if self.push_right:
+                            other.move_x(x - other.bbox_left, True)
+                            if self.push_up:
+                                y = self.get_slope_y(other.bbox_left)
+                                other.move_y(y - other.bbox_bottom, True)
+                        self.event_physics_collision_right(other, 0)
+                        other.event_physics_collision_left(self, 0)
+                    else:
                         if self.push_right:
                             other.move_x(self.bbox_right - other.bbox_left,
                                          True)
                         self.event_physics_collision_right(other, 0)
                         other.event_physics_collision_left(self, 0)
-            if isinstance(self, SlopeTopRight):
-                for other in self.collision(Collider):
-                    x = self.get_slope_x(other.bbox_bottom)
-                    if other.bbox_left < x:
-                        if other.bbox_left >= x - move:
-                            if self.push_right:
-                                other.move_x(x - other.bbox_left, True)
-                                if self.push_up:
-                                    y = self.get_slope_y(other.bbox_left)
-                                    other.move_y(y - other.bbox_bottom, True)
-                            self.event_physics_collision_right(other, 0)
-                            other.event_physics_collision_left(self, 0)
-                        elif not self.collision(other, x=old_x):
-                            if self.push_right:
-                                other.move_x(self.bbox_right - other.bbox_left,
-                                             True)
-                            self.event_physics_collision_right(other, 0)
-                            other.event_physics_collision_left(self, 0)
             if isinstance(self, SlopeBottomRight):
-                for other in self.collision(Collider):
-                    x = self.get_slope_x(other.bbox_top)
-                    if other.bbox_left < x:
-                        if other.bbox_left >= x - move:
-                            if self.push_right:
-                                other.move_x(x - other.bbox_left, True)
-                                if self.push_down:
-                                    y = self.get_slope_y(other.bbox_left)
-                                    other.move_y(y - other.bbox_top, True)
-                            self.event_physics_collision_right(other, 0)
-                            other.event_physics_collision_left(self, 0)
-                        elif not self.collision(other, x=old_x):
-                            if self.push_right:
-                                other.move_x(self.bbox_right - other.bbox_left,
-                                             True)
-                            self.event_physics_collision_right(other, 0)
-                            other.event_physics_collision_left(self, 0)
+                for other, x in self._get_push_hits(
+                        move, "get_slope_x", "bbox_top", "bbox_left", False,
+                        x=old_x):
+                    if x is not None:
+                        if self.push_right:
+                            other.move_x(x - other.bbox_left, True)
+                            if self.push_down:
+                                y = self.get_slope_y(other.bbox_left)
+                                other.move_y(y - other.bbox_top, True)
+                        self.event_physics_collision_right(other, 0)
+                        other.event_physics_collision_left(self, 0)
+                    else:
+                        if self.push_right:
+                            other.move_x(self.bbox_right - other.bbox_left,
+                                         True)
+                        self.event_physics_collision_right(other, 0)
+                        other.event_physics_collision_left(self, 0)
 
         elif move < 0:
             if isinstance(self, SolidLeft):
-                for other in self.collision(Collider):
-                    if not self.collision(other, x=old_x):
+                for other, _ in self._get_push_hits(move, x=old_x):
+                    if self.push_left:
+                        other.move_x(self.bbox_left - other.bbox_right,
+                                     True)
+                    self.event_physics_collision_left(other, 0)
+                    other.event_physics_collision_right(self, 0)
+            if isinstance(self, SlopeTopLeft):
+                for other, x in self._get_push_hits(
+                        move, "get_slope_x", "bbox_bottom", "bbox_right", True,
+                        x=old_x):
+                    if x is not None:
+                        if self.push_left:
+                            other.move_x(x - other.bbox_right, True)
+                            if self.push_up:
+                                y = self.get_slope_y(other.bbox_right)
+                                other.move_y(y - other.bbox_bottom, True)
+                        self.event_physics_collision_left(other, 0)
+                        other.event_physics_collision_right(self, 0)
+                    else:
                         if self.push_left:
                             other.move_x(self.bbox_left - other.bbox_right,
                                          True)
                         self.event_physics_collision_left(other, 0)
                         other.event_physics_collision_right(self, 0)
-            if isinstance(self, SlopeTopLeft):
-                for other in self.collision(Collider):
-                    x = self.get_slope_x(other.bbox_bottom)
-                    if other.bbox_right > x:
-                        if other.bbox_right <= x - move:
-                            if self.push_left:
-                                other.move_x(x - other.bbox_right, True)
-                                if self.push_up:
-                                    y = self.get_slope_y(other.bbox_right)
-                                    other.move_y(y - other.bbox_bottom, True)
-                            self.event_physics_collision_left(other, 0)
-                            other.event_physics_collision_right(self, 0)
-                        elif not self.collision(other, x=old_x):
-                            if self.push_left:
-                                other.move_x(self.bbox_left - other.bbox_right,
-                                             True)
-                            self.event_physics_collision_left(other, 0)
-                            other.event_physics_collision_right(self, 0)
             if isinstance(self, SlopeBottomLeft):
-                for other in self.collision(Collider):
-                    x = self.get_slope_x(other.bbox_top)
-                    if other.bbox_right > x:
-                        if other.bbox_right <= x - move:
-                            if self.push_left:
-                                other.move_x(x - other.bbox_right, True)
-                                if self.push_down:
-                                    y = self.get_slope_y(other.bbox_right)
-                                    other.move_y(y - other.bbox_top, True)
-                            self.event_physics_collision_left(other, 0)
-                            other.event_physics_collision_right(self, 0)
-                        elif not self.collision(other, x=old_x):
-                            if self.push_left:
-                                other.move_x(self.bbox_left - other.bbox_right,
-                                             True)
-                            self.event_physics_collision_left(other, 0)
-                            other.event_physics_collision_right(self, 0)
+                for other, x in self._get_push_hits(
+                        move, "get_slope_x", "bbox_top", "bbox_right", True,
+                        x=old_x):
+                    if x is not None:
+                        if self.push_left:
+                            other.move_x(x - other.bbox_right, True)
+                            if self.push_down:
+                                y = self.get_slope_y(other.bbox_right)
+                                other.move_y(y - other.bbox_top, True)
+                        self.event_physics_collision_left(other, 0)
+                        other.event_physics_collision_right(self, 0)
+                    else:
+                        if self.push_left:
+                            other.move_x(self.bbox_left - other.bbox_right,
+                                         True)
+                        self.event_physics_collision_left(other, 0)
+                        other.event_physics_collision_right(self, 0)
 
     def move_y(self, move):
         """
@@ -1764,6 +2385,17 @@ class MobileWall(Wall):
 
         - ``move`` -- The amount to add to :attr:`y`.
         """
+        if not move:
+            # Otherwise, a wall in a stack of mobile collider walls
+            # would propagate even a move of zero up the whole stack.
+            return
+
+        subpixels = _subpixels
+        if subpixels is not None:
+            move = _snap(move, subpixels)
+            if not move:
+                return
+
         stuck = self.get_stuck_colliders()
         old_y = self.y
         self.y += move
@@ -1772,94 +2404,92 @@ class MobileWall(Wall):
 
         if move > 0:
             if isinstance(self, SolidBottom):
-                for other in self.collision(Collider):
-                    if not self.collision(other, y=old_y):
+                for other, _ in self._get_push_hits(move, y=old_y):
+                    if self.push_down:
+                        other.move_y(self.bbox_bottom - other.bbox_top,
+                                     True)
+                    self.event_physics_collision_bottom(other, 0)
+                    other.event_physics_collision_top(self, 0)
+            if isinstance(self, SlopeBottomLeft):
+                for other, y in self._get_push_hits(
+                        move, "get_slope_y", "bbox_right", "bbox_top", False,
+                        y=old_y):
+                    if y is not None:
+                        if self.push_down:
+                            other.move_y(y - other.bbox_top, True)
+                            if self.push_left:
+                                x = self.get_slope_x(other.bbox_top)
+                                other.move_x(x - other.bbox_right, True)
+                        self.event_physics_collision_bottom(other, 0)
+                        other.event_physics_collision_top(self, 0)
+                    else:
                         if self.push_down:
                             other.move_y(self.bbox_bottom - other.bbox_top,
                                          True)
                         self.event_physics_collision_bottom(other, 0)
                         other.event_physics_collision_top(self, 0)
-            if isinstance(self, SlopeBottomLeft):
-                for other in self.collision(Collider):
-                    y = self.get_slope_y(other.bbox_right)
-                    if other.bbox_top < y:
-                        if other.bbox_top >= y - move:
-                            if self.push_down:
-                                other.move_y(y - other.bbox_top, True)
-                                if self.push_left:
-                                    x = self.get_slope_x(other.bbox_top)
-                                    other.move_x(x - other.bbox_right, True)
-                            self.event_physics_collision_bottom(other, 0)
-                            other.event_physics_collision_top(self, 0)
-                        elif not self.collision(other, y=old_y):
-                            if self.push_down:
-                                other.move_y(self.bbox_bottom - other.bbox_top,
-                                             True)
-                            self.event_physics_collision_bottom(other, 0)
-                            other.event_physics_collision_top(self, 0)
             if isinstance(self, SlopeBottomRight):
-                for other in self.collision(Collider):
-                    y = self.get_slope_y(other.bbox_left)
-                    if other.bbox_top < y:
-                        if other.bbox_top >= y - move:
-                            if self.push_down:
-                                other.move_y(y - other.bbox_top, True)
-                                if self.push_right:
-                                    x = self.get_slope_x(other.bbox_top)
-                                    other.move_x(x - other.bbox_left, True)
-                            self.event_physics_collision_bottom(other, 0)
-                            other.event_physics_collision_top(self, 0)
-                        elif not self.collision(other, y=old_y):
-                            if self.push_down:
-                                other.move_y(self.bbox_bottom - other.bbox_top,
-                                             True)
-                            self.event_physics_collision_bottom(other, 0)
-                            other.event_physics_collision_top(self, 0)
+                for other, y in self._get_push_hits(
+                        move, "get_slope_y", "bbox_left", "bbox_top", False,
+                        y=old_y):
+                    if y is not None:
+                        if self.push_down:
+                            other.move_y(y - other.bbox_top, True)
+                            if self.push_right:
+                                x = self.get_slope_x(other.bbox_top)
+                                other.move_x(x - other.bbox_left, True)
+                        self.event_physics_collision_bottom(other, 0)
+                        other.event_physics_collision_top(self, 0)
+                    else:
+                        if self.push_down:
+                            other.move_y(self.bbox_bottom - other.bbox_top,
+                                         True)
+                        self.event_physics_collision_bottom(other, 0)
+                        other.event_physics_collision_top(self, 0)
 
         elif move < 0:
             if isinstance(self, SolidTop):
-                for other in self.collision(Collider):
-                    if not self.collision(other, y=old_y):
+                for other, _ in self._get_push_hits(move, y=old_y):
+                    if self.push_up:
+                        other.move_y(self.bbox_top - other.bbox_bottom,
+                                     True)
+                    self.event_physics_collision_top(other, 0)
+                    other.event_physics_collision_bottom(self, 0)
+            if isinstance(self, SlopeTopLeft):
+                for other, y in self._get_push_hits(
+                        move, "get_slope_y", "bbox_right", "bbox_bottom", True,
+                        y=old_y):
+                    if y is not None:
                         if self.push_up:
-                            other.move_y(self.bbox_top - other.bbox_bottom,
-                                         True)
+                            other.move_y(y - other.bbox_bottom, True)
+                            if self.push_left:
+                                x = self.get_slope_x(other.bbox_bottom)
+                                other.move_x(x - other.bbox_right, True)
                         self.event_physics_collision_top(other, 0)
                         other.event_physics_collision_bottom(self, 0)
-            if isinstance(self, SlopeTopLeft):
-                for other in self.collision(Collider):
-                    y = self.get_slope_y(other.bbox_right)
-                    if other.bbox_bottom > y:
-                        if other.bbox_bottom <= y - move:
-                            if self.push_up:
-                                other.move_y(y - other.bbox_bottom, True)
-                                if self.push_left:
-                                    x = self.get_slope_x(other.bbox_bottom)
-                                    other.move_x(x - other.bbox_right, True)
-                            self.event_physics_collision_top(other, 0)
-                            other.event_physics_collision_bottom(self, 0)
-                        elif not self.collision(other, y=old_y):
+                    else:
+                        other.move_y(self.bbox_top - other.bbox_bottom,
+                                     True)
+                        self.event_physics_collision_top(other, 0)
+                        other.event_physics_collision_bottom(self, 0)
+            if isinstance(self, SlopeTopRight):
+                for other, y in self._get_push_hits(
+                        move, "get_slope_y", "bbox_left", "bbox_bottom", True,
+                        y=old_y):
+                    if y is not None:
+                        if self.push_up:
+                            other.move_y(y - other.bbox_bottom, True)
+                            if self.push_right:
+                                x = self.get_slope_x(other.bbox_bottom)
+                                other.move_x(x - other.bbox_left, True)
+                        self.event_physics_collision_top(other, 0)
+                        other.event_physics_collision_bottom(self, 0)
+                    else:
+                        if self.push_up:
                             other.move_y(self.bbox_top - other.bbox_bottom,
                                          True)
-                            self.event_physics_collision_top(other, 0)
-                            other.event_physics_collision_bottom(self, 0)
-            if isinstance(self, SlopeTopRight):
-                for other in self.collision(Collider):
-                    y = self.get_slope_y(other.bbox_left)
-                    if other.bbox_bottom > y:
-                        if other.bbox_bottom <= y - move:
-                            if self.push_up:
-                                other.move_y(y - other.bbox_bottom, True)
-                                if self.push_right:
-                                    x = self.get_slope_x(other.bbox_bottom)
-                                    other.move_x(x - other.bbox_left, True)
-                            self.event_physics_collision_top(other, 0)
-                            other.event_physics_collision_bottom(self, 0)
-                        elif not self.collision(other, y=old_y):
-                            if self.push_up:
-                                other.move_y(self.bbox_top - other.bbox_bottom,
-                                             True)
-                            self.event_physics_collision_top(other, 0)
-                            other.event_physics_collision_bottom(self, 0)
+                        self.event_physics_collision_top(other, 0)
+                        other.event_physics_collision_bottom(self, 0)
 
 
 class MobileColliderWall(MobileWall, Collider):
@@ -1886,10 +2516,17 @@ class MobileColliderWall(MobileWall, Collider):
 
         - ``move`` -- The amount to add to :attr:`y`.
         """
+        # The collider movement only finds out how far the wall can
+        # move, so the wall indexes are left alone until the wall
+        # actually moves.
         xprev = self.x
-        Collider.move_x(self, move, absolute, do_events, exclude_events)
-        real_move = self.x - xprev
-        self.x = xprev
+        self._unindexed_move = True
+        try:
+            Collider.move_x(self, move, absolute, do_events, exclude_events)
+            real_move = self.x - xprev
+            self.x = xprev
+        finally:
+            self._unindexed_move = False
         MobileWall.move_x(self, real_move)
 
     def move_y(self, move, absolute=False, do_events=True, exclude_events=()):
@@ -1901,9 +2538,13 @@ class MobileColliderWall(MobileWall, Collider):
         - ``move`` -- The amount to add to :attr:`y`.
         """
         yprev = self.y
-        Collider.move_y(self, move, absolute, do_events, exclude_events)
-        real_move = self.y - yprev
-        self.y = yprev
+        self._unindexed_move = True
+        try:
+            Collider.move_y(self, move, absolute, do_events, exclude_events)
+            real_move = self.y - yprev
+            self.y = yprev
+        finally:
+            self._unindexed_move = False
         MobileWall.move_y(self, real_move)
 
     def event_physics_collision_left(self, other, move_loss):
@@ -1978,3 +2619,1914 @@ class MobileColliderWall(MobileWall, Collider):
            should be pushing.
         """
         pass
+
+
+class WallIndex(object):
+
+    """
+    This class is a spatial hash of the :class:`Wall` objects in a room.
+    Each wall is stored in every cell its bounding box touches, in a
+    bucket of all walls as well as bucketed by which of
+    :class:`SolidLeft`, :class:`SolidRight`, :class:`SolidTop`,
+    :class:`SolidBottom`, :class:`SlopeTopLeft`, :class:`SlopeTopRight`,
+    :class:`SlopeBottomLeft`, and :class:`SlopeBottomRight` it is an
+    instance of, separately for each value of
+    :attr:`Wall.physics_layer`.  :class:`Collider`
+    objects use the index of the current room (see
+    :func:`get_wall_index`) to find walls instead of checking every
+    object in the respective object areas.
+
+    Creating a wall index for a room replaces any wall index previously
+    used for the room.  It is generally not necessary to create wall
+    indexes manually; :func:`get_wall_index` automatically creates one
+    if the room doesn't have one yet.  You should only need to create
+    one yourself if you want to use a different cell size than the
+    default.
+
+    .. attribute:: room
+
+       The room indexed.  This attribute is read-only.
+
+    .. attribute:: cell_width
+
+       The width of each cell.  This attribute is read-only.
+
+    .. attribute:: cell_height
+
+       The height of each cell.  This attribute is read-only.
+    """
+
+    @property
+    def room(self):
+        return self.__room()
+
+    @property
+    def cell_width(self):
+        return self.__cell_width
+
+    @property
+    def cell_height(self):
+        return self.__cell_height
+
+    def __init__(self, room=None, cell_width=32, cell_height=32):
+        """
+        Arguments:
+
+        - ``room`` -- The room to index.  Set to :const:`None` to use
+          the current room.
+
+        All other arguments set the respective initial attributes of the
+        index.  See the documentation for :class:`WallIndex` for more
+        information.
+        """
+        if room is None:
+            room = sge.game.current_room
+
+        self.__room = weakref.ref(room)
+        self.__cell_width = cell_width
+        self.__cell_height = cell_height
+        self._tick = 0
+        _wall_indexes[room] = self
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Discard the contents of the index and index all walls in the
+        room again.  Call this if many walls have changed in ways the
+        index isn't aware of.
+        """
+        self._buckets = {}
+        for cls in _WALL_CLASSES:
+            self._buckets[cls] = {}
+        self._entries = {}
+        self._bounds = None
+        self._changed = {}
+        self._tick += 1
+        self._base_tick = self._tick
+
+        for obj in self.room.objects:
+            if isinstance(obj, Wall):
+                self.add(obj)
+
+    def add(self, wall):
+        """
+        Add a wall to the index.  If the wall is already in the index,
+        its entry is updated.
+        """
+        if wall in self._entries:
+            self.remove(wall)
+
+        classes = [cls for cls in _WALL_CLASSES if isinstance(wall, cls)]
+        if isinstance(wall, Slope) and type(wall) not in _slope_kinds:
+            _slope_kinds[type(wall)] = _get_slope_kind(type(wall))
+        bbox = (wall.bbox_left, wall.bbox_top, wall.bbox_right,
+                wall.bbox_bottom)
+        layer = wall.physics_layer
+        i1, j1, i2, j2 = self._get_cells(*bbox)
+        for cls in classes:
+            layers = self._buckets[cls]
+            cells = layers.get(layer)
+            if cells is None:
+                layers[layer] = cells = {}
+            for i in range(i1, i2 + 1):
+                for j in range(j1, j2 + 1):
+                    cell = cells.get((i, j))
+                    if cell is None:
+                        cells[(i, j)] = cell = set()
+                    cell.add(wall)
+
+        self._entries[wall] = (classes, bbox, (i1, j1, i2, j2), layer)
+        self._mark_changed(i1, j1, i2, j2)
+
+        if self._bounds is None:
+            self._bounds = [i1, j1, i2, j2]
+        else:
+            b = self._bounds
+            b[0] = min(b[0], i1)
+            b[1] = min(b[1], j1)
+            b[2] = max(b[2], i2)
+            b[3] = max(b[3], j2)
+
+    def remove(self, wall):
+        """
+        Remove a wall from the index.  Nothing happens if the wall isn't
+        in the index.
+        """
+        entry = self._entries.pop(wall, None)
+        if entry is not None:
+            classes, bbox, (i1, j1, i2, j2), layer = entry
+            for cls in classes:
+                cells = self._buckets[cls][layer]
+                for i in range(i1, i2 + 1):
+                    for j in range(j1, j2 + 1):
+                        cell = cells.get((i, j))
+                        if cell is not None:
+                            cell.discard(wall)
+                            if not cell:
+                                del cells[(i, j)]
+
+            self._mark_changed(i1, j1, i2, j2)
+
+    def update(self, wall):
+        """
+        Update the entry of a wall whose position, bounding box, or
+        :attr:`Wall.physics_layer` has changed.  If the wall isn't in the
+        index, it is added.
+        """
+        entry = self._entries.get(wall)
+        if (entry is None or
+                entry[1] != (wall.bbox_left, wall.bbox_top, wall.bbox_right,
+                             wall.bbox_bottom) or
+                entry[3] != wall.physics_layer):
+            self.add(wall)
+
+    def invalidate_contacts(self, wall=None):
+        """
+        Invalidate the cached touching walls and slopes of colliders
+        near a wall (see :meth:`xsge_physics.Collider.invalidate_contacts`).
+        Call this after changing a wall in a way that can affect which
+        colliders it touches other than by moving it, for example after
+        changing its :attr:`tangible` attribute.
+
+        Arguments:
+
+        - ``wall`` -- The wall which has changed.  Set to
+          :const:`None` to invalidate the cached touching walls and
+          slopes of all colliders in the room.
+        """
+        if wall is None:
+            self._tick += 1
+            self._base_tick = self._tick
+        else:
+            entry = self._entries.get(wall)
+            if entry is not None:
+                self._mark_changed(*entry[2])
+
+    def get_walls(self, cls, x, y, width, height, mask=-1):
+        """
+        Return a list of tangible walls of class ``cls`` whose bounding
+        boxes collide with the indicated rectangle.
+
+        Arguments:
+
+        - ``cls`` -- The class of walls to return.  Can also be a tuple
+          of classes.
+        - ``x`` -- The horizontal position of the rectangle.
+        - ``y`` -- The vertical position of the rectangle.
+        - ``width`` -- The width of the rectangle.
+        - ``height`` -- The height of the rectangle.
+        - ``mask`` -- A bitfield of the physics layers to return walls
+          from (see :attr:`Wall.physics_layer`).
+        """
+        if not isinstance(cls, tuple):
+            cls = (cls,)
+
+        return self._query(cls, x, y, x + width, y + height, None, mask)
+
+    def _get_cells(self, left, top, right, bottom):
+        # Return the range of cells covered by the indicated edges as a
+        # tuple of the form (i1, j1, i2, j2), inclusive.  Infinite edges
+        # are limited to the bounds of the walls in the index.
+        b = self._bounds or (0, 0, 0, 0)
+        cw = self.cell_width
+        ch = self.cell_height
+        i1 = int(math.floor(left / cw)) if left > -_INF else b[0]
+        j1 = int(math.floor(top / ch)) if top > -_INF else b[1]
+        i2 = int(math.floor(right / cw)) if right < _INF else b[2]
+        j2 = int(math.floor(bottom / ch)) if bottom < _INF else b[3]
+        return (i1, j1, i2, j2)
+
+    def _mark_changed(self, i1, j1, i2, j2):
+        # Record that the indicated range of cells (inclusive) has
+        # changed.
+        self._tick += 1
+        tick = self._tick
+        changed = self._changed
+        for i in range(i1, i2 + 1):
+            for j in range(j1, j2 + 1):
+                changed[(i, j)] = tick
+
+    def _is_changed(self, cells, tick):
+        # Return whether or not any of the indicated range of cells
+        # (inclusive) has changed since ``tick``.
+        if tick == self._tick:
+            return False
+        if tick < self._base_tick:
+            return True
+
+        i1, j1, i2, j2 = cells
+        changed = self._changed
+        for i in range(i1, i2 + 1):
+            for j in range(j1, j2 + 1):
+                if changed.get((i, j), 0) > tick:
+                    return True
+
+        return False
+
+    def _query(self, classes, left, top, right, bottom, exclude=None,
+               mask=-1):
+        # Return a list of tangible walls of any of the classes in
+        # ``classes`` on any of the physics layers in ``mask`` strictly
+        # overlapping the indicated edges, excluding ``exclude``.
+        if _profiler is not None:
+            _profiler.count("queries")
+
+        r, candidates = _query_walls(self, classes, left, top, right, bottom,
+                                     exclude, mask)
+        if r is None:
+            # The compiled kernel only handles the indexed classes.
+            r, candidates = _py_query_walls(self, classes, left, top, right,
+                                            bottom, exclude, mask)
+
+        if _profiler is not None and candidates is not None:
+            _profiler.count("candidates", candidates)
+
+        return r
+
+
+class World(object):
+
+    """
+    This class updates the positions of all of the :class:`Collider`
+    and :class:`MobileWall` objects in a room at once, rather than each
+    object updating its own position in :meth:`event_update_position`.
+    Doing so allows the velocities of all colliders to be integrated in
+    one pass (using NumPy if it is available) and the walls near each
+    collider to be found with one :class:`WallIndex` query per frame,
+    which is much faster when there are many moving colliders.
+
+    Once a world has been created for a room, colliders and mobile
+    walls in the room no longer update their own positions; instead,
+    you must call :meth:`update` (or :meth:`step`) once per frame,
+    usually in :meth:`sge.dsp.Room.event_step`.  All mobile walls move
+    first, then all colliders move horizontally, and then all colliders
+    move vertically.  Otherwise, the movement of each object is the same
+    as if it had updated its own position.
+
+    A world can also update positions with a fixed timestep: if
+    :attr:`tick_rate` is set, :meth:`update` accumulates the real time
+    passed and calls :meth:`step` once for each tick that has elapsed,
+    rather than once per frame.  This makes the behavior of the physics
+    system and the time it takes each second independent of the frame
+    rate, and allows physics to be updated less often than the screen
+    is redrawn.  Since objects then only move on ticks,
+    :meth:`get_position` can be used to find positions between the last
+    two ticks to draw objects at for smooth movement.
+
+    Creating a world for a room replaces any world previously used for
+    the room.
+
+    .. note::
+
+       Colliders and mobile walls are added to and removed from the
+       world of the current room in :meth:`Collider.event_create`,
+       :meth:`Collider.event_destroy`, :meth:`MobileWall.event_create`,
+       and :meth:`MobileWall.event_destroy`, so if you override these
+       methods, be sure to call the parent methods.
+
+    .. attribute:: room
+
+       The room whose objects are updated.  This attribute is
+       read-only.
+
+    .. attribute:: tick_rate
+
+       The number of physics ticks per second, or :const:`None` to
+       update positions once per frame with the variable delta
+       multiplier passed to :meth:`update`.  Each tick moves objects as
+       far as ``sge.game.fps / tick_rate`` frames would.
+
+    .. attribute:: max_ticks
+
+       The maximum number of ticks :meth:`update` will execute in one
+       frame.  If more ticks than this have elapsed (e.g. because the
+       game was paused by the operating system), the extra time is
+       discarded, so that a slow frame can't cause a series of slower
+       and slower frames.
+
+    .. attribute:: alpha
+
+       How far between the last tick and the next tick the current time
+       is, from ``0`` to ``1``.  This is the fraction used by
+       :meth:`get_position`.  This attribute is read-only.
+    """
+
+    @property
+    def room(self):
+        return self.__room()
+
+    @property
+    def alpha(self):
+        if self.tick_rate is None:
+            return 1
+        else:
+            return min(1, self._accumulator * self.tick_rate / 1000)
+
+    def __init__(self, room=None, tick_rate=None, max_ticks=5):
+        """
+        Arguments:
+
+        - ``room`` -- The room to update the objects of.  Set to
+          :const:`None` to use the current room.
+
+        All other arguments set the respective initial attributes of the
+        world.  See the documentation for :class:`World` for more
+        information.
+        """
+        if room is None:
+            room = sge.game.current_room
+
+        old_world = _worlds.get(room)
+        if old_world is not None:
+            for obj in old_world._colliders + old_world._walls:
+                old_world.remove(obj)
+
+        self.__room = weakref.ref(room)
+        self.tick_rate = tick_rate
+        self.max_ticks = max_ticks
+        self._colliders = []
+        self._walls = []
+        self._accumulator = 0
+        self._previous = {}
+        _worlds[room] = self
+
+        for obj in room.objects:
+            if isinstance(obj, (Collider, MobileWall)):
+                self.add(obj)
+
+    def add(self, obj):
+        """
+        Add a collider or mobile wall to the world.  Nothing happens if
+        the object is already in the world.
+        """
+        if obj._world is not self:
+            if obj._world is not None:
+                obj._world.remove(obj)
+            obj._world = self
+            if isinstance(obj, Collider):
+                self._colliders.append(obj)
+            else:
+                self._walls.append(obj)
+
+    def remove(self, obj):
+        """
+        Remove a collider or mobile wall from the world, so that it
+        updates its own position again.  Nothing happens if the object
+        isn't in the world.
+        """
+        if obj._world is self:
+            obj._world = None
+            self._previous.pop(obj, None)
+            if isinstance(obj, Collider):
+                obj._broad_phase = None
+                self._colliders.remove(obj)
+            else:
+                self._walls.remove(obj)
+
+    def update(self, time_passed, delta_mult):
+        """
+        Update the positions of all objects in the world for one frame.
+        If :attr:`tick_rate` is :const:`None`, this is the same as
+        calling :meth:`step` with ``delta_mult``; otherwise,
+        :meth:`step` is called once for each tick that has elapsed.
+
+        Arguments:
+
+        - ``time_passed`` -- The real time in milliseconds that has
+          passed since the last frame.
+        - ``delta_mult`` -- The delta multiplier for the frame.
+
+        The arguments are the same as the arguments of
+        :meth:`sge.dsp.Room.event_step`, which they can be passed
+        directly from.
+        """
+        if self.tick_rate is None:
+            self.step(delta_mult)
+            return
+
+        tick_time = 1000 / self.tick_rate
+        self._accumulator += time_passed
+        ticks = int(self._accumulator // tick_time)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self._accumulator %= tick_time
+        else:
+            self._accumulator -= ticks * tick_time
+
+        tick_mult = sge.game.fps / self.tick_rate
+        for i in range(ticks):
+            self._previous = dict((obj, (obj.x, obj.y))
+                                  for obj in self._colliders + self._walls)
+            self.step(tick_mult)
+
+    def get_position(self, obj):
+        """
+        Return the position of an object in the world interpolated
+        between its positions after the last two ticks, according to
+        :attr:`alpha`, as a tuple in the form ``(x, y)``.  If
+        :attr:`tick_rate` is :const:`None` or the object hasn't been
+        updated by a tick yet, the object's current position is
+        returned.
+
+        This is useful for drawing objects smoothly when
+        :attr:`tick_rate` is less than the frame rate, e.g. by making
+        the objects invisible and projecting their sprites at the
+        returned positions.
+        """
+        previous = self._previous.get(obj)
+        if self.tick_rate is None or previous is None:
+            return (obj.x, obj.y)
+
+        alpha = self.alpha
+        return (previous[0] + (obj.x - previous[0]) * alpha,
+                previous[1] + (obj.y - previous[1]) * alpha)
+
+    def save(self):
+        """
+        Save the state of all objects in the world and return it as a
+        :class:`Snapshot`, which can be passed to :meth:`restore` to
+        return the objects to this state later, e.g. for rollback
+        networking or seeking in a replay.
+
+        Only the state the physics system uses to move objects is
+        saved: the position, velocity, acceleration, and deceleration
+        of each object, how long it has been since each collider
+        outside of the :class:`ActivationRegion` was last updated, and
+        the time accumulated toward the next tick.  Contacts and whether
+        or not colliders are asleep (see :attr:`Collider.sleeping`) are
+        derived from these, so they don't need to be saved.  Any other
+        state, such as which objects exist, must be saved by the game.
+        """
+        objects = tuple(self._colliders + self._walls)
+        data = array.array("d")
+        for obj in objects:
+            coarse = getattr(obj, "_coarse", None)
+            if coarse is None:
+                coarse = (_NAN, _NAN)
+            data.extend((obj.x, obj.y, obj.xvelocity, obj.yvelocity,
+                         obj.xacceleration, obj.yacceleration,
+                         obj.xdeceleration, obj.ydeceleration, coarse[0],
+                         coarse[1]))
+
+        region = _activation_regions.get(self.room)
+        phase = region._phase if region is not None else 0
+        return Snapshot(objects, data, self._accumulator, phase)
+
+    def restore(self, snapshot):
+        """
+        Return the objects in a :class:`Snapshot` created by
+        :meth:`save` to the state they were in when it was created.
+        Objects which have been added to the world since then are not
+        affected.
+        """
+        data = snapshot.data
+        i = 0
+        for obj in snapshot.objects:
+            (obj.x, obj.y, obj.xvelocity, obj.yvelocity, obj.xacceleration,
+             obj.yacceleration, obj.xdeceleration,
+             obj.ydeceleration) = data[i:(i + 8)]
+            if isinstance(obj, Collider):
+                if data[i + 8] == data[i + 8]:
+                    obj._coarse = [data[i + 8], data[i + 9]]
+                else:
+                    obj._coarse = None
+            i += 10
+
+        region = _activation_regions.get(self.room)
+        if region is not None:
+            region._phase = snapshot._phase
+        self._accumulator = snapshot._accumulator
+        self._previous = {}
+
+    def resimulate(self, snapshot, frames, callback=None, delta_mult=None):
+        """
+        Restore a :class:`Snapshot` with :meth:`restore` and then call
+        :meth:`step` a number of times, e.g. to catch up to the present
+        again after correcting the inputs of a past frame in rollback
+        networking.
+
+        Arguments:
+
+        - ``snapshot`` -- The snapshot to start from.
+        - ``frames`` -- The number of times to call :meth:`step`.
+        - ``callback`` -- A function to call before each step with the
+          number of the step (starting at ``0``) as an argument, which
+          should apply the inputs for that step (e.g. by setting the
+          velocities of player objects).  Set to :const:`None` for no
+          callback.
+        - ``delta_mult`` -- The delta multiplier to pass to
+          :meth:`step`.  Set to :const:`None` to use the multiplier of
+          one tick if :attr:`tick_rate` is set, or ``1`` otherwise.
+        """
+        if delta_mult is None:
+            if self.tick_rate is None:
+                delta_mult = 1
+            else:
+                delta_mult = sge.game.fps / self.tick_rate
+
+        self.restore(snapshot)
+        for i in range(frames):
+            if callback is not None:
+                callback(i)
+            self.step(delta_mult)
+
+    def step(self, delta_mult):
+        """
+        Update the positions of all active objects in the world once.
+
+        Arguments:
+
+        - ``delta_mult`` -- What speed and acceleration should be
+          multiplied by as a result of delta timing.  See the
+          documentation for :meth:`sge.dsp.Object.event_update_position`
+          for more information.
+        """
+        if not delta_mult:
+            return
+
+        for wall in self._walls[:]:
+            if wall.active:
+                super(MobileWall, wall).event_update_position(delta_mult)
+
+        # Colliders outside of the activation region may be updated with
+        # different delta multipliers, so colliders are updated in
+        # groups with the same delta multiplier.
+        region = _activation_regions.get(self.room)
+        groups = {}
+        for collider in self._colliders:
+            if collider.active:
+                mult = delta_mult
+                if region is not None:
+                    mult = region._get_delta_mult(collider, delta_mult)
+                if mult and not collider._is_asleep():
+                    groups.setdefault(mult, []).append(collider)
+
+        for mult in sorted(groups):
+            self._step_colliders(groups[mult], mult)
+
+    def _step_colliders(self, colliders, delta_mult):
+        # Update the positions of ``colliders`` with ``delta_mult``.
+        # First, in a broad phase, find the walls near where each
+        # collider could move this frame.  Since deceleration only ever
+        # slows a collider down, it can move at most
+        # ``(abs(v) + abs(a) * delta_mult / 2) * delta_mult`` along each
+        # axis, where ``v`` is its velocity and ``a`` its acceleration.
+        # Acceleration from slopes isn't known yet, but if a collider
+        # moves farther than this, it just falls back to querying the
+        # wall index.
+        index = get_wall_index(self.room)
+        half = delta_mult / 2
+        for collider in colliders:
+            if collider.tangible:
+                v = abs(collider.xvelocity) + abs(collider.yvelocity)
+                a = abs(collider.xacceleration) + abs(collider.yacceleration)
+                m = (v + a * half) * delta_mult + 2
+                left = collider.bbox_left - m
+                top = collider.bbox_top - m
+                right = collider.bbox_right + m
+                bottom = collider.bbox_bottom + m
+                cells = index._get_cells(left, top, right, bottom)
+                walls = index._query((Wall,), left, top, right, bottom,
+                                     collider, collider.physics_mask)
+                collider._broad_phase = [index, cells, index._tick, left, top,
+                                         right, bottom, walls, {}]
+
+        profiler = _profiler
+        try:
+            accel = [c._get_acceleration() for c in colliders]
+            xvelocities, xmoves = _integrate(
+                [c.xvelocity for c in colliders], [a[0] for a in accel],
+                [c.xdeceleration for c in colliders], delta_mult)
+            for i in range(len(colliders)):
+                if profiler is not None:
+                    start_time = _clock()
+                colliders[i].xvelocity = xvelocities[i]
+                colliders[i].move_x(xmoves[i])
+                if profiler is not None:
+                    profiler._add_time(colliders[i], _clock() - start_time)
+
+            # Collision events may have changed vertical velocities.
+            yvelocities, ymoves = _integrate(
+                [c.yvelocity for c in colliders], [a[1] for a in accel],
+                [c.ydeceleration for c in colliders], delta_mult)
+            for i in range(len(colliders)):
+                if profiler is not None:
+                    start_time = _clock()
+                colliders[i].yvelocity = yvelocities[i]
+                colliders[i].move_y(ymoves[i])
+                if profiler is not None:
+                    profiler._add_time(colliders[i], _clock() - start_time)
+        finally:
+            for collider in colliders:
+                collider._broad_phase = None
+
+
+class ActivationRegion(object):
+
+    """
+    This class limits updating the positions of colliders to those in
+    the part of a room around its views, so that colliders far away
+    from what the player can see don't use any time.  The region is
+    made up of the rectangles of the room's views, each enlarged by
+    :attr:`margin` on every side.  Colliders whose bounding boxes are
+    outside of the region are handled according to their
+    :attr:`Collider.activation_mode` attributes; by default, their
+    positions aren't updated until the region reaches them again.
+
+    Only the positions of colliders are affected; their events are
+    executed as usual, and mobile walls are always updated.  This
+    applies both to colliders updating their own positions and to
+    colliders updated by a :class:`World`.
+
+    Creating an activation region for a room replaces any activation
+    region previously used for the room.  Unlike :class:`WallIndex` and
+    :class:`World`, an activation region is never created automatically.
+
+    .. attribute:: room
+
+       The room the region is in.  This attribute is read-only.
+
+    .. attribute:: margin
+
+       The distance in pixels the region extends beyond each view.
+       Colliders are updated again as soon as the region touches them,
+       so this should be large enough that colliders have had time to
+       settle into their surroundings by the time they come into view.
+
+    .. attribute:: coarse_interval
+
+       The number of frames between updates of colliders which are
+       outside of the region and whose
+       :attr:`Collider.activation_mode` attributes are ``"coarse"``.
+    """
+
+    @property
+    def room(self):
+        return self.__room()
+
+    def __init__(self, room=None, margin=128, coarse_interval=8):
+        """
+        Arguments:
+
+        - ``room`` -- The room to limit updates in.  Set to
+          :const:`None` to use the current room.
+
+        All other arguments set the respective initial attributes of the
+        region.  See the documentation for :class:`ActivationRegion` for
+        more information.
+        """
+        if room is None:
+            room = sge.game.current_room
+
+        self.__room = weakref.ref(room)
+        self.margin = margin
+        self.coarse_interval = coarse_interval
+        self._rects = None
+        self._rects_key = None
+        self._phase = 0
+        _activation_regions[room] = self
+
+    def get_rects(self):
+        """
+        Return a list of the rectangles making up the region, as tuples
+        in the form ``(left, top, right, bottom)``.
+        """
+        m = self.margin
+        key = [m]
+        for view in self.room.views:
+            key.extend((view.x, view.y, view.width, view.height))
+        key = tuple(key)
+        if key != self._rects_key:
+            self._rects_key = key
+            self._rects = [(view.x - m, view.y - m, view.x + view.width + m,
+                            view.y + view.height + m)
+                           for view in self.room.views]
+
+        return self._rects
+
+    def contains(self, obj):
+        """
+        Return whether or not the bounding box of ``obj`` is at least
+        partly inside the region.
+        """
+        left = obj.bbox_left
+        top = obj.bbox_top
+        right = obj.bbox_right
+        bottom = obj.bbox_bottom
+        for rect in self.get_rects():
+            if (left < rect[2] and right > rect[0] and top < rect[3] and
+                    bottom > rect[1]):
+                return True
+
+        return False
+
+    def _get_delta_mult(self, collider, delta_mult):
+        # Return the delta multiplier ``collider`` should be updated
+        # with this frame, which is 0 if it shouldn't be updated.
+        mode = collider.activation_mode
+        if mode == "always" or self.contains(collider):
+            collider._coarse = None
+            return delta_mult
+        elif mode == "coarse":
+            coarse = collider._coarse
+            if coarse is None:
+                # Spread out the first updates of colliders leaving the
+                # region together (e.g. when the room starts), so that
+                # they aren't all updated in the same frame thereafter.
+                interval = max(1, int(self.coarse_interval))
+                coarse = [0, 1 + self._phase % interval]
+                collider._coarse = coarse
+                self._phase += 1
+
+            coarse[0] += delta_mult
+            if coarse[0] >= coarse[1]:
+                mult = coarse[0]
+                coarse[0] = 0
+                coarse[1] = self.coarse_interval
+                return mult
+
+        return 0
+
+
+class Snapshot(object):
+
+    """
+    This class stores the state of the objects in a :class:`World`, as
+    saved by :meth:`World.save`.  The state is packed into a single
+    array of floating-point numbers, so creating a snapshot is cheap
+    enough to do every frame.
+
+    .. attribute:: objects
+
+       A tuple of the colliders and mobile walls whose state is saved.
+
+    .. attribute:: data
+
+       An :class:`array.array` of the saved state of each object in
+       :attr:`objects`, in order.
+    """
+
+    def __init__(self, objects, data, accumulator=0, phase=0):
+        self.objects = objects
+        self.data = data
+        self._accumulator = accumulator
+        self._phase = phase
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __repr__(self):
+        return "<Snapshot of {} objects>".format(len(self.objects))
+
+
+class Hit(object):
+
+    """
+    This class represents where a cast with :func:`raycast` or
+    :func:`boxcast` hit a wall.
+
+    .. attribute:: wall
+
+       The wall that was hit.
+
+    .. attribute:: x
+
+       The horizontal position of the hit.  For :func:`raycast`, this is
+       the point where the ray hit the wall; for :func:`boxcast`, this
+       is the left edge of the box when it hit the wall.
+
+    .. attribute:: y
+
+       The vertical position of the hit.  For :func:`raycast`, this is
+       the point where the ray hit the wall; for :func:`boxcast`, this
+       is the top edge of the box when it hit the wall.
+
+    .. attribute:: xnormal
+
+       The horizontal component of the unit vector perpendicular to the
+       surface that was hit, pointing away from the wall.
+
+    .. attribute:: ynormal
+
+       The vertical component of the unit vector perpendicular to the
+       surface that was hit, pointing away from the wall.
+
+    .. attribute:: fraction
+
+       How far along the cast the hit is, from ``0`` (the start) to
+       ``1`` (the end).
+    """
+
+    def __init__(self, wall, x, y, xnormal, ynormal, fraction):
+        self.wall = wall
+        self.x = x
+        self.y = y
+        self.xnormal = xnormal
+        self.ynormal = ynormal
+        self.fraction = fraction
+
+    def __repr__(self):
+        return "<Hit of {!r} at ({}, {})>".format(self.wall, self.x, self.y)
+
+
+class Profiler(object):
+
+    """
+    This class records how much work the physics system does in each
+    frame, which can be used to find out why frames are slow.  While no
+    profiler is running, this costs next to nothing.
+
+    To use a profiler, call :meth:`start`, then call
+    :meth:`next_frame` once per frame (e.g. in
+    :meth:`sge.dsp.Game.event_step`).  The following counters are
+    recorded for each frame:
+
+    - ``"queries"`` -- The number of times colliders looked for walls.
+    - ``"candidates"`` -- The number of walls examined by those
+      queries.
+    - ``"move_x"`` -- The number of calls to
+      :meth:`Collider.move_x`, including calls made by other physics
+      methods (e.g. when a collider walks up a slope).
+    - ``"move_y"`` -- The number of calls to :meth:`Collider.move_y`,
+      likewise.
+    - ``"max_depth"`` -- The greatest number of nested calls to
+      :meth:`Collider.move_x` and :meth:`Collider.move_y`.
+    - ``"events"`` -- The number of collisions which caused physics
+      collision events to be executed as a result of
+      :meth:`Collider.move_x` and :meth:`Collider.move_y`.
+    - ``"stuck_checks"`` -- The number of calls to
+      :meth:`MobileWall.get_stuck_colliders`.
+
+    Additionally, the time spent updating the positions of colliders,
+    in seconds, is recorded for each collider class under names of the
+    form ``"time:ClassName"``.
+
+    .. attribute:: max_frames
+
+       The maximum number of frames to keep the records of.  Records of
+       older frames are discarded.  Set to :const:`None` for no limit.
+       This attribute is read-only.
+
+    .. attribute:: frames
+
+       A :class:`collections.deque` of the records of past frames,
+       oldest first.  Each record is a dictionary mapping the names of
+       counters and timings to their values for the frame.  Counters
+       and timings which are zero are left out.
+
+    .. attribute:: current
+
+       The record of the current frame.
+    """
+
+    @property
+    def max_frames(self):
+        return self.frames.maxlen
+
+    def __init__(self, max_frames=600):
+        """
+        Arguments:
+
+        - ``max_frames`` -- The initial value of :attr:`max_frames`.
+        """
+        self.frames = collections.deque(maxlen=max_frames)
+        self.current = {}
+        self._depth = 0
+
+    def start(self):
+        """
+        Start recording.  If another profiler is running, it is stopped
+        first.
+        """
+        global _profiler
+        _profiler = self
+        self._depth = 0
+
+    def stop(self):
+        """
+        Stop recording.  Nothing happens if the profiler isn't running.
+        """
+        global _profiler
+        if _profiler is self:
+            _profiler = None
+
+    def next_frame(self):
+        """
+        Add the record of the current frame to :attr:`frames` and start
+        a new record.
+        """
+        self.frames.append(self.current)
+        self.current = {}
+
+    def count(self, name, n=1):
+        """
+        Add ``n`` to the counter called ``name`` for the current frame.
+        This can also be used to record your own counters.
+        """
+        self.current[name] = self.current.get(name, 0) + n
+
+    def get_values(self, name):
+        """
+        Return a list of the values of the counter or timing called
+        ``name`` in each frame in :attr:`frames`.
+        """
+        return [frame.get(name, 0) for frame in self.frames]
+
+    def report(self):
+        """
+        Return a string summarizing every counter and timing over all
+        frames in :attr:`frames`: the total, the mean per frame, the
+        median, the 95th percentile, and the maximum.
+        """
+        names = set()
+        for frame in self.frames:
+            names.update(frame)
+
+        lines = ["{0} frames".format(len(self.frames)),
+                 "{0:<24}{1:>12}{2:>12}{3:>12}{4:>12}{5:>12}".format(
+                     "name", "total", "mean", "median", "95%", "max")]
+        for name in sorted(names):
+            values = sorted(self.get_values(name))
+            total = sum(values)
+            lines.append(
+                "{0:<24}{1:>12.6g}{2:>12.6g}{3:>12.6g}{4:>12.6g}"
+                "{5:>12.6g}".format(name, total, total / len(values),
+                                    _percentile(values, 0.5),
+                                    _percentile(values, 0.95),
+                                    values[-1]))
+
+        return "\n".join(lines)
+
+    def histogram(self, name, bins=10, width=40):
+        """
+        Return a string showing a histogram of the values of the counter
+        or timing called ``name`` over all frames in :attr:`frames`.
+
+        Arguments:
+
+        - ``bins`` -- The number of bins to divide the values into.
+        - ``width`` -- The length of the longest bar in characters.
+        """
+        values = self.get_values(name)
+        if not values:
+            return ""
+
+        low = min(values)
+        high = max(values)
+        size = (high - low) / bins or 1
+        counts = [0] * bins
+        for value in values:
+            counts[min(int((value - low) / size), bins - 1)] += 1
+
+        lines = []
+        most = max(counts)
+        for i in range(bins):
+            bar = "#" * int(round(counts[i] * width / most))
+            lines.append("{0:>12.6g} {1:>8} {2}".format(low + i * size,
+                                                          counts[i], bar))
+
+        return "\n".join(lines)
+
+    def _enter(self):
+        # Record the start of a call to Collider.move_x or
+        # Collider.move_y.
+        self._depth += 1
+        if self._depth > self.current.get("max_depth", 0):
+            self.current["max_depth"] = self._depth
+
+    def _exit(self, name):
+        # Record the end of a call to the Collider method ``name``.
+        self._depth = max(0, self._depth - 1)
+        self.count(name)
+
+    def _add_time(self, obj, seconds):
+        # Record time spent updating the position of ``obj``.
+        self.count("time:" + type(obj).__name__, seconds)
+
+
+def get_wall_index(room=None):
+    """
+    Return the :class:`WallIndex` used for a room, creating it if it
+    doesn't exist yet.
+
+    Arguments:
+
+    - ``room`` -- The room to get the wall index of.  Set to
+      :const:`None` to use the current room.
+    """
+    if room is None:
+        room = sge.game.current_room
+
+    index = _wall_indexes.get(room)
+    if index is None:
+        index = WallIndex(room)
+
+    return index
+
+
+def get_world(room=None):
+    """
+    Return the :class:`World` used for a room, or :const:`None` if the
+    room doesn't have one.
+
+    Arguments:
+
+    - ``room`` -- The room to get the world of.  Set to :const:`None`
+      to use the current room.
+    """
+    if room is None:
+        room = sge.game.current_room
+
+    return _worlds.get(room)
+
+
+def get_activation_region(room=None):
+    """
+    Return the :class:`ActivationRegion` used for a room, or
+    :const:`None` if the room doesn't have one.
+
+    Arguments:
+
+    - ``room`` -- The room to get the activation region of.  Set to
+      :const:`None` to use the current room.
+    """
+    if room is None:
+        room = sge.game.current_room
+
+    return _activation_regions.get(room)
+
+
+def get_profiler():
+    """
+    Return the :class:`Profiler` which is currently running, or
+    :const:`None` if no profiler is running.
+    """
+    return _profiler
+
+
+def set_subpixels(subpixels):
+    """
+    Enable or disable fixed-point coordinates.
+
+    Normally, :class:`Collider` compares bounding box edges and slope
+    positions by rounding them to :data:`NDIG` decimal places, which
+    can give slightly different results depending on how a position
+    was reached.  In fixed-point mode, positions of colliders and the
+    distances moved by :class:`MobileWall` objects are instead snapped
+    to a grid of ``subpixels`` steps per pixel, and these comparisons
+    are done with integer numbers of subpixels, so they are exact.
+    Since every position is then a whole number of subpixels, the
+    simulation is reproducible exactly, which is useful for replays
+    and lockstep networking.
+
+    Arguments:
+
+    - ``subpixels`` -- The number of subpixels per pixel.  Must be a
+      positive power of two so that every position on the grid can
+      be represented exactly.  Set to :const:`None` to disable
+      fixed-point coordinates, which is the default.
+
+    Moves smaller than half a subpixel are discarded in fixed-point
+    mode, so choose a value which is fine enough for the smallest
+    speeds used by your game; 256 is a reasonable choice.
+    """
+    global _subpixels, _quantize
+    if subpixels is None:
+        _subpixels = None
+        _quantize = _round
+    else:
+        subpixels = int(subpixels)
+        if subpixels < 1 or subpixels & (subpixels - 1):
+            raise ValueError("subpixels must be a positive power of two")
+
+        def quantize(value, subpixels=subpixels, floor=math.floor):
+            return int(floor(value * subpixels + 0.5))
+
+        _subpixels = subpixels
+        _quantize = quantize
+
+
+def get_subpixels():
+    """
+    Return the number of subpixels per pixel set by
+    :func:`set_subpixels`, or :const:`None` if fixed-point coordinates
+    are disabled.
+    """
+    return _subpixels
+
+
+def set_kernel(enabled):
+    """
+    Enable or disable the compiled collision kernel.
+
+    xsge_physics includes an optional C extension module which speeds
+    up finding walls in the :class:`WallIndex` and resolving collisions
+    of colliders with walls and slopes and of :class:`MobileWall`
+    objects with colliders.  It is built by ``setup.py`` if a C
+    compiler is available and used automatically if it was built.
+    Otherwise, or if it is disabled, equivalent pure Python code is
+    used, which gives identical results, only more slowly; disabling
+    the kernel is mainly useful for checking that this is the case.
+
+    Arguments:
+
+    - ``enabled`` -- Whether or not to use the compiled kernel.  If it
+      isn't available, the pure Python code is used regardless.
+    """
+    global _resolve_solids, _query_walls, _filter_walls, _find_slope
+    global _find_push
+    if enabled and _kernel is not None:
+        _resolve_solids = _kernel.resolve_solids
+        _query_walls = _kernel.query_walls
+        _filter_walls = _kernel.filter_walls
+        _find_slope = _kernel.find_slope
+        _find_push = _kernel.find_push
+    else:
+        _resolve_solids = _py_resolve_solids
+        _query_walls = _py_query_walls
+        _filter_walls = _py_filter_walls
+        _find_slope = _py_find_slope
+        _find_push = _py_find_push
+
+
+def get_kernel():
+    """
+    Return whether or not the compiled collision kernel is in use (see
+    :func:`set_kernel`).
+    """
+    return _resolve_solids is not _py_resolve_solids
+
+
+def raycast(x1, y1, x2, y2, mask=-1, room=None):
+    """
+    Find the first wall the line segment from ``(x1, y1)`` to
+    ``(x2, y2)`` hits and return a :class:`Hit` describing it, or
+    :const:`None` if the line doesn't hit any wall.
+
+    Only sides of walls that would stop a collider moving in the same
+    direction as the line are hit: for example, a downward line hits the
+    top of a :class:`SolidTop` object, but a line going in any other
+    direction passes through it, and lines only hit the sloped sides of
+    slopes.  Lines starting exactly on a side they move into hit it
+    immediately.  Intangible walls are never hit.
+
+    This function uses the wall index of the room (see
+    :class:`WallIndex`), only examining walls in the cells the line
+    passes through, in order, until a wall is hit.
+
+    Arguments:
+
+    - ``mask`` -- A bitfield of the physics layers of walls which can
+      be hit (see :attr:`Wall.physics_layer`).
+    - ``room`` -- The room to cast the line in.  Set to :const:`None`
+      to use the current room.
+    """
+    index = get_wall_index(room)
+    if index._bounds is None:
+        return None
+
+    dx = x2 - x1
+    dy = y2 - y1
+    cw = index.cell_width
+    ch = index.cell_height
+    i = int(math.floor(x1 / cw))
+    j = int(math.floor(y1 / ch))
+    i2 = int(math.floor(x2 / cw))
+    j2 = int(math.floor(y2 / ch))
+    istep = 1 if dx > 0 else -1
+    jstep = 1 if dy > 0 else -1
+    if dx:
+        tx = ((i + (dx > 0)) * cw - x1) / dx
+        tdx = cw / abs(dx)
+    else:
+        tx = _INF
+        tdx = _INF
+    if dy:
+        ty = ((j + (dy > 0)) * ch - y1) / dy
+        tdy = ch / abs(dy)
+    else:
+        ty = _INF
+        tdy = _INF
+
+    buckets = [cells for layer, cells in index._buckets[Wall].items()
+               if layer & mask]
+    seen = set()
+    best = None
+    b = index._bounds
+    for n in range(abs(i2 - i) + abs(j2 - j) + 1):
+        if b[0] <= i <= b[2] and b[1] <= j <= b[3]:
+            for cells in buckets:
+                for wall in cells.get((i, j), ()):
+                    if wall in seen or not wall.tangible:
+                        continue
+                    seen.add(wall)
+                    for surface in _get_surfaces(wall):
+                        nx, ny = surface[4:6]
+                        if dx * nx + dy * ny >= 0:
+                            continue
+                        t = _intersect(x1, y1, dx, dy, surface, surface[6])
+                        if t is not None and (best is None or t < best[0]):
+                            best = (t, wall, nx, ny)
+
+        # Walls in later cells can't be hit before the end of this one.
+        t_exit = min(tx, ty)
+        if best is not None and best[0] <= t_exit:
+            break
+
+        if tx < ty:
+            i += istep
+            tx += tdx
+        else:
+            j += jstep
+            ty += tdy
+
+    if best is not None:
+        t, wall, nx, ny = best
+        return Hit(wall, x1 + dx * t, y1 + dy * t, nx, ny, t)
+
+    return None
+
+
+def boxcast(x, y, width, height, xmove, ymove, mask=-1, room=None):
+    """
+    Find the first wall a rectangle moving in a straight line hits and
+    return a :class:`Hit` describing it, or :const:`None` if the
+    rectangle doesn't hit any wall.  This can be used to find out how
+    far a collider could move in a straight line without moving it.
+
+    As with :func:`raycast`, only sides of walls that would stop a
+    collider moving in the same direction as the rectangle are hit.
+    As with collisions, the rectangle must overlap a side (not just
+    touch one of its ends) to hit it.  Note that, unlike
+    :meth:`Collider.move_x` and :meth:`Collider.move_y`, this doesn't
+    slide along walls or follow slopes.
+
+    Arguments:
+
+    - ``x`` -- The horizontal position of the left edge of the
+      rectangle at the start.
+    - ``y`` -- The vertical position of the top edge of the rectangle
+      at the start.
+    - ``width`` -- The width of the rectangle.
+    - ``height`` -- The height of the rectangle.
+    - ``xmove`` -- The distance to move the rectangle horizontally.
+    - ``ymove`` -- The distance to move the rectangle vertically.
+    - ``mask`` -- A bitfield of the physics layers of walls which can
+      be hit (see :attr:`Wall.physics_layer`).
+    - ``room`` -- The room to cast the rectangle in.  Set to
+      :const:`None` to use the current room.
+    """
+    if not xmove and not ymove:
+        return None
+
+    index = get_wall_index(room)
+    walls = index._query((Wall,), min(x, x + xmove), min(y, y + ymove),
+                         max(x, x + xmove) + width,
+                         max(y, y + ymove) + height, None, mask)
+    corners = [(x, y), (x + width, y), (x, y + height),
+               (x + width, y + height)]
+    best = None
+    for wall in walls:
+        for surface in _get_surfaces(wall):
+            nx, ny = surface[4:6]
+            if xmove * nx + ymove * ny >= 0:
+                continue
+
+            # The first contact is either a corner of the rectangle
+            # nearest the side hitting the side, or an end of the side
+            # hitting an edge of the rectangle.
+            lowest = min(cx * nx + cy * ny for cx, cy in corners)
+            for cx, cy in corners:
+                if cx * nx + cy * ny <= lowest + 1e-9:
+                    t = _intersect(cx, cy, xmove, ymove, surface, True)
+                    if t is not None and (best is None or t < best[0]):
+                        best = (t, wall, nx, ny)
+
+            for px, py in (surface[0:2], surface[2:4]):
+                r = _point_hits_box(px, py, x, y, width, height, xmove,
+                                    ymove)
+                if (r is not None and r[1] * nx + r[2] * ny > 0 and
+                        (best is None or r[0] < best[0])):
+                    best = (r[0], wall, r[1], r[2])
+
+    if best is not None:
+        t, wall, nx, ny = best
+        return Hit(wall, x + xmove * t, y + ymove * t, nx, ny, t)
+
+    return None
+
+
+def merge_walls(objects, key=None):
+    """
+    Return a list of objects equivalent to ``objects``, except that
+    adjacent walls have been merged into as few walls as possible.
+
+    Only :class:`SolidLeft`, :class:`SolidRight`, :class:`SolidTop`, and
+    :class:`SolidBottom` objects are merged, and only if they are
+    tangible and are not also :class:`Slope`, :class:`MobileWall`, or
+    :class:`Collider` objects.  Walls are only merged with walls of the
+    same class and :attr:`Wall.physics_layer`, and by default only with
+    walls whose other attributes are also the same (see ``key`` below).
+    Walls that stop movement from only one of the top and bottom (e.g.
+    :class:`SolidTop` objects) are only merged horizontally, and walls
+    that stop movement from only one of the left and right (e.g.
+    :class:`SolidLeft` objects) are only merged vertically, so that
+    merging never changes which sides of the walls stop movement.
+
+    Each rectangle of merged walls is represented by the wall in its
+    top-left corner, whose bounding box is enlarged to cover the whole
+    rectangle.  The other walls are removed; visible walls are replaced
+    with intangible, inactive :class:`sge.dsp.Object` objects that look
+    the same.
+
+    Arguments:
+
+    - ``objects`` -- The list of objects to merge the walls of.  It is
+      not modified.  If an object is in the list more than once, only
+      its first occurrence is kept.
+    - ``key`` -- A function which is passed a wall and returns a
+      hashable value.  Walls are only merged with other walls for which
+      this function returns an equal value.  Set to :const:`None` to
+      compare the attributes set on the walls themselves (such as
+      :attr:`SolidTop.nonstick_top` or custom attributes set from TMX
+      properties), ignoring attributes related to position, the
+      bounding box, and drawing.
+
+    .. note::
+
+       Since merged walls become one object, physics collision events
+       for any part of the rectangle are executed for the wall
+       representing the rectangle.  Don't merge walls whose collision
+       events or other behavior depend on which wall was collided
+       with.
+    """
+    result = []
+    groups = {}
+    seen = set()
+    for obj in objects:
+        if obj in seen:
+            continue
+        seen.add(obj)
+
+        if (isinstance(obj, (SolidLeft, SolidRight, SolidTop, SolidBottom)) and
+                not isinstance(obj, (Slope, MobileWall, Collider)) and
+                obj.tangible and not obj.collision_precise and
+                not obj.collision_ellipse):
+            k = (type(obj), obj.physics_layer,
+                 key(obj) if key is not None else _get_merge_key(obj))
+            groups.setdefault(k, []).append(obj)
+
+        result.append(obj)
+
+    removed = set()
+    decorations = []
+    for walls in groups.values():
+        for rect in _get_merged_rects(walls):
+            members = rect[4]
+            if len(members) > 1:
+                base = members[0]
+                base.bbox_width = rect[2] - rect[0]
+                base.bbox_height = rect[3] - rect[1]
+                base.bbox_x = rect[0] - base.x
+                base.bbox_y = rect[1] - base.y
+                for wall in members[1:]:
+                    removed.add(wall)
+                    if wall.visible and wall.sprite is not None:
+                        decorations.append(_get_decoration(wall))
+
+    result = [obj for obj in result if obj not in removed]
+    result.extend(decorations)
+    return result
+
+
+def merge_room_walls(room=None, key=None):
+    """
+    Merge adjacent walls in a room into as few walls as possible.  See
+    the documentation for :func:`xsge_physics.merge_walls` for more
+    information.
+
+    Arguments:
+
+    - ``room`` -- The room to merge the walls of.  Set to :const:`None`
+      to use the current room.
+
+    All other arguments are passed to :func:`xsge_physics.merge_walls`.
+    """
+    if room is None:
+        room = sge.game.current_room
+
+    old_objects = room.objects[:]
+    new_objects = merge_walls(old_objects, key)
+    keep = set(new_objects)
+    for obj in old_objects:
+        if obj not in keep:
+            room.remove(obj)
+
+    old = set(old_objects)
+    for obj in new_objects:
+        if obj not in old:
+            room.add(obj)
+
+    index = _wall_indexes.get(room)
+    if index is not None:
+        index.rebuild()
+
+
+def _integrate(velocities, accelerations, decelerations, delta_mult):
+    # Return the final velocities and the movements of objects with the
+    # indicated initial velocities, accelerations, and decelerations
+    # after a frame, as a tuple of two lists.  This is the same as what
+    # Collider.event_update_position does for one object.
+    if numpy is not None:
+        vi = numpy.array(velocities, dtype=float)
+        vf = vi + numpy.array(accelerations, dtype=float) * delta_mult
+        dc = numpy.abs(numpy.array(decelerations, dtype=float)) * delta_mult
+        vf = numpy.where(numpy.abs(vf) > dc, vf - numpy.copysign(dc, vf), 0)
+        moves = ((vi + vf) / 2) * delta_mult
+        return vf.tolist(), moves.tolist()
+
+    final_velocities = []
+    moves = []
+    for i in range(len(velocities)):
+        vi = velocities[i]
+        vf = vi + accelerations[i] * delta_mult
+        dc = abs(decelerations[i]) * delta_mult
+        if abs(vf) > dc:
+            vf -= math.copysign(dc, vf)
+        else:
+            vf = 0
+        final_velocities.append(vf)
+        moves.append(((vi + vf) / 2) * delta_mult)
+
+    return final_velocities, moves
+
+
+def _percentile(values, fraction):
+    # Return the value at ``fraction`` of the way through the sorted
+    # list ``values``, interpolating between neighboring values.
+    if not values:
+        return 0
+
+    i = (len(values) - 1) * fraction
+    j = int(i)
+    if j + 1 < len(values):
+        return values[j] + (values[j + 1] - values[j]) * (i - j)
+    else:
+        return values[j]
+
+
+def _get_merge_key(wall):
+    # Return a hashable value representing the attributes of ``wall``
+    # which merge_walls compares by default.  Private attributes of
+    # sge.dsp.Object hold the position, the bounding box, and the
+    # sprite, so attributes starting with an underscore are ignored.
+    items = []
+    for name, value in vars(wall).items():
+        if (name.startswith("_") or name.startswith("image_") or
+                name in _MERGE_IGNORED):
+            continue
+        try:
+            hash(value)
+        except TypeError:
+            value = id(value)
+        items.append((name, value))
+    return frozenset(items)
+
+
+def _get_merged_rects(walls):
+    # Return a list of rectangles covering ``walls`` (all of the same
+    # class), each in the form [left, top, right, bottom, members].
+    cls = type(walls[0])
+    merge_h = (issubclass(cls, SolidLeft) == issubclass(cls, SolidRight))
+    merge_v = (issubclass(cls, SolidTop) == issubclass(cls, SolidBottom))
+
+    walls = sorted(walls, key=lambda w: (w.bbox_top, w.bbox_bottom,
+                                         w.bbox_left))
+    runs = []
+    for wall in walls:
+        run = runs[-1] if runs else None
+        if (merge_h and run is not None and run[1] == wall.bbox_top and
+                run[3] == wall.bbox_bottom and run[2] == wall.bbox_left):
+            run[2] = wall.bbox_right
+            run[4].append(wall)
+        else:
+            runs.append([wall.bbox_left, wall.bbox_top, wall.bbox_right,
+                         wall.bbox_bottom, [wall]])
+
+    if not merge_v:
+        return runs
+
+    runs.sort(key=lambda r: (r[0], r[2], r[1]))
+    rects = []
+    for run in runs:
+        rect = rects[-1] if rects else None
+        if (rect is not None and rect[0] == run[0] and rect[2] == run[2] and
+                rect[3] == run[1]):
+            rect[3] = run[3]
+            rect[4].extend(run[4])
+        else:
+            rects.append(run)
+
+    for rect in rects:
+        rect[4].sort(key=lambda w: (w.bbox_top, w.bbox_left))
+
+    return rects
+
+
+def _get_decoration(obj):
+    # Return an intangible, inactive object that looks like ``obj``.
+    return sge.dsp.Object(
+        obj.x, obj.y, obj.z, sprite=obj.sprite, visible=obj.visible,
+        active=False, checks_collisions=False, tangible=False,
+        image_index=obj.image_index, image_origin_x=obj.image_origin_x,
+        image_origin_y=obj.image_origin_y, image_fps=obj.image_fps,
+        image_xscale=obj.image_xscale, image_yscale=obj.image_yscale,
+        image_rotation=obj.image_rotation, image_alpha=obj.image_alpha,
+        image_blend=obj.image_blend)
+
+
+def _get_surfaces(wall):
+    # Return a list of the sides of ``wall`` which stop colliders, as
+    # tuples of the form (x1, y1, x2, y2, xnormal, ynormal, open), where
+    # the normal points away from the wall and ``open`` indicates that
+    # the side doesn't include its ends when hit by a line.
+    r = []
+    left = wall.bbox_left
+    top = wall.bbox_top
+    right = wall.bbox_right
+    bottom = wall.bbox_bottom
+    if isinstance(wall, SolidLeft):
+        r.append((left, top, left, bottom, -1, 0, True))
+    if isinstance(wall, SolidRight):
+        r.append((right, top, right, bottom, 1, 0, True))
+    if isinstance(wall, SolidTop):
+        r.append((left, top, right, top, 0, -1, False))
+    if isinstance(wall, SolidBottom):
+        r.append((left, bottom, right, bottom, 0, 1, False))
+    if isinstance(wall, Slope):
+        g = wall._get_geometry()
+        if isinstance(wall, SlopeTopLeft):
+            r.append((left, bottom, right, top, -g[6], -g[5], False))
+        if isinstance(wall, SlopeTopRight):
+            r.append((left, top, right, bottom, g[6], -g[5], False))
+        if isinstance(wall, SlopeBottomLeft):
+            r.append((left, top, right, bottom, -g[6], g[5], False))
+        if isinstance(wall, SlopeBottomRight):
+            r.append((left, bottom, right, top, g[6], g[5], False))
+
+    return r
+
+
+def _intersect(x, y, dx, dy, surface, open_ends):
+    # Return the fraction of the movement ``(dx, dy)`` from ``(x, y)``
+    # at which the point crosses ``surface`` (see _get_surfaces), or
+    # None if it doesn't.  If ``open_ends`` is true, the ends of the
+    # surface are excluded.
+    ex = surface[2] - surface[0]
+    ey = surface[3] - surface[1]
+    denom = dx * ey - dy * ex
+    if not denom:
+        return None
+
+    ax = surface[0] - x
+    ay = surface[1] - y
+    t = (ax * ey - ay * ex) / denom
+    u = (ax * dy - ay * dx) / denom
+    if 0 <= t <= 1 and (0 < u < 1 if open_ends else 0 <= u <= 1):
+        return t
+
+    return None
+
+
+def _point_hits_box(px, py, x, y, width, height, dx, dy):
+    # Return when the box at ``(x, y)`` of the given size, moving by
+    # ``(dx, dy)``, first has the point ``(px, py)`` strictly inside of
+    # one of its edges, as a tuple of the form (fraction, xnormal,
+    # ynormal) where the normal is that of the edge hit, or None if it
+    # never does.
+    t_enter = 0
+    t_exit = 1
+    normal = None
+    for pos, size, move, axis in ((px - x, width, dx, 0),
+                                  (py - y, height, dy, 1)):
+        # The point is inside on this axis while move*t < pos <
+        # move*t + size.
+        if move:
+            t1 = (pos - size) / move
+            t2 = pos / move
+            if t1 > t2:
+                t1, t2 = t2, t1
+            if t1 > t_enter or (normal is None and t1 == t_enter):
+                t_enter = t1
+                normal = (-1 if move > 0 else 1, 0) if axis == 0 else (
+                    0, -1 if move > 0 else 1)
+            t_exit = min(t_exit, t2)
+        elif not 0 < pos < size:
+            return None
+
+    if normal is None or t_enter >= t_exit or t_enter > 1:
+        return None
+
+    return (t_enter, normal[0], normal[1])
+
+
+def _round(value):
+    # Default quantization for comparing positions: round to NDIG
+    # decimal places.
+    return round(value, NDIG)
+
+
+_quantize = _round
+
+
+def _snap(value, subpixels):
+    # Snap ``value`` to the nearest whole number of subpixels.  Since
+    # ``subpixels`` is a power of two, the result is exact.
+    return math.floor(value * subpixels + 0.5) / subpixels
+
+
+def _get_boxes(walls):
+    # Return a list of the bounding boxes of ``walls`` as tuples in the
+    # form ``(left, top, right, bottom)``, taken from the wall index of
+    # the current room where possible.
+    entries = get_wall_index()._entries
+    boxes = []
+    for wall in walls:
+        entry = entries.get(wall)
+        if entry is not None:
+            boxes.append(entry[1])
+        else:
+            boxes.append((wall.bbox_left, wall.bbox_top, wall.bbox_right,
+                          wall.bbox_bottom))
+
+    return boxes
+
+
+def _py_resolve_solids(boxes, left, top, right, bottom, side):
+    # Resolve a collision between a collider with the indicated edges
+    # at its old position and solid walls with bounding boxes
+    # ``boxes``.  ``side`` is the index of the edge of the walls the
+    # collider is moving toward: 0 (left) or 1 (top) if it is moving
+    # right or down, or 2 (right) or 3 (bottom) if it is moving left or
+    # up.  Walls the collider was already overlapping don't stop it.
+    # Return the index of the last wall which stops the collider, or
+    # -1 if none do, and the closest edge of a wall stopping it.
+    #
+    # This and the other functions prefixed with "_py_" are replaced
+    # with the functions of the same names in the compiled _kernel
+    # module when it is available (see set_kernel); any change here
+    # must be made there as well, since they must give identical
+    # results.
+    stopper = -1
+    limit = None
+    for i in range(len(boxes)):
+        box = boxes[i]
+        if not (left < box[2] and right > box[0] and top < box[3] and
+                bottom > box[1]):
+            stopper = i
+            edge = box[side]
+            if (limit is None or (edge < limit if side < 2 else
+                                  edge > limit)):
+                limit = edge
+
+    return stopper, limit
+
+
+def _py_query_walls(index, classes, left, top, right, bottom, exclude,
+                    mask):
+    # Return a list of the tangible walls in the wall index ``index`` of
+    # any of the classes in ``classes`` on any of the physics layers in
+    # ``mask`` whose bounding boxes in the index strictly overlap the
+    # indicated edges, excluding ``exclude``, and the number of walls
+    # examined, or None if no cells of the index were examined.  The
+    # compiled version returns None and None instead if any of the
+    # classes isn't one of the indexed classes.
+    r = []
+    b = index._bounds
+    if b is None:
+        return r, None
+
+    i1, j1, i2, j2 = index._get_cells(left, top, right, bottom)
+    i1 = max(i1, b[0])
+    j1 = max(j1, b[1])
+    i2 = min(i2, b[2])
+    j2 = min(j2, b[3])
+    if i1 > i2 or j1 > j2:
+        return r, None
+
+    seen = set()
+    if exclude is not None:
+        seen.add(exclude)
+
+    all_buckets = index._buckets
+    entries = index._entries
+    for cls in classes:
+        layers = all_buckets.get(cls)
+        check_class = False
+        if layers is None:
+            # Not one of the indexed classes; check the bucket of every
+            # indexed class it derives from, or the bucket of all walls
+            # if there are none.
+            check_class = True
+            bases = [c for c in _WALL_CLASSES[1:] if issubclass(cls, c)]
+            if not bases:
+                bases = [Wall]
+            buckets = [cells for c in bases
+                       for layer, cells in all_buckets[c].items()
+                       if layer & mask]
+        else:
+            buckets = [cells for layer, cells in layers.items()
+                       if layer & mask]
+
+        for cells in buckets:
+            for i in range(i1, i2 + 1):
+                for j in range(j1, j2 + 1):
+                    cell = cells.get((i, j))
+                    if not cell:
+                        continue
+
+                    for wall in cell:
+                        if wall in seen:
+                            continue
+                        seen.add(wall)
+                        if wall.tangible:
+                            box = entries[wall][1]
+                            if (left < box[2] and right > box[0] and
+                                    top < box[3] and bottom > box[1] and
+                                    (not check_class or
+                                     isinstance(wall, cls))):
+                                r.append(wall)
+
+    candidates = len(seen)
+    if exclude is not None:
+        candidates -= 1
+
+    return r, candidates
+
+
+def _py_filter_walls(walls, entries, left, top, right, bottom):
+    # Return a list of the tangible walls in ``walls`` whose bounding
+    # boxes strictly overlap the indicated edges, taking the bounding
+    # boxes from the wall index entries ``entries`` where possible.
+    r = []
+    for wall in walls:
+        if wall.tangible:
+            entry = entries.get(wall)
+            if entry is not None:
+                box = entry[1]
+            else:
+                box = (wall.bbox_left, wall.bbox_top, wall.bbox_right,
+                       wall.bbox_bottom)
+            if (left < box[2] and right > box[0] and top < box[3] and
+                    bottom > box[1]):
+                r.append(wall)
+
+    return r
+
+
+def _py_find_slope(slopes, start, getter, probe, edge, greater, kinds):
+    # Return the index of the first slope in ``slopes`` from ``start``
+    # on for which ``edge``, one of the edges of a collider, is past the
+    # result of calling the slope's ``getter`` method with ``probe``,
+    # another of the collider's edges (greater than it if ``greater`` is
+    # true, less than it otherwise), and that result.  Return -1 and
+    # None if there is no such slope.  ``kinds`` is only used by the
+    # compiled version (see _get_slope_kind).
+    for i in range(start, len(slopes)):
+        value = getattr(slopes[i], getter)(probe)
+        if edge > value if greater else edge < value:
+            return i, value
+
+    return -1, None
+
+
+def _py_find_push(colliders, start, wall, getter, probe, edge, greater, move,
+                  box, kinds):
+    # Return the index of the first collider in ``colliders`` from
+    # ``start`` on which ``wall``, having moved by ``move``, pushes.
+    # If ``getter`` is not None, ``wall`` is a slope and the collider is
+    # pushed by the slope if the collider's ``edge`` edge is past the
+    # result of calling the slope's ``getter`` method with the
+    # collider's ``probe`` edge (greater than it if ``greater`` is
+    # true, less than it otherwise) by no more than ``move``; that
+    # result is returned with the index.  Otherwise, the collider is
+    # pushed if it isn't colliding with the edges ``box`` of the wall
+    # at its old position (None if the wall is intangible), and None is
+    # returned with the index, but for slopes only if the collider's
+    # edge is past the slope.  Return -1 and None if no collider is
+    # pushed.  ``kinds`` is only used by the compiled version.
+    for i in range(start, len(colliders)):
+        other = colliders[i]
+        if getter is not None:
+            value = getattr(wall, getter)(getattr(other, probe))
+            e = getattr(other, edge)
+            if not (e > value if greater else e < value):
+                continue
+            if e <= value - move if greater else e >= value - move:
+                return i, value
+        if not _overlaps(box, other):
+            return i, None
+
+    return -1, None
+
+
+def _overlaps(box, other):
+    # Return whether or not the edges ``box``, of the form ``(left,
+    # top, right, bottom)``, strictly overlap the bounding box of
+    # ``other`` and both are tangible, with ``box`` being None if the
+    # object it belongs to is intangible.  This is the same as
+    # _collides where ``box`` is the bounding box of ``obj``.
+    return (box is not None and other.tangible and
+            box[0] < other.bbox_right and box[2] > other.bbox_left and
+            box[1] < other.bbox_bottom and box[3] > other.bbox_top)
+
+
+def _get_slope_kind(cls):
+    # Return 1 if slopes of class ``cls`` compute their positions like
+    # SlopeTopLeft and SlopeBottomRight, 2 if they do so like
+    # SlopeTopRight and SlopeBottomLeft, or 0 if they override any of
+    # the methods involved, in which case the compiled kernel calls the
+    # methods instead.
+    def get_function(cls, name):
+        method = getattr(cls, name)
+        return getattr(method, "__func__", method)
+
+    names = ("get_slope_x", "get_slope_y", "_get_geometry")
+    functions = [get_function(cls, name) for name in names]
+    for kind, bases in ((1, (SlopeTopLeft, SlopeBottomRight)),
+                        (2, (SlopeTopRight, SlopeBottomLeft))):
+        for base in bases:
+            if functions == [get_function(base, name) for name in names]:
+                return kind
+
+    return 0
+
+
+# Defines _resolve_solids, _query_walls, _filter_walls, _find_slope, and
+# _find_push.
+set_kernel(True)
+
+
+def _collides(obj, other, x=None, y=None):
+    # Return whether or not the bounding boxes of ``obj`` and ``other``
+    # collide, like ``obj.collision(other, x, y)``, but without the
+    # overhead of SGE collision detection.
+    if not obj.tangible or not other.tangible or obj is other:
+        return False
+
+    left = obj.bbox_left
+    top = obj.bbox_top
+    if x is not None:
+        left += x - obj.x
+    if y is not None:
+        top += y - obj.y
+
+    return (left < other.bbox_right and
+            left + obj.bbox_width > other.bbox_left and
+            top < other.bbox_bottom and
+            top + obj.bbox_height > other.bbox_top)
+
+
+_WALL_CLASSES = (Wall, SolidLeft, SolidRight, SolidTop, SolidBottom,
+                 SlopeTopLeft, SlopeTopRight, SlopeBottomLeft,
+                 SlopeBottomRight)
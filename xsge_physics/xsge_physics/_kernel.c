@@ -0,0 +1,766 @@
+/* xSGE Physics Framework
+ * Copyright (C) 2014-2017 Julie Marchant <onpon4@riseup.net>
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+/* Optional compiled versions of the collision helpers of xsge_physics.
+ *
+ * Each function here has a pure Python counterpart in __init__.py with
+ * the same name prefixed with "_py_", which is used if this module
+ * can't be built and which defines what the function does.  The two
+ * must give identical results: numbers are compared and computed as
+ * doubles in the same order as Python does, and wherever Python would
+ * return one of the numbers it was given (e.g. from min() or max()),
+ * the same object is returned here. */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+
+#if PY_MAJOR_VERSION >= 3
+#define STR_FROM_STRING PyUnicode_InternFromString
+#else
+#define STR_FROM_STRING PyString_InternFromString
+#endif
+
+static PyObject *str_tangible;
+static PyObject *str_bbox_left;
+static PyObject *str_bbox_top;
+static PyObject *str_bbox_right;
+static PyObject *str_bbox_bottom;
+static PyObject *str_geometry;
+static PyObject *str_get_geometry;
+static PyObject *str_get_slope_x;
+static PyObject *str_buckets;
+static PyObject *str_bounds;
+static PyObject *str_entries;
+static PyObject *str_cell_width;
+static PyObject *str_cell_height;
+
+
+static int
+as_double(PyObject *o, double *out)
+{
+    if (PyFloat_CheckExact(o))
+        *out = PyFloat_AS_DOUBLE(o);
+    else {
+        *out = PyFloat_AsDouble(o);
+        if (*out == -1.0 && PyErr_Occurred())
+            return -1;
+    }
+    return 0;
+}
+
+
+static int
+get_double(PyObject *obj, PyObject *name, double *out)
+{
+    /* Read the numeric attribute ``name`` of ``obj``. */
+    PyObject *o = PyObject_GetAttr(obj, name);
+    int r;
+
+    if (o == NULL)
+        return -1;
+    r = as_double(o, out);
+    Py_DECREF(o);
+    return r;
+}
+
+
+static int
+unpack_box(PyObject *box, double *edges)
+{
+    /* Unpack a tuple of the form (left, top, right, bottom). */
+    Py_ssize_t k;
+
+    if (!PyTuple_Check(box) || PyTuple_GET_SIZE(box) < 4) {
+        PyErr_SetString(PyExc_TypeError, "box must be a 4-tuple");
+        return -1;
+    }
+    for (k = 0; k < 4; k++) {
+        if (as_double(PyTuple_GET_ITEM(box, k), &edges[k]) < 0)
+            return -1;
+    }
+    return 0;
+}
+
+
+static int
+overlaps(const double *box, PyObject *other)
+{
+    /* Return 1 if the edges ``box`` strictly overlap the bounding box
+     * of ``other`` and ``other`` is tangible, 0 if not, or -1 on
+     * error.  ``box`` is NULL for an intangible object.  The edges of
+     * ``other`` are only read as far as needed, like in Python. */
+    PyObject *o;
+    double edge;
+    int tangible;
+
+    if (box == NULL)
+        return 0;
+
+    o = PyObject_GetAttr(other, str_tangible);
+    if (o == NULL)
+        return -1;
+    tangible = PyObject_IsTrue(o);
+    Py_DECREF(o);
+    if (tangible <= 0)
+        return tangible;
+
+    if (get_double(other, str_bbox_right, &edge) < 0)
+        return -1;
+    if (!(box[0] < edge))
+        return 0;
+    if (get_double(other, str_bbox_left, &edge) < 0)
+        return -1;
+    if (!(box[2] > edge))
+        return 0;
+    if (get_double(other, str_bbox_bottom, &edge) < 0)
+        return -1;
+    if (!(box[1] < edge))
+        return 0;
+    if (get_double(other, str_bbox_top, &edge) < 0)
+        return -1;
+    return box[3] > edge;
+}
+
+
+static PyObject *
+slope_value(PyObject *slope, PyObject *getter, int axis, PyObject *value,
+            PyObject *kinds)
+{
+    /* Return the result of calling the ``getter`` method of ``slope``
+     * (get_slope_x if ``axis`` is 0, get_slope_y if it is 1) with
+     * ``value``.  ``kinds`` maps slope classes to 1 if they use the
+     * formulas of SlopeTopLeft and SlopeBottomRight, 2 if they use
+     * those of SlopeTopRight and SlopeBottomLeft, or 0 if they have to
+     * be called. */
+    PyObject *kind_o, *geometry, *lo, *hi, *result;
+    long kind = 0;
+    double v, left, top, right, bottom, m, r, lo_v, hi_v;
+    volatile double product;
+
+    kind_o = PyDict_GetItem(kinds, (PyObject *)Py_TYPE(slope));
+    if (kind_o != NULL) {
+        kind = PyLong_AsLong(kind_o);
+        if (kind == -1 && PyErr_Occurred())
+            return NULL;
+    }
+    if (kind != 1 && kind != 2)
+        return PyObject_CallMethodObjArgs(slope, getter, value, NULL);
+
+    geometry = PyObject_GetAttr(slope, str_geometry);
+    if (geometry == NULL)
+        return NULL;
+    if (geometry == Py_None) {
+        Py_DECREF(geometry);
+        geometry = PyObject_CallMethodObjArgs(slope, str_get_geometry, NULL);
+        if (geometry == NULL)
+            return NULL;
+    }
+    if (!PyTuple_Check(geometry) || PyTuple_GET_SIZE(geometry) < 5) {
+        Py_DECREF(geometry);
+        PyErr_SetString(PyExc_TypeError, "invalid slope geometry");
+        return NULL;
+    }
+
+    if (as_double(value, &v) < 0 ||
+            as_double(PyTuple_GET_ITEM(geometry, 0), &left) < 0 ||
+            as_double(PyTuple_GET_ITEM(geometry, 1), &top) < 0 ||
+            as_double(PyTuple_GET_ITEM(geometry, 2), &right) < 0 ||
+            as_double(PyTuple_GET_ITEM(geometry, 3), &bottom) < 0 ||
+            as_double(PyTuple_GET_ITEM(geometry, 4), &m) < 0) {
+        Py_DECREF(geometry);
+        return NULL;
+    }
+
+    if (axis == 0) {
+        if (m == 0) {
+            Py_DECREF(geometry);
+            PyErr_SetString(PyExc_ZeroDivisionError,
+                            "float division by zero");
+            return NULL;
+        }
+        /* x = (y - top) / -m + right, or x = (y - top) / m + left */
+        if (kind == 1)
+            r = (v - top) / -m + right;
+        else
+            r = (v - top) / m + left;
+        lo = PyTuple_GET_ITEM(geometry, 0);
+        hi = PyTuple_GET_ITEM(geometry, 2);
+        lo_v = left;
+        hi_v = right;
+    }
+    else {
+        /* y = -m * (x - left) + bottom, or y = m * (x - left) + top.
+         * The product is stored separately so that the compiler can't
+         * fuse it with the addition, which Python doesn't do. */
+        if (kind == 1) {
+            product = -m * (v - left);
+            r = product + bottom;
+        }
+        else {
+            product = m * (v - left);
+            r = product + top;
+        }
+        lo = PyTuple_GET_ITEM(geometry, 1);
+        hi = PyTuple_GET_ITEM(geometry, 3);
+        lo_v = top;
+        hi_v = bottom;
+    }
+
+    /* max(lo, min(r, hi)) */
+    result = NULL;
+    if (hi_v < r) {
+        result = hi;
+        r = hi_v;
+    }
+    if (!(r > lo_v))
+        result = lo;
+
+    if (result != NULL)
+        Py_INCREF(result);
+    else
+        result = PyFloat_FromDouble(r);
+    Py_DECREF(geometry);
+    return result;
+}
+
+
+static int
+get_axis(PyObject *getter)
+{
+    /* Return 0 for "get_slope_x", 1 for any other method name, or -1
+     * on error. */
+    int r;
+
+    if (getter == str_get_slope_x)
+        return 0;
+    r = PyObject_RichCompareBool(getter, str_get_slope_x, Py_EQ);
+    if (r < 0)
+        return -1;
+    return r ? 0 : 1;
+}
+
+
+static PyObject *
+kernel_resolve_solids(PyObject *self, PyObject *args)
+{
+    PyObject *boxes, *limit = NULL, *box;
+    double left, top, right, bottom, edges[4], limit_v = 0;
+    int side;
+    Py_ssize_t i, n, stopper = -1;
+
+    if (!PyArg_ParseTuple(args, "O!ddddi", &PyList_Type, &boxes, &left,
+                          &top, &right, &bottom, &side))
+        return NULL;
+    if (side < 0 || side > 3) {
+        PyErr_SetString(PyExc_ValueError, "side must be from 0 to 3");
+        return NULL;
+    }
+
+    n = PyList_GET_SIZE(boxes);
+    for (i = 0; i < n; i++) {
+        box = PyList_GET_ITEM(boxes, i);
+        if (unpack_box(box, edges) < 0)
+            return NULL;
+        if (!(left < edges[2] && right > edges[0] && top < edges[3] &&
+                bottom > edges[1])) {
+            stopper = i;
+            if (limit == NULL || (side < 2 ? edges[side] < limit_v :
+                                  edges[side] > limit_v)) {
+                limit = PyTuple_GET_ITEM(box, side);
+                limit_v = edges[side];
+            }
+        }
+    }
+
+    return Py_BuildValue("nO", stopper, limit != NULL ? limit : Py_None);
+}
+
+
+static int
+get_cell(double v, double size, Py_ssize_t *out)
+{
+    /* Set ``out`` to int(math.floor(v / size)), raising the same errors
+     * as Python would.  Values too large for a Py_ssize_t are limited
+     * to its range, since cells are limited to the bounds of the index
+     * anyway. */
+    double q;
+
+    if (size == 0) {
+        PyErr_SetString(PyExc_ZeroDivisionError, "float division by zero");
+        return -1;
+    }
+    q = floor(v / size);
+    if (q != q) {
+        PyErr_SetString(PyExc_ValueError,
+                        "cannot convert float NaN to integer");
+        return -1;
+    }
+    if (q == HUGE_VAL || q == -HUGE_VAL) {
+        PyErr_SetString(PyExc_OverflowError,
+                        "cannot convert float infinity to integer");
+        return -1;
+    }
+    if (q >= (double)PY_SSIZE_T_MAX)
+        *out = PY_SSIZE_T_MAX;
+    else if (q <= (double)PY_SSIZE_T_MIN)
+        *out = PY_SSIZE_T_MIN;
+    else
+        *out = (Py_ssize_t)q;
+    return 0;
+}
+
+
+static int
+scan_cells(PyObject *cells, Py_ssize_t i1, Py_ssize_t j1, Py_ssize_t i2,
+           Py_ssize_t j2, PyObject *entries, PyObject *seen, double left,
+           double top, double right, double bottom, PyObject *r)
+{
+    /* Append to ``r`` the walls in the indicated range of cells of the
+     * dictionary ``cells`` which aren't in ``seen``, are tangible, and
+     * whose bounding boxes in ``entries`` strictly overlap the
+     * indicated edges, adding every wall examined to ``seen``. */
+    PyObject *key, *cell, *iter, *wall, *entry, *o;
+    Py_ssize_t i, j;
+    double edges[4];
+    int t;
+
+    for (i = i1; i <= i2; i++) {
+        for (j = j1; j <= j2; j++) {
+            key = Py_BuildValue("(nn)", i, j);
+            if (key == NULL)
+                return -1;
+            cell = PyDict_GetItem(cells, key);
+            Py_DECREF(key);
+            if (cell == NULL)
+                continue;
+            t = PyObject_IsTrue(cell);
+            if (t < 0)
+                return -1;
+            if (!t)
+                continue;
+
+            iter = PyObject_GetIter(cell);
+            if (iter == NULL)
+                return -1;
+            while ((wall = PyIter_Next(iter)) != NULL) {
+                t = PySet_Contains(seen, wall);
+                if (t == 0)
+                    t = PySet_Add(seen, wall);
+                else if (t > 0)
+                    goto next;
+                if (t < 0)
+                    goto error;
+
+                o = PyObject_GetAttr(wall, str_tangible);
+                if (o == NULL)
+                    goto error;
+                t = PyObject_IsTrue(o);
+                Py_DECREF(o);
+                if (t < 0)
+                    goto error;
+                if (!t)
+                    goto next;
+
+                entry = PyDict_GetItem(entries, wall);
+                if (entry == NULL || !PyTuple_Check(entry) ||
+                        PyTuple_GET_SIZE(entry) < 2) {
+                    PyErr_SetObject(PyExc_KeyError, wall);
+                    goto error;
+                }
+                if (unpack_box(PyTuple_GET_ITEM(entry, 1), edges) < 0)
+                    goto error;
+                if (left < edges[2] && right > edges[0] && top < edges[3] &&
+                        bottom > edges[1]) {
+                    if (PyList_Append(r, wall) < 0)
+                        goto error;
+                }
+            next:
+                Py_DECREF(wall);
+            }
+            Py_DECREF(iter);
+            if (PyErr_Occurred())
+                return -1;
+        }
+    }
+
+    return 0;
+
+error:
+    Py_DECREF(wall);
+    Py_DECREF(iter);
+    return -1;
+}
+
+
+static PyObject *
+kernel_query_walls(PyObject *self, PyObject *args)
+{
+    PyObject *index, *classes, *exclude, *mask;
+    PyObject *buckets = NULL, *bounds = NULL, *entries = NULL, *r = NULL;
+    PyObject *seen = NULL, *cells_list = NULL, *result = NULL;
+    PyObject *layers, *layer, *cells, *o;
+    double left, top, right, bottom, cw, ch;
+    Py_ssize_t b[4], i1, j1, i2, j2, k, n, pos, candidates;
+    int t;
+
+    if (!PyArg_ParseTuple(args, "OO!ddddOO", &index, &PyTuple_Type,
+                          &classes, &left, &top, &right, &bottom, &exclude,
+                          &mask))
+        return NULL;
+
+    buckets = PyObject_GetAttr(index, str_buckets);
+    if (buckets == NULL)
+        goto done;
+    if (!PyDict_Check(buckets)) {
+        PyErr_SetString(PyExc_TypeError, "_buckets must be a dict");
+        goto done;
+    }
+    n = PyTuple_GET_SIZE(classes);
+    for (k = 0; k < n; k++) {
+        if (PyDict_GetItem(buckets, PyTuple_GET_ITEM(classes, k)) == NULL) {
+            result = Py_BuildValue("OO", Py_None, Py_None);
+            goto done;
+        }
+    }
+
+    r = PyList_New(0);
+    if (r == NULL)
+        goto done;
+    bounds = PyObject_GetAttr(index, str_bounds);
+    if (bounds == NULL)
+        goto done;
+    if (bounds == Py_None) {
+        result = Py_BuildValue("OO", r, Py_None);
+        goto done;
+    }
+    for (k = 0; k < 4; k++) {
+        o = PySequence_GetItem(bounds, k);
+        if (o == NULL)
+            goto done;
+        b[k] = PyLong_AsSsize_t(o);
+        Py_DECREF(o);
+        if (b[k] == -1 && PyErr_Occurred())
+            goto done;
+    }
+
+    if (get_double(index, str_cell_width, &cw) < 0 ||
+            get_double(index, str_cell_height, &ch) < 0)
+        goto done;
+    /* Like WallIndex._get_cells, with the result limited to the bounds
+     * of the index. */
+    i1 = b[0];
+    j1 = b[1];
+    i2 = b[2];
+    j2 = b[3];
+    if ((left > -HUGE_VAL && get_cell(left, cw, &i1) < 0) ||
+            (top > -HUGE_VAL && get_cell(top, ch, &j1) < 0) ||
+            (right < HUGE_VAL && get_cell(right, cw, &i2) < 0) ||
+            (bottom < HUGE_VAL && get_cell(bottom, ch, &j2) < 0))
+        goto done;
+    if (i1 < b[0])
+        i1 = b[0];
+    if (j1 < b[1])
+        j1 = b[1];
+    if (i2 > b[2])
+        i2 = b[2];
+    if (j2 > b[3])
+        j2 = b[3];
+    if (i1 > i2 || j1 > j2) {
+        result = Py_BuildValue("OO", r, Py_None);
+        goto done;
+    }
+
+    seen = PySet_New(NULL);
+    if (seen == NULL)
+        goto done;
+    if (exclude != Py_None && PySet_Add(seen, exclude) < 0)
+        goto done;
+    entries = PyObject_GetAttr(index, str_entries);
+    if (entries == NULL)
+        goto done;
+    if (!PyDict_Check(entries)) {
+        PyErr_SetString(PyExc_TypeError, "_entries must be a dict");
+        goto done;
+    }
+
+    for (k = 0; k < n; k++) {
+        layers = PyDict_GetItem(buckets, PyTuple_GET_ITEM(classes, k));
+        if (layers == NULL || !PyDict_Check(layers)) {
+            PyErr_SetString(PyExc_TypeError, "invalid wall index bucket");
+            goto done;
+        }
+
+        /* Collect the cells first, like the Python version does. */
+        Py_XDECREF(cells_list);
+        cells_list = PyList_New(0);
+        if (cells_list == NULL)
+            goto done;
+        pos = 0;
+        while (PyDict_Next(layers, &pos, &layer, &cells)) {
+            o = PyNumber_And(layer, mask);
+            if (o == NULL)
+                goto done;
+            t = PyObject_IsTrue(o);
+            Py_DECREF(o);
+            if (t < 0 || (t && PyList_Append(cells_list, cells) < 0))
+                goto done;
+        }
+
+        for (pos = 0; pos < PyList_GET_SIZE(cells_list); pos++) {
+            cells = PyList_GET_ITEM(cells_list, pos);
+            if (!PyDict_Check(cells)) {
+                PyErr_SetString(PyExc_TypeError, "invalid wall index cells");
+                goto done;
+            }
+            if (scan_cells(cells, i1, j1, i2, j2, entries, seen, left, top,
+                           right, bottom, r) < 0)
+                goto done;
+        }
+    }
+
+    candidates = PySet_GET_SIZE(seen);
+    if (exclude != Py_None)
+        candidates--;
+    result = Py_BuildValue("On", r, candidates);
+
+done:
+    Py_XDECREF(buckets);
+    Py_XDECREF(bounds);
+    Py_XDECREF(entries);
+    Py_XDECREF(r);
+    Py_XDECREF(seen);
+    Py_XDECREF(cells_list);
+    return result;
+}
+
+
+static PyObject *
+kernel_filter_walls(PyObject *self, PyObject *args)
+{
+    PyObject *walls, *entries, *r, *wall, *entry, *o;
+    double left, top, right, bottom, edges[4];
+    Py_ssize_t i, n;
+    int t;
+
+    if (!PyArg_ParseTuple(args, "O!O!dddd", &PyList_Type, &walls,
+                          &PyDict_Type, &entries, &left, &top, &right,
+                          &bottom))
+        return NULL;
+
+    r = PyList_New(0);
+    if (r == NULL)
+        return NULL;
+
+    n = PyList_GET_SIZE(walls);
+    for (i = 0; i < n; i++) {
+        wall = PyList_GET_ITEM(walls, i);
+        o = PyObject_GetAttr(wall, str_tangible);
+        if (o == NULL)
+            goto error;
+        t = PyObject_IsTrue(o);
+        Py_DECREF(o);
+        if (t < 0)
+            goto error;
+        if (!t)
+            continue;
+
+        entry = PyDict_GetItem(entries, wall);
+        if (entry != NULL && PyTuple_Check(entry) &&
+                PyTuple_GET_SIZE(entry) >= 2) {
+            if (unpack_box(PyTuple_GET_ITEM(entry, 1), edges) < 0)
+                goto error;
+        }
+        else if (get_double(wall, str_bbox_left, &edges[0]) < 0 ||
+                 get_double(wall, str_bbox_top, &edges[1]) < 0 ||
+                 get_double(wall, str_bbox_right, &edges[2]) < 0 ||
+                 get_double(wall, str_bbox_bottom, &edges[3]) < 0)
+            goto error;
+
+        if (left < edges[2] && right > edges[0] && top < edges[3] &&
+                bottom > edges[1]) {
+            if (PyList_Append(r, wall) < 0)
+                goto error;
+        }
+    }
+
+    return r;
+
+error:
+    Py_DECREF(r);
+    return NULL;
+}
+
+
+static PyObject *
+kernel_find_slope(PyObject *self, PyObject *args)
+{
+    PyObject *slopes, *getter, *probe, *edge_o, *kinds, *value;
+    double edge, v;
+    Py_ssize_t i, n, start;
+    int greater, axis;
+
+    if (!PyArg_ParseTuple(args, "O!nOOOiO!", &PyList_Type, &slopes, &start,
+                          &getter, &probe, &edge_o, &greater, &PyDict_Type,
+                          &kinds))
+        return NULL;
+    if (as_double(edge_o, &edge) < 0)
+        return NULL;
+    axis = get_axis(getter);
+    if (axis < 0)
+        return NULL;
+
+    n = PyList_GET_SIZE(slopes);
+    for (i = start; i < n; i++) {
+        value = slope_value(PyList_GET_ITEM(slopes, i), getter, axis, probe,
+                            kinds);
+        if (value == NULL)
+            return NULL;
+        if (as_double(value, &v) < 0) {
+            Py_DECREF(value);
+            return NULL;
+        }
+        if (greater ? edge > v : edge < v)
+            return Py_BuildValue("nN", i, value);
+        Py_DECREF(value);
+    }
+
+    return Py_BuildValue("nO", (Py_ssize_t)-1, Py_None);
+}
+
+
+static PyObject *
+kernel_find_push(PyObject *self, PyObject *args)
+{
+    PyObject *colliders, *wall, *getter, *probe, *edge_name, *box_o, *kinds;
+    PyObject *other, *p, *value;
+    double move, edge, v, box[4];
+    Py_ssize_t i, n, start;
+    int greater, axis = 0, hit;
+
+    if (!PyArg_ParseTuple(args, "O!nOOOOidOO!", &PyList_Type, &colliders,
+                          &start, &wall, &getter, &probe, &edge_name,
+                          &greater, &move, &box_o, &PyDict_Type, &kinds))
+        return NULL;
+    if (box_o != Py_None && unpack_box(box_o, box) < 0)
+        return NULL;
+    if (getter != Py_None) {
+        axis = get_axis(getter);
+        if (axis < 0)
+            return NULL;
+    }
+
+    n = PyList_GET_SIZE(colliders);
+    for (i = start; i < n; i++) {
+        other = PyList_GET_ITEM(colliders, i);
+        if (getter != Py_None) {
+            p = PyObject_GetAttr(other, probe);
+            if (p == NULL)
+                return NULL;
+            value = slope_value(wall, getter, axis, p, kinds);
+            Py_DECREF(p);
+            if (value == NULL)
+                return NULL;
+            if (as_double(value, &v) < 0 ||
+                    get_double(other, edge_name, &edge) < 0) {
+                Py_DECREF(value);
+                return NULL;
+            }
+            if (!(greater ? edge > v : edge < v)) {
+                Py_DECREF(value);
+                continue;
+            }
+            if (greater ? edge <= v - move : edge >= v - move)
+                return Py_BuildValue("nN", i, value);
+            Py_DECREF(value);
+        }
+
+        hit = overlaps(box_o != Py_None ? box : NULL, other);
+        if (hit < 0)
+            return NULL;
+        if (!hit)
+            return Py_BuildValue("nO", i, Py_None);
+    }
+
+    return Py_BuildValue("nO", (Py_ssize_t)-1, Py_None);
+}
+
+
+static PyMethodDef kernel_methods[] = {
+    {"resolve_solids", kernel_resolve_solids, METH_VARARGS, NULL},
+    {"query_walls", kernel_query_walls, METH_VARARGS, NULL},
+    {"filter_walls", kernel_filter_walls, METH_VARARGS, NULL},
+    {"find_slope", kernel_find_slope, METH_VARARGS, NULL},
+    {"find_push", kernel_find_push, METH_VARARGS, NULL},
+    {NULL, NULL, 0, NULL}
+};
+
+
+static int
+init_strings(void)
+{
+    str_tangible = STR_FROM_STRING("tangible");
+    str_bbox_left = STR_FROM_STRING("bbox_left");
+    str_bbox_top = STR_FROM_STRING("bbox_top");
+    str_bbox_right = STR_FROM_STRING("bbox_right");
+    str_bbox_bottom = STR_FROM_STRING("bbox_bottom");
+    str_geometry = STR_FROM_STRING("_geometry");
+    str_get_geometry = STR_FROM_STRING("_get_geometry");
+    str_get_slope_x = STR_FROM_STRING("get_slope_x");
+    str_buckets = STR_FROM_STRING("_buckets");
+    str_bounds = STR_FROM_STRING("_bounds");
+    str_entries = STR_FROM_STRING("_entries");
+    str_cell_width = STR_FROM_STRING("cell_width");
+    str_cell_height = STR_FROM_STRING("cell_height");
+    if (str_tangible == NULL || str_bbox_left == NULL ||
+            str_bbox_top == NULL || str_bbox_right == NULL ||
+            str_bbox_bottom == NULL || str_geometry == NULL ||
+            str_get_geometry == NULL || str_get_slope_x == NULL ||
+            str_buckets == NULL || str_bounds == NULL ||
+            str_entries == NULL || str_cell_width == NULL ||
+            str_cell_height == NULL)
+        return -1;
+    return 0;
+}
+
+
+#if PY_MAJOR_VERSION >= 3
+
+static struct PyModuleDef kernel_module = {
+    PyModuleDef_HEAD_INIT, "_kernel", NULL, -1, kernel_methods, NULL, NULL,
+    NULL, NULL
+};
+
+PyMODINIT_FUNC
+PyInit__kernel(void)
+{
+    if (init_strings() < 0)
+        return NULL;
+    return PyModule_Create(&kernel_module);
+}
+
+#else
+
+PyMODINIT_FUNC
+init_kernel(void)
+{
+    if (init_strings() < 0)
+        return;
+    Py_InitModule("_kernel", kernel_methods);
+}
+
+#endif
@@ -21,7 +21,7 @@ than building a level editor yourself.
 """.strip()
 
 setup(name="xsge_tmx",
-      version="1.1.1",
+      version="1.2a0",
       description="xSGE TMX Library",
       long_description=long_description,
       author="Julie Marchant",
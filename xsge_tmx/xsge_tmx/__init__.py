@@ -37,7 +37,7 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
-__version__ = "1.1.1"
+__version__ = "1.2a0"
 
 import os
 
@@ -170,7 +170,8 @@ class Polyline(xsge_path.Path):
     """
 
 
-def load(fname, cls=sge.dsp.Room, types=None, z=0):
+def load(fname, cls=sge.dsp.Room, types=None, z=0, merge_walls=False,
+         merge_key=None):
     """
     Load the TMX file ``fname`` and return a room of the class ``cls``.
 
@@ -233,6 +234,14 @@ def load(fname, cls=sge.dsp.Room, types=None, z=0):
       group properties.
 
     - Image layers have their properties applied to them.
+
+    If ``merge_walls`` is set to :const:`True`, adjacent walls of the
+    xSGE Physics Framework (e.g. solid tiles) are merged into as few
+    walls as possible with :func:`xsge_physics.merge_walls` before the
+    room is created.  This requires :mod:`xsge_physics`.  By default,
+    only walls with the same attributes (e.g. from the same properties)
+    are merged; ``merge_key`` is passed as the ``key`` argument of
+    :func:`xsge_physics.merge_walls` to change this.
     """
     room_cls = cls
     if types is None:
@@ -585,6 +594,12 @@ def load(fname, cls=sge.dsp.Room, types=None, z=0):
 
         z += 1
 
+    if merge_walls:
+        # Imported here so that xsge_physics is only required when it is
+        # actually used.
+        import xsge_physics
+        objects = xsge_physics.merge_walls(objects, merge_key)
+
     room_kwargs = {"objects": objects, "width": room_width,
                    "height": room_height, "views": views if views else None,
                    "background": background}